@@ -0,0 +1,94 @@
+"""
+Tự hiệu chỉnh tốc độ tìm kiếm theo máy
+=========================================================
+Ngưỡng độ sâu cố định theo diện tích bàn bỏ qua tốc độ máy (server và
+máy Android yếu chênh nhau hơn 10 lần). Lần đầu MinimaxAI tìm kiếm trên
+một dạng bàn (rows, cols, win_len), nó chạy một micro-benchmark ngắn
+(CALIBRATION_SECONDS) trên thế cờ đại diện để đo số nút / giây; kết quả:
+
+• quyết định độ sâu tối đa và số nút thực sự dùng mỗi nước
+  (xem MinimaxAI._plan_search),
+• được lưu vào AI_CALIBRATION_PATH (JSON) để lần chạy sau dùng lại; file
+  gắn với máy + phiên bản Python, đổi máy thì đo lại,
+• hiện trong MinimaxAI.stats sau mỗi lần tìm.
+"""
+
+import json
+import logging
+import os
+import platform
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from game_config import AI_CALIBRATION_PATH
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_VERSION = 4       # Tăng khi chi phí một nút thay đổi (đo lại)
+CALIBRATION_SECONDS = 0.2       # Thời gian đo cho mỗi dạng bàn
+
+Shape = Tuple[int, int, int]    # (rows, cols, win_len)
+
+
+def host_fingerprint() -> str:
+    """Máy + trình thông dịch; số đo chỉ dùng lại khi khớp."""
+    return f"{platform.node()}/{platform.machine()}/{platform.python_implementation()}-{platform.python_version()}"
+
+
+class Calibration:
+    """Bảng dạng bàn -> nút/giây, nạp lười từ file và ghi lại sau mỗi lần đo."""
+
+    def __init__(self, path: Optional[str] = AI_CALIBRATION_PATH) -> None:
+        self.path = path
+        self._rates: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def nodes_per_second(self, shape: Shape, measure: Callable[[Shape], float]) -> float:
+        """Số đo đã lưu của *shape*, hoặc đo bằng *measure* rồi lưu."""
+        key = "x".join(map(str, shape))
+        with self._lock:
+            rates = self._load()
+            rate = rates.get(key)
+            if rate is None:
+                rate = rates[key] = round(measure(shape), 1)
+                logger.info(f"Calibrated {key}: {rate} nodes/s")
+                self._save()
+            return rate
+
+    def _load(self) -> Dict[str, float]:
+        if self._rates is None:
+            self._rates = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as fh:
+                        data = json.load(fh)
+                    if (data.get("version") == CALIBRATION_VERSION
+                            and data.get("host") == host_fingerprint()):
+                        self._rates = dict(data["nodes_per_s"])
+                except (OSError, ValueError, KeyError) as exc:
+                    logger.warning(f"Ignoring {self.path}: {exc}")
+        return self._rates
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        data = {"version": CALIBRATION_VERSION, "host": host_fingerprint(),
+                "nodes_per_s": self._rates}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)          # nhiều worker ghi cùng lúc vẫn an toàn
+        except OSError as exc:
+            logger.warning(f"Cannot save {self.path}: {exc}")
+
+
+_DEFAULT: Optional[Calibration] = None
+
+
+def get_calibration() -> Calibration:
+    """Calibration dùng chung của tiến trình (file AI_CALIBRATION_PATH)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = Calibration()
+    return _DEFAULT
@@ -0,0 +1,173 @@
+"""
+Hồ sơ độ khó AI (difficulty profiles)
+=========================================================
+Mỗi mức độ khó là một DifficultyProfile khai báo thay cho các nhánh
+"easy" / "medium" / "hard" viết cứng trong MinimaxAI:
+
+• strategy     : "search" (alpha-beta + IDDFS), "qlearning" hoặc "mcts"
+                 (Monte Carlo Tree Search, xem mcts.py).
+• depth_cap    : độ sâu IDDFS tối đa (None = suy từ số nút / giây của máy,
+                 xem ai_calibration).
+• node_budget  : số nút tối đa mỗi nước (None = số nút máy duyệt được trong
+                 time_budget; với "mcts" là số playout tối đa). Ngân sách
+                 nút cho độ trễ ổn định trên mọi kích thước bàn / win_len /
+                 mật độ chướng ngại, không như độ sâu cố định.
+• time_budget  : giây tối đa mỗi nước (server vẫn ghi đè được time_limit).
+• quiescence_budget : số nút quiescence tối đa mỗi độ sâu IDDFS (0 = tắt).
+                 Ở chân trời, thế cờ còn nước thắng / chặn bắt buộc / tạo
+                 đe doạ được đánh tiếp các nước ép buộc đó thay vì chấm tĩnh.
+• quiescence_depth  : số nước chủ động (tạo đe doạ) tối đa trong quiescence;
+                 nước chặn bắt buộc không tính.
+• lmr_after    : late-move reduction: ở thế cờ yên, các nước từ thứ
+                 lmr_after trở đi (theo thứ tự sắp xếp) được tìm nông hơn
+                 lmr_reduction tầng, chỉ tìm lại đủ sâu nếu vượt alpha / beta
+                 (0 = tắt).
+• threat_extensions : số tầng tối đa mỗi nhánh được tìm sâu thêm khi nước
+                 tạo đe doạ (ô thắng / chuỗi mở) (0 = tắt).
+• use_proofs   : đánh theo sổ chứng minh (pn_solver.py, AI_PROOFS_PATH) khi
+                 thế cờ nằm trên cây chứng minh thắng của AI, hoặc trên cây
+                 giữ hoà của AI khi cấu hình hoà.
+• weights      : trọng số hàm đánh giá, ghi đè từng khoá của DEFAULT_WEIGHTS.
+• playout, playout_batch : "mcts": chính sách playout ("heuristic" = thắng /
+                 chặn ngay nếu có, còn lại ngẫu nhiên; "random") và số ván
+                 mỗi lá.
+• uct_c, widening, widening_power : "mcts": hằng số khám phá UCT; nút có
+                 visits lượt thăm mở tối đa 1 + widening * visits **
+                 widening_power con (progressive widening).
+• mcts_workers : "mcts": số tiến trình chạy playout song song (1 = tại chỗ).
+• top_k, noise : với xác suất *noise*, chọn ngẫu nhiên trong *top_k* nước
+                 gốc tốt nhất thay vì luôn chọn nước tốt nhất.
+• exploration  : tỉ lệ khám phá của Q-learning.
+• listed       : hiện cho người chơi (nút độ khó ở HomeScreen, server,
+                 batch_simulator); False = chỉ dùng cho tournament / thử nghiệm.
+
+Hồ sơ có sẵn nằm trong BUILTIN_PROFILES; file JSON (AI_PROFILES_PATH) ghi
+đè hoặc thêm mức mới mà không cần sửa code:
+
+    {
+      "hard":   {"node_budget": 30000},
+      "expert": {"depth_cap": 10, "node_budget": 200000, "time_budget": 5.0,
+                 "weights": {"opp_open_1": 3000000}}
+    }
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+from game_config import AI_PROFILES_PATH
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_SEARCH    = "search"
+STRATEGY_QLEARNING = "qlearning"
+STRATEGY_MCTS      = "mcts"
+STRATEGIES = (STRATEGY_SEARCH, STRATEGY_QLEARNING, STRATEGY_MCTS)
+
+PLAYOUT_HEURISTIC = "heuristic"
+PLAYOUT_RANDOM    = "random"
+
+# Trọng số hàm đánh giá. *_1 = chuỗi dài win_len - 1, *_2 = win_len - 2,
+# len2 / len3 = chuỗi 2 / 3 quân; center / ring = ô giữa và 8 ô quanh nó.
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "own_open_1": 1_000_000, "own_seq_1": 20_000,
+    "own_open_2": 10_000,    "own_seq_2": 2_000,
+    "own_len2":   100,       "own_len3":  400,
+    "opp_open_1": 2_000_000, "opp_seq_1": 30_000,
+    "opp_open_2": 15_000,    "opp_seq_2": 2_500,
+    "opp_len2":   120,       "opp_len3":  500,
+    "center_own": 200,       "center_opp": 250,
+    "ring_own":   40,        "ring_opp":   50,
+}
+
+
+class DifficultyProfile(NamedTuple):
+    name: str
+    strategy: str = STRATEGY_SEARCH
+    depth_cap: Optional[int] = None
+    node_budget: Optional[int] = None
+    time_budget: float = 2.0
+    quiescence_budget: int = 0
+    quiescence_depth: int = 4
+    lmr_after: int = 0
+    lmr_reduction: int = 1
+    threat_extensions: int = 0
+    use_proofs: bool = False
+    playout: str = PLAYOUT_HEURISTIC
+    playout_batch: int = 8
+    uct_c: float = 0.3
+    widening: float = 2.0
+    widening_power: float = 0.5
+    mcts_workers: int = 1
+    weights: Dict[str, float] = DEFAULT_WEIGHTS
+    top_k: int = 1
+    noise: float = 0.0
+    exploration: float = 0.2
+    listed: bool = True
+
+
+BUILTIN_PROFILES: Dict[str, DifficultyProfile] = {
+    "easy":   DifficultyProfile("easy", strategy=STRATEGY_QLEARNING, exploration=0.2),
+    "medium": DifficultyProfile("medium", depth_cap=1),
+    "hard":   DifficultyProfile("hard", node_budget=20_000, time_budget=0.5,
+                              quiescence_budget=2_000, lmr_after=4, threat_extensions=2,
+                              use_proofs=True),
+    # Backend MCTS (mcts.py) cho bàn lớn, chưa phải mức độ khó cho người
+    # chơi: chỉ để so với "hard" bằng tournament.py
+    "mcts":   DifficultyProfile("mcts", strategy=STRATEGY_MCTS, time_budget=0.5, listed=False),
+}
+
+
+def make_profile(name: str, spec: dict, base: Optional[DifficultyProfile] = None) -> DifficultyProfile:
+    """Dựng hồ sơ từ dict (vd. một mục của file JSON), ghi đè lên *base*."""
+    unknown = set(spec) - set(DifficultyProfile._fields)
+    if unknown:
+        raise ValueError(f"profile {name!r}: unknown keys {sorted(unknown)}")
+    bad_weights = set(spec.get("weights", {})) - set(DEFAULT_WEIGHTS)
+    if bad_weights:
+        raise ValueError(f"profile {name!r}: unknown weights {sorted(bad_weights)}")
+    base = base or DifficultyProfile(name)
+    fields = dict(spec, name=name)
+    fields["weights"] = {**base.weights, **spec.get("weights", {})}
+    profile = base._replace(**fields)
+    if profile.strategy not in STRATEGIES:
+        raise ValueError(f"profile {name!r}: unknown strategy {profile.strategy!r}")
+    if profile.playout not in (PLAYOUT_HEURISTIC, PLAYOUT_RANDOM):
+        raise ValueError(f"profile {name!r}: unknown playout {profile.playout!r}")
+    return profile
+
+
+def load_profiles(path: Optional[str] = AI_PROFILES_PATH) -> Dict[str, DifficultyProfile]:
+    """Hồ sơ có sẵn + hồ sơ trong file JSON *path* (nếu có), giữ thứ tự khai báo."""
+    profiles = dict(BUILTIN_PROFILES)
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            for name, spec in json.load(fh).items():
+                profiles[name] = make_profile(name, spec, profiles.get(name))
+    return profiles
+
+
+_PROFILES: Optional[Dict[str, DifficultyProfile]] = None
+
+
+def get_profiles() -> Dict[str, DifficultyProfile]:
+    """load_profiles() của file cấu hình mặc định, đọc một lần."""
+    global _PROFILES
+    if _PROFILES is None:
+        try:
+            _PROFILES = load_profiles()
+        except (OSError, ValueError) as exc:
+            logger.error(f"Cannot load {AI_PROFILES_PATH}: {exc}. Using built-in profiles.")
+            _PROFILES = dict(BUILTIN_PROFILES)
+    return _PROFILES
+
+
+def get_profile(name: str) -> Optional[DifficultyProfile]:
+    """Hồ sơ theo tên; None nếu không có."""
+    return get_profiles().get(name)
+
+
+def listed_profiles() -> List[str]:
+    """Tên các mức độ khó hiện cho người chơi (hồ sơ có listed)."""
+    return [name for name, profile in get_profiles().items() if profile.listed]
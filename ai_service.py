@@ -0,0 +1,196 @@
+"""
+Dịch vụ AI dùng chung cho nhiều ván
+=========================================================
+Thay vì mỗi ván giữ một MinimaxAI riêng (Zobrist, transposition table,
+Q-table riêng, tìm lại cùng những khai cuộc), mọi yêu cầu nước đi đi qua
+một AIService:
+
+• Khoá = (rows, cols, win_len, độ khó, bên đánh, lưới dạng chuỗi). Hai ván
+  khác nhau nhưng cùng thế cờ dùng chung một kết quả.
+• Yêu cầu trùng khoá đang tính dở được gộp vào cùng một Future (dedup).
+• Kết quả của hồ sơ "search" (ai_profiles) được giữ trong LRU (OrderedDict)
+  giữa các ván; hồ sơ "qlearning" (khám phá ngẫu nhiên) luôn tính lại.
+• Tính toán chạy trên một ProcessPool cố định; mỗi worker giữ một MinimaxAI
+  cho mỗi độ khó (cùng file hồ sơ với tiến trình chính) và dựng Board bằng Board.from_grid. RNG của mỗi lần tìm
+  được seed theo khoá nên cùng thế cờ luôn cho cùng nước, có cache hay không.
+• stats(): số yêu cầu, cache hit, dedup, số lần tính thật, nước/giây.
+
+    service = AIService(workers=4)
+    move = service.best_move(board, "O", "hard")               # đồng bộ
+    move = await asyncio.wrap_future(service.submit(...))      # asyncio
+    ctrl = GameController(board, MODE_BOT, ai=service.client("hard"))
+"""
+
+import logging
+import multiprocessing.util
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from ai_profiles import STRATEGY_SEARCH, get_profile
+from board import Board
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 50_000
+DEFAULT_AI_BUDGET  = 0.5        # Giây tìm kiếm tối đa cho mỗi nước 'hard'
+
+Move = Tuple[int, int]
+PositionKey = Tuple[int, int, int, str, str, str]
+
+
+# ------------------------------------------------------------------ #
+#                          WORKER (PROCESS POOL)                     #
+# ------------------------------------------------------------------ #
+_WORKER_AI: Dict[str, object] = {}
+
+
+def _init_worker() -> None:
+    logging.getLogger().setLevel(logging.WARNING)   # minimax bật DEBUG khi import
+    # Worker thoát khi pool shutdown: đóng AI của nó (pool playout MCTS) trước
+    multiprocessing.util.Finalize(None, _close_worker_ais, exitpriority=10)
+
+
+def _close_worker_ais() -> None:
+    for ai in _WORKER_AI.values():
+        ai.close()
+    _WORKER_AI.clear()
+
+
+def _worker_best_move(key: PositionKey, budget: float) -> Move:
+    """Dựng Board từ khoá rồi tính nước cho *ai_sym*."""
+    from minimax import MinimaxAI
+
+    rows, cols, win_len, difficulty, ai_sym, cells = key
+    board = Board.from_grid([list(cells[r * cols:(r + 1) * cols]) for r in range(rows)], win_len)
+    human_sym = Board._PLAYERS[1] if ai_sym == Board._PLAYERS[0] else Board._PLAYERS[0]
+
+    ai = _WORKER_AI.get(difficulty)
+    if ai is None:
+        ai = _WORKER_AI[difficulty] = MinimaxAI(difficulty)
+    ai.use_rng(random.Random(repr(key)))
+    ai.time_limit = budget
+    return tuple(ai.best(board, ai_sym, human_sym))
+
+
+def position_key(board: Board, ai_sym: str, difficulty: str) -> PositionKey:
+    """Khoá cache của thế cờ hiện tại (không phụ thuộc thứ tự nước đã đánh)."""
+    cells = "".join(cell for row in board._grid for cell in row)
+    return board.rows, board.cols, board.win_len, difficulty, ai_sym, cells
+
+
+def _cacheable(difficulty: str) -> bool:
+    """Chỉ hồ sơ tìm kiếm cho kết quả cố định theo thế cờ (RNG seed theo khoá)."""
+    profile = get_profile(difficulty)
+    return profile is not None and profile.strategy == STRATEGY_SEARCH
+
+
+# ------------------------------------------------------------------ #
+#                               SERVICE                              #
+# ------------------------------------------------------------------ #
+class AIService:
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE, time_budget: float = DEFAULT_AI_BUDGET) -> None:
+        """
+        workers : Optional[int]
+            Số tiến trình của pool (None = số CPU); bỏ qua nếu truyền *executor*.
+        executor : Optional[Executor]
+            Executor tuỳ chọn (vd. ThreadPoolExecutor trong test).
+        cache_size : int
+            Số thế cờ giữ trong LRU (0 = tắt cache).
+        time_budget : float
+            MinimaxAI.time_limit cho mỗi lần tìm.
+        """
+        self._executor = executor or ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(), initializer=_init_worker)
+        self._cache: "OrderedDict[PositionKey, Move]" = OrderedDict()
+        self._cache_size  = cache_size
+        self._time_budget = time_budget
+        self._in_flight: Dict[PositionKey, Future] = {}
+        self._lock = threading.Lock()
+
+        self._started   = time.perf_counter()
+        self._requests  = 0
+        self._hits      = 0
+        self._deduped   = 0
+        self._computed  = 0
+
+    # ----------------------------- API ------------------------------
+    def submit(self, board: Board, ai_sym: str, difficulty: str) -> Future:
+        """Future trả nước đi cho *ai_sym*; board có thể đổi ngay sau lời gọi."""
+        key = position_key(board, ai_sym, difficulty)
+        with self._lock:
+            self._requests += 1
+            move = self._cache.get(key)
+            if move is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                done: Future = Future()
+                done.set_result(move)
+                return done
+            fut = self._in_flight.get(key)
+            if fut is not None:
+                self._deduped += 1
+                return fut
+            fut = self._executor.submit(_worker_best_move, key, self._time_budget)
+            self._in_flight[key] = fut
+        fut.add_done_callback(lambda f, key=key: self._finish(key, f))
+        return fut
+
+    def best_move(self, board: Board, ai_sym: str, difficulty: str) -> Move:
+        """Phiên bản đồng bộ của submit()."""
+        return self.submit(board, ai_sym, difficulty).result()
+
+    def client(self, difficulty: str) -> "PooledAI":
+        """Đối tượng thay MinimaxAI cho GameController (cùng best / use_rng)."""
+        return PooledAI(self, difficulty)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            return {
+                "requests": self._requests,
+                "cache_hits": self._hits,
+                "deduped": self._deduped,
+                "computed": self._computed,
+                "in_flight": len(self._in_flight),
+                "cached": len(self._cache),
+                "hit_rate": round((self._hits + self._deduped) / self._requests, 3)
+                            if self._requests else 0.0,
+                "moves_per_s": round(self._requests / elapsed, 1) if elapsed else 0.0,
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        _close_worker_ais()                 # AI tạo trong tiến trình này (executor là thread)
+
+    # ----------------------------- NỘI BỘ ----------------------------
+    def _finish(self, key: PositionKey, fut: Future) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if fut.cancelled() or fut.exception() is not None:
+                return
+            self._computed += 1
+            if self._cache_size > 0 and _cacheable(key[3]):
+                self._cache[key] = fut.result()
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+
+class PooledAI:
+    """Adapter MinimaxAI -> AIService để GameController dùng không đổi code."""
+
+    def __init__(self, service: AIService, difficulty: str) -> None:
+        self._service   = service
+        self.difficulty = difficulty
+
+    def use_rng(self, rng: random.Random) -> None:
+        pass                                # RNG do service seed theo thế cờ
+
+    def best(self, board: Board, ai_symbol: str, human_symbol: str) -> Move:
+        # Đối thủ luôn là ký hiệu còn lại: worker tự suy ra, không gửi human_symbol
+        return self._service.best_move(board, ai_symbol, self.difficulty)
@@ -0,0 +1,94 @@
+"""
+Batch simulator: người chơi giả lập đấu MinimaxAI
+=========================================================
+Chạy nhiều ván bot-vs-người-giả-lập qua đúng GameController của ứng dụng
+nhưng với ImmediateScheduler: không cần Kivy / event loop, AI đánh ngay
+sau nước của người. Người giả lập chọn ngẫu nhiên một nước hợp lệ
+(RNG theo seed nên mỗi lần chạy cho cùng kết quả).
+Với --pool N, nước AI đi qua AIService (N tiến trình, cache thế cờ giữa
+các ván) thay vì một MinimaxAI trong tiến trình.
+
+    python batch_simulator.py --games 1000 --difficulty easy [--record out.bin]
+    python batch_simulator.py --games 200 --difficulty hard --pool 4
+"""
+
+import argparse
+import logging
+import random
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from ai_profiles import listed_profiles
+from ai_service import AIService
+from board import Board
+from game_controller import GameController
+from game_record import GameRecordWriter
+from game_state import GameState
+from scheduler import ImmediateScheduler
+from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES, MODE_BOT
+
+
+def play_one(controller: GameController, rng: random.Random) -> GameState:
+    """Người giả lập (X) đánh ngẫu nhiên tới hết ván; AI (O) tự trả lời."""
+    board = controller.board
+    while controller.state is GameState.IN_PROGRESS:
+        controller.play(*rng.choice(sorted(board.get_legal_moves())))
+    return controller.state
+
+
+def simulate(games: int, difficulty: str = "easy",
+             rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS,
+             win_len: int = DEFAULT_WIN_LEN, num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+             seed: int = 0, record_path: Optional[str] = None,
+             service: Optional[AIService] = None) -> Dict[GameState, int]:
+    """Chạy *games* ván, trả về số ván theo kết quả (AI qua *service* nếu có)."""
+    scheduler = ImmediateScheduler()
+    recorder  = GameRecordWriter(record_path) if record_path else None
+    human_rng = random.Random(seed)
+    results: Counter = Counter()
+    ai = service.client(difficulty) if service is not None else None
+    for n in range(games):
+        board = Board(rows, cols, win_len, num_obstacles, seed=seed + n)
+        ctrl  = GameController(board, MODE_BOT, difficulty, recorder=recorder,
+                               ai=ai, scheduler=scheduler)
+        ai = ctrl._ai                               # dùng lại AI giữa các ván
+        results[play_one(ctrl, human_rng)] += 1
+        ctrl.close()
+    if service is None and ai is not None:
+        ai.close()
+    return dict(results)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--games", type=int, default=100)
+    ap.add_argument("--difficulty", default="easy", choices=listed_profiles())
+    ap.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    ap.add_argument("--cols", type=int, default=DEFAULT_COLS)
+    ap.add_argument("--win-len", type=int, default=DEFAULT_WIN_LEN)
+    ap.add_argument("--obstacles", type=int, default=DEFAULT_NUM_OBSTACLES)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--record", default=None, help="ghi GameRecord vào file này")
+    ap.add_argument("--pool", type=int, default=0, help="số tiến trình AIService (0 = tắt)")
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)   # engine bật DEBUG khi import
+
+    service = AIService(workers=args.pool) if args.pool else None
+    t0 = time.perf_counter()
+    try:
+        results = simulate(args.games, args.difficulty, args.rows, args.cols,
+                           args.win_len, args.obstacles, args.seed, args.record, service)
+    finally:
+        if service is not None:
+            service.close()
+    elapsed = time.perf_counter() - t0
+    for state in (GameState.X_WON, GameState.O_WON, GameState.DRAW):
+        print(f"{state.name:<12}{results.get(state, 0):>8}")
+    if service is not None:
+        print("ai service:", service.stats())
+    print(f"{args.games} ván trong {elapsed:.2f}s ({args.games / elapsed:.1f} ván/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark vòng lặp tìm kiếm của MinimaxAI
+=========================================================
+Chạy IDDFS tới độ sâu cố định (không giới hạn nút / thời gian, nên cùng
+thế cờ luôn duyệt cùng cây) trên vài dạng bàn, in số nút, nút / giây và
+bộ nhớ cấp phát đo bằng tracemalloc:
+
+• peak B/node : đỉnh bộ nhớ tăng thêm trong lúc tìm / số nút (bộ đệm theo
+                tầng, danh sách nước, khoá + mục transposition table...),
+• kept B/node : bộ nhớ còn giữ sau khi tìm xong / số nút (chủ yếu là
+                transposition table).
+
+Lần đo thời gian chạy riêng, không bật tracemalloc; lần đo bộ nhớ tìm lại
+cùng thế cờ trên cùng AI (trạng thái cấp một lần cho mỗi dạng bàn không
+tính vào mỗi nút).
+
+    python benchmarks/bench_search.py [--depth 3] [--positions 4] [--set lmr_after=4 ...]
+
+--set ghi đè trường của hồ sơ tìm kiếm (như một mục của ai_profiles.json),
+để so sánh số nút / thời gian cần cho cùng độ sâu khi bật tìm kiếm chọn
+lọc (lmr_after, threat_extensions, quiescence_budget...).
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_calibration import Calibration   # noqa: E402
+from ai_profiles import make_profile     # noqa: E402
+from board import Board                  # noqa: E402
+from minimax import MinimaxAI            # noqa: E402
+
+SHAPES = ((5, 5, 4, 5), (7, 7, 4, 5), (10, 10, 5, 10), (15, 15, 5, 20))
+
+
+def positions(rows: int, cols: int, win_len: int, obstacles: int, count: int):
+    """Các thế cờ sau 4 nước ngẫu nhiên (theo seed), lượt của O."""
+    for seed in range(count):
+        board = Board(rows, cols, win_len, obstacles, seed=seed)
+        rng = random.Random(seed)
+        for ply in range(4):
+            board.place(*rng.choice(sorted(board.get_legal_moves())), "XO"[ply % 2])
+        yield seed, board
+
+
+def run(depth: int, count: int, overrides: dict) -> None:
+    profile = make_profile("bench", dict(overrides, depth_cap=depth, time_budget=3600.0))
+    print(f"{'board':>10} {'nodes':>8} {'ms':>8} {'nodes/s':>9} {'peak B/node':>12} {'kept B/node':>12}")
+    for rows, cols, win_len, obstacles in SHAPES:
+        nodes = elapsed = peak = kept = 0
+        # Số đo cố định: độ sâu đã khoá, bỏ qua lần đo máy khỏi phần tính giờ
+        calibration = Calibration(None)
+        calibration.nodes_per_second((rows, cols, win_len), lambda shape: 1e6)
+        for seed, board in positions(rows, cols, win_len, obstacles, count):
+            ai = MinimaxAI(profile, rng=random.Random(seed), calibration=calibration)
+            t0 = time.perf_counter()
+            ai.best(board, "O", "X")
+            elapsed += time.perf_counter() - t0
+            nodes += ai.nodes
+
+            # Lần đo thứ hai trên cùng AI: bộ đệm cấp một lần đã có sẵn, chỉ
+            # còn lại phần cấp phát theo nút
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            ai.best(board, "O", "X")
+            current, top = tracemalloc.get_traced_memory()
+            peak += top - base
+            kept += current - base
+            tracemalloc.stop()
+        print(f"{rows}x{cols}w{win_len}".rjust(10), f"{nodes:8d} {elapsed * 1000:8.1f} "
+              f"{nodes / elapsed:9.0f} {peak / nodes:12.1f} {kept / nodes:12.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--positions", type=int, default=4)
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                    help="ghi đè trường hồ sơ (giá trị dạng JSON), lặp lại được")
+    args = ap.parse_args()
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = json.loads(value)
+    logging.getLogger().setLevel(logging.WARNING)
+    run(args.depth, args.positions, overrides)
+
+
+if __name__ == "__main__":
+    main()
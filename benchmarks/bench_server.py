@@ -0,0 +1,132 @@
+"""
+Load generator cho game_server
+=========================================================
+Mở nhiều kết nối đồng thời, mỗi kết nối chơi liên tiếp các ván với nước
+ngẫu nhiên (RNG theo seed), đo thời gian khứ hồi của từng lệnh "move"
+(gồm cả nước AI) và in p50 / p99 cùng số liệu hàng đợi của server.
+
+    python benchmarks/bench_server.py --clients 200 --games 5       # tự chạy server
+    python benchmarks/bench_server.py --connect 127.0.0.1:8765      # server có sẵn
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_profiles import listed_profiles          # noqa: E402
+from game_server import GameServer, percentile   # noqa: E402
+
+
+async def _request(reader, writer, req: dict) -> dict:
+    writer.write(json.dumps(req).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def _client(host: str, port: int, games: int, params: dict, rng: random.Random,
+                  latencies: List[float], errors: List[str]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            reply = await _request(reader, writer, dict(params, op="new", seed=rng.getrandbits(32)))
+            if not reply["ok"]:
+                errors.append(reply["error"])
+                continue
+            game = reply["game"]
+            free = {(i, j) for i in range(params["rows"]) for j in range(params["cols"])}
+            free -= {tuple(c) for c in reply["obstacles"]}
+            state = "IN_PROGRESS"
+            while state == "IN_PROGRESS" and free:
+                move = rng.choice(sorted(free))
+                t0 = time.perf_counter()
+                reply = await _request(reader, writer,
+                                       {"op": "move", "game": game, "row": move[0], "col": move[1]})
+                if not reply["ok"]:
+                    errors.append(reply["error"])
+                    if reply["error"] == "busy":
+                        await asyncio.sleep(0.01)    # backpressure: thử lại sau
+                        continue
+                    break
+                latencies.append(time.perf_counter() - t0)
+                free.discard(move)
+                if reply["ai"]:
+                    free.discard(tuple(reply["ai"]))
+                state = reply["state"]
+            await _request(reader, writer, {"op": "close", "game": game})
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host: str, port: int, clients: int, games: int, params: dict,
+                   seed: int = 0) -> Tuple[List[float], List[str], float]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, games, params, random.Random(seed + n), latencies, errors)
+        for n in range(clients)))
+    return latencies, errors, time.perf_counter() - t0
+
+
+async def _main(args: argparse.Namespace) -> None:
+    params = {"rows": args.rows, "cols": args.cols, "win_len": args.win_len,
+              "obstacles": args.obstacles, "difficulty": args.difficulty}
+    server: Optional[GameServer] = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        server = GameServer(workers=args.workers, max_pending=args.max_pending,
+                            ai_budget=args.budget)
+        tcp = await server.serve("127.0.0.1", 0)   # cổng tự chọn
+        host, port = tcp.sockets[0].getsockname()[:2]
+
+    try:
+        latencies, errors, elapsed = await run_load(host, port, args.clients, args.games, params)
+        print(f"{len(latencies)} moves, {args.clients} clients, {elapsed:.2f}s "
+              f"({len(latencies) / elapsed:.0f} moves/s)")
+        print(f"move latency  p50 {percentile(latencies, 50) * 1000:8.1f} ms"
+              f"   p99 {percentile(latencies, 99) * 1000:8.1f} ms")
+        if errors:
+            print(f"errors: {len(errors)} (busy {errors.count('busy')})")
+        reader, writer = await asyncio.open_connection(host, port)
+        print("server:", (await _request(reader, writer, {"op": "stats"}))["stats"])
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        if server is not None:
+            tcp.close()
+            await tcp.wait_closed()
+            server.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--connect", default=None, help="host:port của server có sẵn")
+    ap.add_argument("--clients", type=int, default=100)
+    ap.add_argument("--games", type=int, default=3, help="số ván mỗi client")
+    ap.add_argument("--rows", type=int, default=7)
+    ap.add_argument("--cols", type=int, default=7)
+    ap.add_argument("--win-len", type=int, default=4)
+    ap.add_argument("--obstacles", type=int, default=5)
+    ap.add_argument("--difficulty", default="medium", choices=listed_profiles())
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-pending", type=int, default=256)
+    ap.add_argument("--budget", type=float, default=0.5)
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark thời gian khởi động nguội (cold start)
+=========================================================
+Chạy mỗi kịch bản import trong một tiến trình Python mới (không có cache
+module) nhiều lần và in trung vị / lớn nhất. Dùng để theo dõi thời gian khởi
+động trên máy yếu qua các phiên bản.
+
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# tên kịch bản -> mã chạy trong tiến trình mới
+SCENARIOS = {
+    "engine (board + minimax)": "import board, minimax",
+    "controller":               "import game_controller",
+    "app module (home only)":   "import tic_tac_toe_app",
+    "game screen (full UI)":    "import game_screen",
+}
+
+
+def time_scenario(code: str, runs: int) -> list:
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = statistics.median(time_scenario("pass", args.runs))
+    print(f"{'scenario':<28} {'median':>10} {'max':>10}   (interpreter {baseline * 1000:.0f} ms trừ sẵn)")
+    for name, code in SCENARIOS.items():
+        samples = time_scenario(code, args.runs)
+        med = (statistics.median(samples) - baseline) * 1000
+        worst = (max(samples) - baseline) * 1000
+        print(f"{name:<28} {med:>8.1f}ms {worst:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import random
-from typing import List, Tuple, Set, Optional
+from typing import Dict, List, Tuple, Set, Optional
 
 from game_config import (
     DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES,
@@ -15,6 +15,9 @@ class Board:
     EMPTY: str = EMPTY_SYMBOL
     OBSTACLE: str = OBSTACLE_SYMBOL
     _PLAYERS: tuple[str, str] = (PLAYER_X, PLAYER_O)
+    # (rows, cols) -> mọi toạ độ ô; các Board cùng kích thước dùng chung tuple
+    # toạ độ thay vì mỗi bàn tự tạo (server giữ hàng nghìn ván cùng lúc)
+    _CELLS: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
 
     # ------------------------------------------------------------------ #
     #                           KHỞI TẠO                                  #
@@ -25,18 +28,64 @@ class Board:
         cols: int = DEFAULT_COLS,
         win_len: int = DEFAULT_WIN_LEN,
         num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+        seed: Optional[int] = None,
+        symmetric_obstacles: bool = False,
+        rng: Optional[random.Random] = None,
     ) -> None:
+        """
+        seed : Optional[int]
+            Hạt giống cho RNG của ván (None = tự sinh, đọc lại qua `seed`).
+        rng : Optional[random.Random]
+            RNG dùng chung của ván; nếu truyền vào thì bỏ qua *seed*.
+        symmetric_obstacles : bool
+            True -> obstacle đối xứng tâm, không bên nào được lợi thế hình học.
+        """
         self._rows = rows
         self._cols = cols
         self._win_len = win_len
         self._num_obstacles = num_obstacles
+        self._symmetric_obstacles = symmetric_obstacles
+        if rng is None:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            rng = random.Random(seed)
+        self._seed = seed
+        self._rng = rng
+        self._obstacle_cells: Set[Tuple[int, int]] = set()
 
         self._history: List[Tuple[int, int, str]] = []
         self._last_placed_sym: Optional[str] = None
         self._current_winner: Optional[str] = None
 
+        # Bộ đếm theo đoạn thắng (segment): mỗi đoạn là win_len ô liên tiếp
+        # không chứa obstacle; lưu số quân X/O trong từng đoạn.
+        self._cell_segs: List[Tuple[int, ...]] = []
+        self._seg_counts: Dict[str, List[int]] = {}
+        self._open_segs: int = 0
+
         self.reset()
 
+    @classmethod
+    def from_grid(cls, grid: List[List[str]], win_len: int) -> "Board":
+        """
+        Dựng Board từ một lưới (vd. grid_snapshot): giữ đúng obstacle và quân
+        X/O, không dùng RNG. Lịch sử nước đi không được khôi phục.
+        """
+        rows, cols = len(grid), len(grid[0])
+        board = cls(rows, cols, win_len, num_obstacles=0, seed=0)
+        obstacles = [(i, j) for i in range(rows) for j in range(cols)
+                     if grid[i][j] == cls.OBSTACLE]
+        for i, j in obstacles:
+            board._grid[i][j] = cls.OBSTACLE
+            board._legal.discard((i, j))
+        board._obstacle_cells.update(obstacles)
+        board._build_segments()
+        for i in range(rows):
+            for j in range(cols):
+                if grid[i][j] in cls._PLAYERS:
+                    board.place(i, j, grid[i][j])
+        return board
+
     # ------------------------------------------------------------------ #
     #                     THUỘC TÍNH TRẠNG THÁI (READ‑ONLY)              #
     # ------------------------------------------------------------------ #
@@ -48,6 +97,20 @@ class Board:
     def cols(self) -> int:
         return self._cols
 
+    @property
+    def win_len(self) -> int:
+        return self._win_len
+
+    @property
+    def seed(self) -> Optional[int]:
+        """Hạt giống sinh ra RNG của ván (None nếu RNG được truyền từ ngoài)."""
+        return self._seed
+
+    @property
+    def rng(self) -> random.Random:
+        """RNG dùng chung của ván (obstacle, AI)."""
+        return self._rng
+
     @property
     def has_moves(self) -> bool:
         """Trả True nếu đã có ít nhất một nước đi lưu trong _history."""
@@ -57,6 +120,14 @@ class Board:
     def history_len(self) -> int:
         return len(self._history)
 
+    @property
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        """Toạ độ nước vừa đánh (đỉnh _history) hoặc None."""
+        if not self._history:
+            return None
+        i, j, _ = self._history[-1]
+        return i, j
+
     @property
     def grid_snapshot(self):
         """Trả bản sao lưới để quan sát mà không sửa được."""
@@ -64,12 +135,7 @@ class Board:
 
     @property
     def obstacles(self) -> Set[Tuple[int, int]]:
-        return {
-            (i, j)
-            for i in range(self._rows)
-            for j in range(self._cols)
-            if self._grid[i][j] == self.OBSTACLE
-        }
+        return set(self._obstacle_cells)
 
     # ------------------------------------------------------------------ #
     #                        HÀNH ĐỘNG TRÊN BÀN                           #
@@ -91,8 +157,8 @@ class Board:
         self._legal.remove((i, j))
         self._last_placed_sym = symbol
 
-        # Kiểm tra thắng / hòa
-        if self.has_winner(i, j, symbol):
+        # Cập nhật bộ đếm đoạn & kiểm tra thắng / hòa
+        if self._update_segments(i, j, symbol, +1):
             self._current_winner = symbol
         elif self.is_draw():
             self._current_winner = DRAW_SYMBOL
@@ -102,6 +168,7 @@ class Board:
         if not self._history:
             return
         last_r, last_c, prev_symbol = self._history.pop()
+        self._update_segments(last_r, last_c, self._grid[last_r][last_c], -1)
         self._grid[last_r][last_c] = prev_symbol
         self._legal.add((last_r, last_c))
 
@@ -118,30 +185,16 @@ class Board:
     #                   KIỂM TRA KẾT QUẢ                                 #
     # ------------------------------------------------------------------ #
     def has_winner(self, i: int, j: int, symbol: str) -> bool:
-        directions = [
-            (0, 1),   # ngang
-            (1, 0),   # dọc
-            (1, 1),   # chéo chính
-            (1, -1),  # chéo phụ
-        ]
-        for dx, dy in directions:
-            if self._count_streak(i, j, dx, dy, symbol) >= self._win_len:
+        """True nếu một đoạn đi qua (i, j) đã đủ win_len quân *symbol*."""
+        counts = self._seg_counts.get(symbol)
+        if counts is None:
+            return False
+        win_len = self._win_len
+        for s in self._cell_segs[i * self._cols + j]:
+            if counts[s] >= win_len:
                 return True
         return False
 
-    def _count_streak(self, i: int, j: int, dx: int, dy: int, symbol: str) -> int:
-        """Đếm liên tiếp symbol theo hướng (dx,dy) qua (i,j)."""
-        streak = 0
-        for k in range(-self._win_len + 1, self._win_len):
-            r, c = i + k * dx, j + k * dy
-            if 0 <= r < self._rows and 0 <= c < self._cols and self._grid[r][c] == symbol:
-                streak += 1
-                if streak >= self._win_len:
-                    return streak
-            else:
-                streak = 0
-        return streak
-
     def has_winner_any(self) -> bool:
         return self._current_winner in self._PLAYERS
 
@@ -149,7 +202,14 @@ class Board:
         return self._current_winner
 
     def is_draw(self) -> bool:
-        return not self._legal and not self.has_winner_any()
+        """Hòa khi bàn đầy hoặc không còn đoạn nào thắng được (dead draw)."""
+        if self.has_winner_any():
+            return False
+        return not self._legal or self._open_segs == 0
+
+    def is_dead_draw(self) -> bool:
+        """True nếu mọi đoạn thắng đều đã có quân của cả hai bên."""
+        return self._open_segs == 0 and not self.has_winner_any()
 
     def is_full(self) -> bool:
         return not self._legal
@@ -163,28 +223,19 @@ class Board:
         self._last_placed_sym = None
         self._current_winner = None
 
+        self._legal: Set[Tuple[int, int]] = set(self._all_cells())
+        self._obstacle_cells = set()
         self._place_obstacles()
-        self._legal: Set[Tuple[int, int]] = {
-            (i, j)
-            for i in range(self._rows)
-            for j in range(self._cols)
-            if self._grid[i][j] == self.EMPTY
-        }
+        self._build_segments()
 
     def reshuffle_obstacles(self) -> None:
-        for i in range(self._rows):
-            for j in range(self._cols):
-                if self._grid[i][j] == self.OBSTACLE:
-                    self._grid[i][j] = self.EMPTY
-                    self._legal.add((i, j))
+        for i, j in self._obstacle_cells:
+            self._grid[i][j] = self.EMPTY
+            self._legal.add((i, j))
+        self._obstacle_cells = set()
 
         self._place_obstacles()
-        self._legal = {
-            (i, j)
-            for i in range(self._rows)
-            for j in range(self._cols)
-            if self._grid[i][j] == self.EMPTY
-        }
+        self._build_segments()
         self._history.clear()
         self._last_placed_sym = None
         self._current_winner = None
@@ -195,6 +246,7 @@ class Board:
                 if self._grid[i][j] not in (self.EMPTY, self.OBSTACLE):
                     self._grid[i][j] = self.EMPTY
                     self._legal.add((i, j))
+        self._reset_segment_counts()
         self._history.clear()
         self._last_placed_sym = None
         self._current_winner = None
@@ -208,10 +260,100 @@ class Board:
     # ------------------------------------------------------------------ #
     #                      HÀM NỘI BỘ HỖ TRỢ                             #
     # ------------------------------------------------------------------ #
+    def _all_cells(self) -> Tuple[Tuple[int, int], ...]:
+        key = (self._rows, self._cols)
+        cells = self._CELLS.get(key)
+        if cells is None:
+            cells = self._CELLS[key] = tuple(
+                (i, j) for i in range(self._rows) for j in range(self._cols))
+        return cells
+
     def _place_obstacles(self) -> None:
-        placed = 0
-        while placed < self._num_obstacles:
-            i, j = random.randrange(self._rows), random.randrange(self._cols)
-            if self._grid[i][j] == self.EMPTY:
-                self._grid[i][j] = self.OBSTACLE
-                placed += 1
+        """
+        Lấy mẫu không hoàn lại trên các ô trống (random.sample) nên luôn dừng,
+        kể cả khi num_obstacles >= số ô trống (khi đó phủ kín các ô trống).
+        """
+        free = sorted(self._legal)
+        count = min(self._num_obstacles, len(free))
+        if self._symmetric_obstacles:
+            chosen = self._sample_symmetric(free, count)
+        else:
+            chosen = self._rng.sample(free, count)
+
+        for i, j in chosen:
+            self._grid[i][j] = self.OBSTACLE
+            self._legal.discard((i, j))
+        self._obstacle_cells.update(chosen)
+
+    def _sample_symmetric(self, free: List[Tuple[int, int]], count: int) -> List[Tuple[int, int]]:
+        """Chọn obstacle theo cặp đối xứng tâm; ô tâm (nếu có) dùng khi count lẻ."""
+        free_set = set(free)
+        pairs, singles = [], []
+        for i, j in free:
+            mi, mj = self._rows - 1 - i, self._cols - 1 - j
+            if (mi, mj) == (i, j):
+                singles.append((i, j))
+            elif (i, j) < (mi, mj) and (mi, mj) in free_set:
+                pairs.append(((i, j), (mi, mj)))
+
+        chosen: List[Tuple[int, int]] = []
+        for a, b in self._rng.sample(pairs, min(count // 2, len(pairs))):
+            chosen += [a, b]
+        if len(chosen) < count and singles:
+            chosen.append(singles[0])
+        if len(chosen) < count:
+            # Không đủ cặp đối xứng: bù bằng ô ngẫu nhiên còn lại
+            taken = set(chosen)
+            rest = [c for c in free if c not in taken]
+            chosen += self._rng.sample(rest, min(count - len(chosen), len(rest)))
+        return chosen
+
+    def _build_segments(self) -> None:
+        """Liệt kê mọi đoạn win_len ô (4 hướng) không chứa obstacle."""
+        rows, cols, win_len = self._rows, self._cols, self._win_len
+        cell_segs: List[List[int]] = [[] for _ in range(rows * cols)]
+        n_segs = 0
+        for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for i in range(rows):
+                for j in range(cols):
+                    end_r, end_c = i + (win_len - 1) * dx, j + (win_len - 1) * dy
+                    if not (0 <= end_r < rows and 0 <= end_c < cols):
+                        continue
+                    cells = [(i + k * dx) * cols + (j + k * dy) for k in range(win_len)]
+                    if any(self._grid[c // cols][c % cols] == self.OBSTACLE for c in cells):
+                        continue
+                    for c in cells:
+                        cell_segs[c].append(n_segs)
+                    n_segs += 1
+        self._cell_segs = [tuple(segs) for segs in cell_segs]   # chỉ đọc sau khi dựng
+        self._n_segs = n_segs
+        self._reset_segment_counts()
+
+    def _reset_segment_counts(self) -> None:
+        """Đưa bộ đếm X/O của mọi đoạn về 0 (mọi đoạn đều còn mở)."""
+        self._seg_counts = {p: [0] * self._n_segs for p in self._PLAYERS}
+        self._open_segs = self._n_segs
+
+    def _update_segments(self, i: int, j: int, symbol: str, delta: int) -> bool:
+        """
+        Cộng *delta* (+1 khi đặt, -1 khi undo) vào bộ đếm *symbol* của mọi đoạn
+        đi qua (i, j). Trả True nếu có đoạn đạt win_len quân *symbol*.
+        """
+        counts = self._seg_counts.get(symbol)
+        if counts is None:
+            return False
+        other = self._seg_counts[PLAYER_O if symbol == PLAYER_X else PLAYER_X]
+        win_len = self._win_len
+        won = False
+        for s in self._cell_segs[i * self._cols + j]:
+            before = counts[s]
+            counts[s] = before + delta
+            if other[s]:
+                # Đoạn đã có quân đối thủ: chuyển sống <-> chết khi quân mình 0 <-> 1
+                if before == 0:
+                    self._open_segs -= 1
+                elif counts[s] == 0:
+                    self._open_segs += 1
+            elif counts[s] >= win_len:
+                won = True
+        return won
@@ -2,8 +2,10 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.core.window import Window
 
 from board import Board
+from themes import Theme
 from xo_cell import XOCell
-from game_config import CELL_SIZE, MARGIN_X, MARGIN_Y
+from texture_cache import set_cell_size
+from game_config import CELL_SIZE, MARGIN_X, MARGIN_Y, PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL
 
 
 class BoardWidget(GridLayout):
@@ -39,13 +41,17 @@ class BoardWidget(GridLayout):
 
         # Lưu trữ tham chiếu tới các ô => dễ cập nhật hiển thị
         self._cells: dict[tuple[int, int], XOCell] = {}
+        # (mark, theme) đã vẽ của từng ô -> chỉ vẽ lại ô thực sự đổi
+        self._rendered: dict[tuple[int, int], tuple[str, str]] = {}
 
-        # Tạo các ô
+        # Tạo các ô (XOCell tự vẽ ô trống theo theme hiện tại)
+        theme_name = Theme.current_name()
         for row in range(board.rows):
             for col in range(board.cols):
                 cell = XOCell(row, col, on_cell_cb)
                 self.add_widget(cell)
                 self._cells[(row, col)] = cell
+                self._rendered[(row, col)] = ("", theme_name)
 
         # Gắn sự kiện resize cửa sổ
         Window.bind(on_resize=self._on_window_resize)
@@ -73,16 +79,57 @@ class BoardWidget(GridLayout):
         for cell in self.children:
             cell.size = (cell_size, cell_size)
 
+        # Ô đổi cỡ sang mức atlas khác -> gán lại texture cỡ phù hợp
+        if set_cell_size(cell_size):
+            self._retexture()
+
     # ------------------------------------------------------------------ #
     #                           PUBLIC API                               #
     # ------------------------------------------------------------------ #
     def reset(self, board: Board) -> None:
-        """Vẽ lại toàn bộ bàn cờ dựa trên trạng thái mới."""
-        for (row, col), cell in self._cells.items():
-            cell.set_mark(board.get_mark(row, col))
+        """Đồng bộ toàn bộ bàn cờ; chỉ những ô khác lần vẽ trước mới được set_mark."""
+        for (row, col) in self._cells:
+            self._render((row, col), board.get_mark(row, col))
+
+    def apply_diff(self, changes: dict[tuple[int, int], str]) -> None:
+        """Vẽ lại đúng các ô trong diff do controller gửi."""
+        for coords, symbol in changes.items():
+            self._render(coords, symbol)
+
+    def refresh_theme(self) -> None:
+        """Theme đổi: vẽ lại các ô còn mang theme cũ với mark đã lưu."""
+        theme_name = Theme.current_name()
+        for coords, (mark, rendered_theme) in list(self._rendered.items()):
+            if rendered_theme != theme_name:
+                self._render(coords, mark)
 
     def update_cell(self, coords: tuple[int, int], symbol: str) -> None:
         """Cập nhật nhanh một ô khi người chơi vừa đánh."""
-        row, col = coords
-        if (row, col) in self._cells:
-            self._cells[(row, col)].set_mark(symbol)
+        if coords in self._cells:
+            self._render(coords, symbol)
+
+    def dispose(self) -> None:
+        """Gỡ handler resize của Window trước khi bỏ widget (tránh rò rỉ)."""
+        Window.unbind(on_resize=self._on_window_resize)
+
+    def set_locked(self, locked: bool, alpha: float) -> None:
+        """Khoá / mở click và làm mờ toàn bộ ô (khi ván kết thúc)."""
+        for cell in self._cells.values():
+            cell.disabled = locked
+            cell.opacity  = alpha
+
+    # ------------------------------------------------------------------ #
+    #                         DIRTY-CELL RENDER                          #
+    # ------------------------------------------------------------------ #
+    def _retexture(self) -> None:
+        for coords, (mark, _) in self._rendered.items():
+            self._cells[coords].set_mark(mark)
+            self._rendered[coords] = (mark, Theme.current_name())
+
+    def _render(self, coords: tuple[int, int], symbol: str) -> None:
+        mark = symbol if symbol in (PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL) else ""
+        key = (mark, Theme.current_name())
+        if self._rendered.get(coords) == key:
+            return
+        self._cells[coords].set_mark(mark)
+        self._rendered[coords] = key
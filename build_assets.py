@@ -0,0 +1,242 @@
+"""
+Pipeline asset offline: ảnh thu nhỏ theo độ phân giải
+=========================================================
+Ảnh gốc trong assets/ là PNG 1024 px (~2 MB) nhưng ô cờ chỉ hiện ~60 px.
+Script này sinh vào assets/build/:
+
+• Với mỗi theme: chuỗi mipmap của X / O / cell / obstacle (hạ một nửa mỗi
+  mức, trung bình có trọng số alpha để viền không bị quầng), mỗi mức trong
+  CELL_BUCKETS đóng gói thành một Kivy atlas `<theme>/<theme>@<px>.atlas`.
+• Ảnh nền theme và ảnh popup / nút: bản có cạnh dài theo IMAGE_BUCKETS.
+• manifest.json: nguồn -> biến thể, để texture_cache chọn bản nhỏ nhất đủ
+  dùng lúc chạy (không có manifest thì dùng ảnh gốc như cũ).
+
+Tên file theme được khớp không phân biệt hoa thường với thư mục thật (vd.
+cấu hình "x.png" nhưng file là "X.png") và báo cảnh báo để sửa cấu hình.
+Giải mã bằng ImageLoader của Kivy (không cần cửa sổ / OpenGL, đọc được cả
+cell.png dạng JPEG), mã hoá PNG bằng zlib; không cần PIL.
+
+    python build_assets.py [--out assets/build]
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import struct
+import zlib
+from typing import Dict, List, Tuple
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+from game_config import (
+    ASSETS, ASSET_BUILD_DIR, ASSET_MANIFEST, CELL_BUCKETS, IMAGE_BUCKETS, NAMES_THEMES,
+    BG_THEME, CELL_THEME, X_THEME, O_THEME, OBSTACLE_THEME,
+    BG_ERROR, SELECT_DIF, BTN_BOT, BTN_FRIEND,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+THEME_ICONS = (X_THEME, O_THEME, CELL_THEME, OBSTACLE_THEME)
+POPUP_IMAGES = (BG_ERROR, SELECT_DIF, BTN_BOT, BTN_FRIEND)
+
+Pixels = Tuple[bytes, int, int]          # RGBA 8 bit, hàng trên cùng trước
+
+
+# ------------------------------------------------------------------ #
+#                           GIẢI MÃ / MÃ HOÁ                         #
+# ------------------------------------------------------------------ #
+def load_rgba(path: str) -> Pixels:
+    """Đọc ảnh bất kỳ Kivy hỗ trợ thành RGBA liền mạch."""
+    from kivy.core.image import ImageLoader
+
+    data = ImageLoader.load(path)._data[0]
+    w, h, fmt = data.width, data.height, data.fmt
+    bpp = {"rgba": 4, "bgra": 4, "rgb": 3, "bgr": 3}[fmt]
+    stride = getattr(data, "rowlength", 0) or w * bpp
+    raw = data.data
+    if stride != w * bpp:
+        raw = b"".join(raw[y * stride:y * stride + w * bpp] for y in range(h))
+    if not data.flip_vertical:           # dữ liệu đang từ dưới lên
+        raw = b"".join(raw[y * w * bpp:(y + 1) * w * bpp] for y in reversed(range(h)))
+
+    out = bytearray(w * h * 4)
+    r, b = (2, 0) if fmt.startswith("bgr") else (0, 2)
+    out[0::4] = raw[r::bpp]
+    out[1::4] = raw[1::bpp]
+    out[2::4] = raw[b::bpp]
+    out[3::4] = raw[3::4] if bpp == 4 else b"\xff" * (w * h)
+    return bytes(out), w, h
+
+
+def save_png(path: str, pixels: Pixels) -> None:
+    """Ghi PNG 8 bit: RGB nếu ảnh đặc hoàn toàn, ngược lại RGBA; filter Up, zlib mức 9."""
+    px, w, h = pixels
+    if px[3::4] == b"\xff" * (w * h):
+        rgb = bytearray(w * h * 3)
+        rgb[0::3], rgb[1::3], rgb[2::3] = px[0::4], px[1::4], px[2::4]
+        px, bpp, color_type = bytes(rgb), 3, 2
+    else:
+        bpp, color_type = 4, 6
+    stride = w * bpp
+    rows = []
+    prev = bytes(stride)
+    for y in range(h):
+        row = px[y * stride:(y + 1) * stride]
+        rows.append(b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, prev)))
+        prev = row
+
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return (struct.pack(">I", len(body)) + tag + body
+                + struct.pack(">I", zlib.crc32(tag + body) & 0xFFFFFFFF))
+
+    with open(path, "wb") as fh:
+        fh.write(b"\x89PNG\r\n\x1a\n")
+        fh.write(chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, color_type, 0, 0, 0)))
+        fh.write(chunk(b"IDAT", zlib.compress(b"".join(rows), 9)))
+        fh.write(chunk(b"IEND", b""))
+
+
+# ------------------------------------------------------------------ #
+#                              THU NHỎ                               #
+# ------------------------------------------------------------------ #
+def halve(pixels: Pixels) -> Pixels:
+    """Một mức mipmap: mỗi pixel = trung bình 2x2, màu có trọng số alpha."""
+    px, w, h = pixels
+    w2, h2 = max(1, w // 2), max(1, h // 2)
+    out = bytearray(w2 * h2 * 4)
+    stride = w * 4
+    o = 0
+    for y in range(h2):
+        r0 = 2 * y * stride
+        r1 = min(2 * y + 1, h - 1) * stride
+        for x in range(w2):
+            i0 = r0 + 8 * x
+            i1 = r0 + min(2 * x + 1, w - 1) * 4
+            j0 = r1 + 8 * x
+            j1 = r1 + min(2 * x + 1, w - 1) * 4
+            a0, a1, a2, a3 = px[i0 + 3], px[i1 + 3], px[j0 + 3], px[j1 + 3]
+            at = a0 + a1 + a2 + a3
+            if at:
+                half = at >> 1
+                for c in range(3):
+                    out[o + c] = (px[i0 + c] * a0 + px[i1 + c] * a1
+                                  + px[j0 + c] * a2 + px[j1 + c] * a3 + half) // at
+                out[o + 3] = (at + 2) >> 2
+            o += 4
+    return bytes(out), w2, h2
+
+
+def mip_chain(pixels: Pixels, sizes: List[int]) -> Dict[int, Pixels]:
+    """
+    Hạ một nửa tới khi cạnh dài <= từng cỡ trong *sizes*; trả cỡ -> ảnh.
+    Không phóng to: cỡ >= ảnh gốc bị bỏ qua.
+    """
+    levels: Dict[int, Pixels] = {}
+    cur = pixels
+    for size in sorted(sizes, reverse=True):
+        if max(pixels[1], pixels[2]) <= size:
+            continue
+        while max(cur[1], cur[2]) > size:
+            cur = halve(cur)
+        levels[size] = cur
+    return levels
+
+
+# ------------------------------------------------------------------ #
+#                               ATLAS                                #
+# ------------------------------------------------------------------ #
+def pack_atlas(images: Dict[str, Pixels], png_name: str) -> Tuple[Pixels, dict]:
+    """Xếp các ảnh cùng cỡ thành lưới; trả (ảnh atlas, meta .atlas của Kivy)."""
+    cols = math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / cols)
+    cw = max(p[1] for p in images.values())
+    ch = max(p[2] for p in images.values())
+    aw, ah = cols * cw, rows * ch
+    canvas = bytearray(aw * ah * 4)
+    meta = {}
+    for n, (uid, (px, w, h)) in enumerate(sorted(images.items())):
+        x, y = (n % cols) * cw, (n // cols) * ch          # gốc trên-trái
+        for row in range(h):
+            dst = ((y + row) * aw + x) * 4
+            canvas[dst:dst + w * 4] = px[row * w * 4:(row + 1) * w * 4]
+        meta[uid] = [x, ah - y - h, w, h]                  # Kivy: gốc dưới-trái
+    return (bytes(canvas), aw, ah), {png_name: meta}
+
+
+def resolve(directory: str, filename: str) -> str:
+    """Tìm *filename* trong *directory*, chấp nhận khác hoa thường."""
+    exact = os.path.join(directory, filename)
+    if os.path.exists(exact):
+        return exact
+    for entry in os.listdir(directory):
+        if entry.lower() == filename.lower():
+            logger.warning(f"{exact} không tồn tại, dùng {entry} (sửa tên trong game_config)")
+            return os.path.join(directory, entry)
+    raise FileNotFoundError(exact)
+
+
+# ------------------------------------------------------------------ #
+#                                BUILD                               #
+# ------------------------------------------------------------------ #
+def build(out_dir: str = ASSET_BUILD_DIR) -> dict:
+    manifest = {"version": MANIFEST_VERSION, "cell_buckets": list(CELL_BUCKETS),
+                "atlases": {}, "images": {}}
+
+    for theme in NAMES_THEMES:
+        src_dir = os.path.join(ASSETS, theme)
+        theme_out = os.path.join(out_dir, theme)
+        os.makedirs(theme_out, exist_ok=True)
+        per_bucket: Dict[int, Dict[str, Pixels]] = {b: {} for b in CELL_BUCKETS}
+        for icon in THEME_ICONS:
+            uid = os.path.splitext(icon)[0]
+            levels = mip_chain(load_rgba(resolve(src_dir, icon)), list(CELL_BUCKETS))
+            for bucket, pixels in levels.items():
+                per_bucket[bucket][uid] = pixels
+        manifest["atlases"][theme] = {}
+        for bucket, images in per_bucket.items():
+            if len(images) != len(THEME_ICONS):
+                continue
+            name = f"{theme}@{bucket}"
+            atlas_px, meta = pack_atlas(images, f"{name}.png")
+            save_png(os.path.join(theme_out, f"{name}.png"), atlas_px)
+            with open(os.path.join(theme_out, f"{name}.atlas"), "w") as fh:
+                json.dump(meta, fh)
+            manifest["atlases"][theme][str(bucket)] = f"{theme}/{name}.atlas"
+        _build_image(manifest, resolve(src_dir, BG_THEME), theme_out, theme)
+        print(f"theme {theme}: {sorted(manifest['atlases'][theme], key=int)}")
+
+    images_out = os.path.join(out_dir, "images")
+    os.makedirs(images_out, exist_ok=True)
+    for path in POPUP_IMAGES:
+        _build_image(manifest, path, images_out, "images")
+        print(f"image {path}: {sorted(manifest['images'][path], key=int)}")
+
+    with open(os.path.join(out_dir, ASSET_MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    return manifest
+
+
+def _build_image(manifest: dict, path: str, out_dir: str, rel_dir: str) -> None:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    variants = {}
+    for pixels in mip_chain(load_rgba(path), list(IMAGE_BUCKETS)).values():
+        size = max(pixels[1], pixels[2])          # ghi cạnh dài thật (vd. 768)
+        name = f"{stem}@{size}.png"
+        save_png(os.path.join(out_dir, name), pixels)
+        variants[str(size)] = f"{rel_dir}/{name}"
+    manifest["images"][path.replace(os.sep, "/")] = variants
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--out", default=ASSET_BUILD_DIR)
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    build(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from kivy.uix.widget import Widget
+from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle
+
+from board import Board
+from themes import Theme
+from texture_cache import set_cell_size
+from game_config import CELL_SIZE, MARGIN_X, MARGIN_Y, PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL, BTN_RGBA
+
+
+class CanvasBoardWidget(Widget):
+    """
+    Renderer bàn cờ một canvas, dành cho lưới lớn.
+
+    Thay vì một XOCell (widget) cho mỗi ô, toàn bộ bàn là các cặp
+    Color + Rectangle được cache trên một canvas; texture lấy từ cache
+    theme dùng chung. Chạm được quy đổi thẳng sang (row, col).
+    Giữ nguyên API của BoardWidget (reset / update_cell / apply_diff /
+    refresh_theme / set_locked) để TicTacToeLayout dùng thay thế được.
+    """
+
+    # ------------------------------------------------------------------ #
+    #                           KHỞI TẠO                                 #
+    # ------------------------------------------------------------------ #
+    def __init__(self, board: Board, on_cell_cb, **kw):
+        """
+        board : Board
+            Trạng thái hiện tại của bàn cờ.
+        on_cell_cb : Callable[[int, int], None]
+            Hàm callback được gọi khi người dùng nhấn vào một ô.
+        """
+        super().__init__(size_hint=(None, None), **kw)
+        self.rows, self.cols = board.rows, board.cols
+        self._cb = on_cell_cb
+        self._locked = False
+        self._cell_size = CELL_SIZE
+        self.size = (CELL_SIZE * board.cols, CELL_SIZE * board.rows)
+
+        # (mark, theme) đã vẽ của từng ô -> chỉ đổi texture ô thực sự đổi
+        self._rendered: dict[tuple[int, int], tuple[str, str]] = {}
+        self._colors: dict[tuple[int, int], Color] = {}
+        self._rects: dict[tuple[int, int], Rectangle] = {}
+
+        theme = Theme.current()
+        empty_tex = theme.textures[""]
+        with self.canvas:
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    self._colors[(row, col)] = Color(1, 1, 1, 1)
+                    self._rects[(row, col)] = Rectangle(texture=empty_tex)
+                    self._rendered[(row, col)] = ("", theme.name)
+
+        self.bind(pos=self._layout_cells, size=self._layout_cells)
+        Window.bind(on_resize=self._on_window_resize)
+        self._on_window_resize(Window, Window.width, Window.height)
+
+    # ------------------------------------------------------------------ #
+    #                         HÀM HỖ TRỢ RIÊNG                           #
+    # ------------------------------------------------------------------ #
+    def _on_window_resize(self, window, width, height) -> None:
+        """Tính lại kích thước ô cho vừa cửa sổ (cùng công thức BoardWidget)."""
+        avail_w = width - MARGIN_X
+        avail_h = height - MARGIN_Y
+        self._cell_size = avail_h // self.rows if avail_h < avail_w else avail_w // self.cols
+        self.size = (self._cell_size * self.cols, self._cell_size * self.rows)
+        if set_cell_size(self._cell_size):        # đổi mức atlas theo cỡ ô
+            self._retexture()
+
+    def _layout_cells(self, *_) -> None:
+        """Đặt lại pos/size các Rectangle; hàng 0 nằm trên cùng như GridLayout."""
+        s = self._cell_size
+        x0, top = self.x, self.top
+        for (row, col), rect in self._rects.items():
+            rect.pos  = (x0 + col * s, top - (row + 1) * s)
+            rect.size = (s, s)
+
+    def _coords_at(self, x: float, y: float):
+        """Quy đổi toạ độ chạm sang (row, col); None nếu nằm ngoài lưới."""
+        if not self._cell_size or not self.collide_point(x, y):
+            return None
+        col = int((x - self.x) // self._cell_size)
+        row = int((self.top - y) // self._cell_size)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    # ------------------------------------------------------------------ #
+    #                              TOUCH                                 #
+    # ------------------------------------------------------------------ #
+    def on_touch_down(self, touch):
+        if self._locked or self.disabled or self._coords_at(*touch.pos) is None:
+            return super().on_touch_down(touch)
+        touch.grab(self)
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        coords = self._coords_at(*touch.pos)
+        if coords is not None and not self._locked:
+            self._cb(*coords)
+        return True
+
+    # ------------------------------------------------------------------ #
+    #                           PUBLIC API                               #
+    # ------------------------------------------------------------------ #
+    def reset(self, board: Board) -> None:
+        """Đồng bộ toàn bộ bàn cờ; chỉ ô khác lần vẽ trước mới đổi texture."""
+        for (row, col) in self._rects:
+            self._render((row, col), board.get_mark(row, col))
+
+    def apply_diff(self, changes: dict[tuple[int, int], str]) -> None:
+        """Vẽ lại đúng các ô trong diff do controller gửi."""
+        for coords, symbol in changes.items():
+            self._render(coords, symbol)
+
+    def refresh_theme(self) -> None:
+        """Theme đổi: chỉ đổi tham chiếu texture, không tạo instruction mới."""
+        theme_name = Theme.current_name()
+        for coords, (mark, rendered_theme) in list(self._rendered.items()):
+            if rendered_theme != theme_name:
+                self._render(coords, mark)
+
+    def update_cell(self, coords: tuple[int, int], symbol: str) -> None:
+        """Cập nhật nhanh một ô khi người chơi vừa đánh."""
+        if coords in self._rects:
+            self._render(coords, symbol)
+
+    def dispose(self) -> None:
+        """Gỡ handler resize của Window trước khi bỏ widget (tránh rò rỉ)."""
+        Window.unbind(on_resize=self._on_window_resize)
+
+    def set_locked(self, locked: bool, alpha: float) -> None:
+        """Khoá / mở chạm và làm mờ cả bàn bằng một thuộc tính opacity."""
+        self._locked = locked
+        self.opacity = alpha
+
+    # ------------------------------------------------------------------ #
+    #                         DIRTY-CELL RENDER                          #
+    # ------------------------------------------------------------------ #
+    def _retexture(self) -> None:
+        theme = Theme.current()
+        for coords, (mark, _) in self._rendered.items():
+            self._rects[coords].texture = theme.textures[mark]
+            self._rendered[coords] = (mark, theme.name)
+
+    def _render(self, coords: tuple[int, int], symbol: str) -> None:
+        mark = symbol if symbol in (PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL) else ""
+        theme = Theme.current()
+        key = (mark, theme.name)
+        if self._rendered.get(coords) == key:
+            return
+        self._rects[coords].texture = theme.textures[mark]
+        # tint obstacle cùng màu nút control
+        self._colors[coords].rgba = BTN_RGBA if mark == OBSTACLE_SYMBOL else (1, 1, 1, 1)
+        self._rendered[coords] = key
@@ -1,4 +1,3 @@
-from kivy.resources import resource_find
 """
 Trung tâm cấu hình & hằng số
 =================================================
@@ -8,9 +7,13 @@ Thay đổi một chỗ sẽ ảnh hưởng toàn bộ dự án.
 # ------------------------------------------------------------------ #
 #                           KIVY FONT PATH                           #
 # ------------------------------------------------------------------ #
-# Font hệ thống (dùng trong LabelBase.register nếu muốn tên tắt)
-FONT_BOLD    = resource_find('data/fonts/Roboto-Bold.ttf')
-FONT_LOBSTER = resource_find('assets/fonts/Lobster-Regular.ttf')
+# Font hệ thống (dùng trong LabelBase.register nếu muốn tên tắt).
+# FONT_BOLD / FONT_LOBSTER được tìm lười qua __getattr__ (cuối file) để
+# import game_config không kéo theo Kivy (Board / AI chạy không cần UI).
+_FONT_FILES = {
+    "FONT_BOLD":    'data/fonts/Roboto-Bold.ttf',
+    "FONT_LOBSTER": 'assets/fonts/Lobster-Regular.ttf',
+}
 DEFAULT_FONT = "Roboto-Bold"
 
 # ------------------------------------------------------------------ #
@@ -25,6 +28,7 @@ SOUND_DRAW             = "draw.wav"
 SOUND_WIN              = "win.wav"
 SOUND_CLICK_BTN        = "click_btn.wav"
 VOLUME_DEFAULT         = 0.4
+MAX_TAP_VOICES         = 3    # Số voice tối đa cho tiếng tap khi bấm nhanh
 
 # ------------------------------------------------------------------ #
 #                         QUY TẮC BÀN CỜ & GAME                      #
@@ -53,11 +57,19 @@ DIFFICULTY_HARD        = "hard"
 DEFAULT_DIFFICULTY     = "medium"
 DEFAULT_AI_LEVEL       = "medium"
 DELAY_AI_MOVE          = 0.2  # Thời gian AI suy nghĩ (giây)
+# Hồ sơ độ khó bổ sung / ghi đè (ai_profiles.py); không có file thì dùng hồ sơ có sẵn
+AI_PROFILES_PATH       = "ai_profiles.json"
+# Số nút / giây đo được trên máy này, theo dạng bàn (ai_calibration.py)
+AI_CALIBRATION_PATH    = "ai_calibration.json"
+# Kết quả + nước chứng minh của các cấu hình đã giải bằng pn_solver.py
+AI_PROOFS_PATH         = "ai_proofs.json"
 
 # ------------------------------------------------------------------ #
 #                          LAYOUT & STYLE                             #
 # ------------------------------------------------------------------ #
 CELL_SIZE              = 60
+# Từ số ô này trở lên dùng CanvasBoardWidget (một canvas) thay cho BoardWidget
+CANVAS_RENDER_MIN_CELLS = 225   # 15x15
 BTN_W, BTN_H           = 260, 60
 BACK_BTN_W, BACK_BTN_H = 200, 60
 
@@ -87,11 +99,18 @@ NAMES_THEMES = [
 ]
 BG_THEME       = "bg.png"
 CELL_THEME     = "cell.png"
-X_THEME        = "x.png"
-O_THEME        = "o.png"
+X_THEME        = "X.png"
+O_THEME        = "O.png"
 OBSTACLE_THEME = "obstacle.png"
+ATLAS_SUFFIX   = ".atlas"   # assets/<theme>/<theme>.atlas (X/O/cell/obstacle)
 ASSETS         = "assets" # tiện alias cho Theme class
 
+# Asset đã thu nhỏ (build_assets.py): atlas theo cỡ ô, ảnh lớn theo cạnh dài
+ASSET_BUILD_DIR = "assets/build"
+ASSET_MANIFEST  = "manifest.json"
+CELL_BUCKETS    = (32, 64, 128, 256)     # px cạnh icon X/O/cell/obstacle
+IMAGE_BUCKETS   = (256, 512, 1024)       # px cạnh dài của nền / popup / nút ảnh
+
 # Ảnh nền mặc định khi chưa load Theme
 DEFAULT_BG_IMAGE   = "assets/wood/bg.png"
 
@@ -122,8 +141,27 @@ SELECT_DIF = 'assets/images/select_dif.png'
 BTN_BOT = 'assets/images/btn_bot.png'
 BTN_FRIEND = 'assets/images/btn_friend.png'
 
+# ------------------------------------------------------------------ #
+#                          LƯU VÁN ĐẤU                               #
+# ------------------------------------------------------------------ #
+# File nhị phân append-only chứa mọi ván đã kết thúc (None = tắt ghi)
+GAME_RECORD_PATH = "game_records.bin"
+
 # ------------------------------------------------------------------ #
 #                       GIÁ TRỊ PHỤ KHÁC                             #
 # ------------------------------------------------------------------ #
 RESTART                = 60
 
+
+
+# ------------------------------------------------------------------ #
+#                    TRA CỨU LƯỜI (PEP 562)                          #
+# ------------------------------------------------------------------ #
+def __getattr__(name):
+    """Tìm đường dẫn font ở lần truy cập đầu rồi lưu lại vào module."""
+    if name in _FONT_FILES:
+        from kivy.resources import resource_find
+        value = resource_find(_FONT_FILES[name])
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,16 +6,21 @@ Cầu nối giữa **View** (UI Kivy) và **Model** (`Board`).
 - Gửi thông báo (observer pattern) cho các thành phần UI/âm thanh.
 """
 
-from typing import List, Tuple
-from kivy.clock import Clock
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import logging
+import time
 
 from board import Board
-from minimax import MinimaxAI
 from game_state import GameState
 from game_observer import GameObserver
+from game_events import DiffEvent, GameEvent, GameEventBatch, MoveEvent, ResetEvent, StateEvent
+from game_record import GameRecord, GameRecordWriter
+from scheduler import KivyScheduler, Scheduler
 from game_config import PLAYER_X, PLAYER_O, MODE_BOT, MODE_FRIEND, DELAY_AI_MOVE, DEFAULT_AI_LEVEL
 
+if TYPE_CHECKING:                     # MinimaxAI chỉ import khi chơi với máy
+    from minimax import MinimaxAI
+
 # ----------------------------- LOGGING SETUP --------------------------- #
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -25,7 +30,9 @@ class GameController:
     # ------------------------------------------------------------------ #
     #                               KHỞI TẠO                            #
     # ------------------------------------------------------------------ #
-    def __init__(self, board: Board, mode: str = MODE_FRIEND, difficulty: str = DEFAULT_AI_LEVEL) -> None:
+    def __init__(self, board: Board, mode: str = MODE_FRIEND, difficulty: str = DEFAULT_AI_LEVEL,
+                 recorder: Optional[GameRecordWriter] = None, ai: Optional["MinimaxAI"] = None,
+                 coalesce_frames: bool = False, scheduler: Optional[Scheduler] = None) -> None:
         """
         board : Board
             Thể hiện của lớp Board (model) đang được điều khiển.
@@ -33,6 +40,16 @@ class GameController:
             Chế độ chơi - 'Play with Friend' (2 người) hoặc 'Play vs Bot' (đánh với AI).
         difficulty : str
             Độ khó AI (chuỗi tuỳ theo MinimaxAI, ví dụ 'easy' | 'medium' | 'hard').
+        recorder : Optional[GameRecordWriter]
+            Nơi ghi lại mỗi ván khi kết thúc (None = không ghi).
+        ai : Optional[MinimaxAI]
+            AI dùng lại từ ván trước (cùng độ khó); None = tạo mới khi chơi với máy.
+        coalesce_frames : bool
+            True -> gom sự kiện và gửi observer một lần mỗi frame (UI);
+            False -> gửi ngay khi phát (test / chạy không giao diện).
+        scheduler : Optional[Scheduler]
+            Lập lịch nước AI & gom sự kiện (None = KivyScheduler, tạo khi cần).
+            ImmediateScheduler cho phép chạy ván với AI không cần event loop.
         """
         self._board      = board                    # Model gốc
         self._current    = PLAYER_X                 # Người chơi bắt đầu
@@ -42,9 +59,35 @@ class GameController:
         self._mode       = mode
         self._difficulty = difficulty
 
+        # Nhật ký ván hiện tại (để ghi GameRecord khi kết thúc)
+        self._recorder  = recorder
+        self._moves: List[Tuple[int, int]] = []
+        self._ai_times: List[float] = []
+        self._pending_ai_time = 0.0
+        self._recorded = False      # Ván đã được ghi (undo rồi kết thúc lại không ghi lần nữa)
+
+        # Ngăn xếp redo: (i, j, symbol, thời gian AI) của các nước đã undo
+        self._redo: List[Tuple[int, int, str, float]] = []
+
+        self._closed = False
+        self._scheduler = scheduler
+
+        # Hàng đợi sự kiện chờ gửi observer (gom một lần mỗi frame nếu bật)
+        self._pending_events: List[GameEvent] = []
+        self._last_state_sent: Optional[StateEvent] = None
+        if coalesce_frames:
+            self._flush_trigger = self.scheduler.create_trigger(self._flush_events)
+        else:
+            self._flush_trigger = self._flush_events
+
         if mode == MODE_BOT:
-            # Khởi tạo AI chỉ khi cần
-            self._ai        = MinimaxAI(difficulty)
+            # Khởi tạo AI chỉ khi cần (hoặc dùng lại AI được truyền vào)
+            if ai is None:
+                from minimax import MinimaxAI
+                ai = MinimaxAI(difficulty, rng=board.rng)
+            else:
+                ai.use_rng(board.rng)
+            self._ai        = ai
             self._human_sym = PLAYER_X
             self._ai_sym    = PLAYER_O
         else:
@@ -55,33 +98,72 @@ class GameController:
     # ------------------------------------------------------------------ #
     def reset(self) -> None:
         """Bắt đầu ván mới: xoá bàn, tạo obstacle và trả lượt cho X."""
+        before = self._board.grid_snapshot
         self._board.reset()
         self._current = PLAYER_X
         self._state   = GameState.IN_PROGRESS
+        self._moves.clear()
+        self._ai_times.clear()
+        self._redo.clear()
+        self._recorded = False
         logger.debug("Game reset: current player = X, state = IN_PROGRESS")
 
-        # Thông báo mọi observer vẽ lại bàn (nếu có _grid)
-        for obs in self._observers:
-            if hasattr(obs, "_grid"):
-                obs._grid.reset(self._board)
+        self._emit(ResetEvent())
+        # Chỉ gửi các ô khác bàn cũ (quân cũ bị xoá + obstacle cũ/mới)
+        self._notify_diff(self._grid_diff(before))
         self._notify_state()
 
     def undo(self) -> None:
-        """Hoàn tác nước đi cuối cùng và cập nhật view."""
-        if self._state is not GameState.IN_PROGRESS:
-            return  # Chỉ undo khi ván đang diễn ra
+        """
+        Hoàn tác nước đi cuối cùng (chế độ Bot: lùi tới lượt người chơi gần nhất)
+        và chỉ gửi cho view các ô thay đổi.
+        """
+        changes: Dict[Tuple[int, int], str] = {}
+        if not self._step_back(changes):
+            return
+        if self._mode == MODE_BOT:
+            while self._current != self._human_sym and self._step_back(changes):
+                pass
+        self._after_navigation(changes)
 
-        self._board.undo_last_move()
+    def redo(self) -> None:
+        """Làm lại nước vừa undo (chế độ Bot: tới lượt người chơi kế tiếp)."""
+        changes: Dict[Tuple[int, int], str] = {}
+        if not self._step_forward(changes):
+            return
+        if self._mode == MODE_BOT:
+            while (self._current != self._human_sym
+                   and self._board.get_winner_symbol() is None
+                   and self._step_forward(changes)):
+                pass
+        self._after_navigation(changes)
 
-        # Đảo lượt người chơi
-        self._current = PLAYER_O if self._current == PLAYER_X else PLAYER_X
-        self._state   = GameState.IN_PROGRESS
+    def seek(self, n: int) -> None:
+        """Nhảy tới trạng thái sau *n* nước (0 = đầu ván) bằng chuỗi undo/redo.
 
-        # Thông báo UI vẽ lại
-        for obs in self._observers:
-            if hasattr(obs, "_grid"):
-                obs._grid.reset(self._board)
-        self._notify_state()
+        Chế độ Bot: nếu ply *n* là lượt AI thì lùi về lượt người chơi gần nhất.
+        """
+        target = max(0, min(n, self._board.history_len + len(self._redo)))
+        changes: Dict[Tuple[int, int], str] = {}
+        while self._board.history_len > target and self._step_back(changes):
+            pass
+        while self._board.history_len < target and self._step_forward(changes):
+            pass
+        if self._mode == MODE_BOT:
+            # Như undo(): dừng ở lượt người chơi để AI không đánh đè lên redo
+            while (self._current != self._human_sym
+                   and self._board.get_winner_symbol() is None
+                   and self._step_back(changes)):
+                pass
+        self._after_navigation(changes)
+
+    @property
+    def can_undo(self) -> bool:
+        return self._board.has_moves
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
 
     def play(self, i: int, j: int) -> None:
         """Xử lý nước đi của người chơi hiện tại."""
@@ -96,6 +178,11 @@ class GameController:
             logger.warning(f"Invalid move tại ({i},{j})")
             return
 
+        self._moves.append((i, j))
+        self._ai_times.append(self._pending_ai_time)
+        self._pending_ai_time = 0.0
+        self._redo.clear()  # Nhánh mới: bỏ các nước đã undo
+
         # 3) Cập nhật UI qua observer
         self._notify_board((i, j), self._current)
 
@@ -110,51 +197,176 @@ class GameController:
             # Đổi lượt
             self._current = PLAYER_O if self._current == PLAYER_X else PLAYER_X
             logger.debug(f"Turn switched to {self._current}")
-            # Nếu tới lượt AI -> lên lịch cho AI đánh (delay 0.2s)
-            if self._mode == MODE_BOT and self._current == self._ai_sym:
-                Clock.schedule_once(lambda *_: self._ai_move(), DELAY_AI_MOVE)
+
+        if self._state is not GameState.IN_PROGRESS:
+            self._record_game()
 
         # 5) Thông báo trạng thái mới
         self._notify_state()
 
+        # 6) Nếu tới lượt AI -> lên lịch cho AI đánh (delay 0.2s); đặt cuối
+        #    để scheduler đồng bộ không chen nước AI vào giữa nước hiện tại
+        self._schedule_ai()
+
     def reshuffle_obstacles(self) -> None:
         """Đảo vị trí obstacle khi ván đang chơi."""
         if self._state is not GameState.IN_PROGRESS:
             return
+        before = self._board.grid_snapshot
         self._board.reshuffle_obstacles()
-        for obs in self._observers:
-            if hasattr(obs, "_grid"):
-                obs._grid.reset(self._board)
+        self._redo.clear()
+        self._notify_diff(self._grid_diff(before))
+
+    def close(self) -> None:
+        """Ngừng ván: bỏ mọi observer, sự kiện chờ và nước AI còn đang chờ."""
+        self._closed = True
+        self._observers.clear()
+        self._pending_events.clear()
 
     def register(self, obs: GameObserver) -> None:
         """Thêm observer (UI / âm thanh) nhận thông báo."""
         self._observers.append(obs)
         logger.debug(f"Registered observer: {obs}")
         obs.on_state_change(self._state, self._current)
+        self._last_state_sent = StateEvent(self._state, self._current)
 
     # ------------------------------------------------------------------ #
     #                           INTERNAL HELPERS                         #
     # ------------------------------------------------------------------ #
+    def _emit(self, event: GameEvent) -> None:
+        """Đưa sự kiện vào hàng đợi và hẹn gửi (ngay, hoặc cuối frame)."""
+        if self._closed:
+            return
+        self._pending_events.append(event)
+        self._flush_trigger()
+
     def _notify_board(self, coords: Tuple[int, int], symbol: str) -> None:
-        """Gửi tín hiệu cập nhật một ô cho tất cả observer."""
-        for o in self._observers:
-            o.on_board_change(coords, symbol)
+        """Phát sự kiện một ô vừa được đánh."""
+        self._emit(MoveEvent(coords, symbol))
 
     def _notify_state(self) -> None:
-        """Gửi tín hiệu thay đổi trạng thái ván cho mọi observer."""
+        """Phát sự kiện trạng thái ván (chỉ khi thực sự đổi)."""
         next_p = None if self._state is not GameState.IN_PROGRESS else self._current
-        for o in self._observers:
-            o.on_state_change(self._state, next_p)
+        event = StateEvent(self._state, next_p)
+        if event != self._last_state_sent:
+            self._last_state_sent = event
+            self._emit(event)
+
+    def _notify_diff(self, changes: Dict[Tuple[int, int], str]) -> None:
+        """Phát sự kiện nhiều ô đổi cùng lúc."""
+        if changes:
+            self._emit(DiffEvent(dict(changes)))
+
+    def _flush_events(self) -> None:
+        """
+        Gửi các sự kiện đang chờ: observer có on_events nhận một batch đã gộp;
+        observer cũ nhận lần lượt on_board_change / on_board_diff / on_state_change.
+        """
+        if not self._pending_events:
+            return
+        batch = GameEventBatch(self._pending_events)
+        self._pending_events = []
+        for o in list(self._observers):
+            if hasattr(o, "on_events"):
+                o.on_events(batch)
+                continue
+            for ev in batch.events:
+                if isinstance(ev, MoveEvent):
+                    o.on_board_change(ev.coords, ev.symbol)
+                elif isinstance(ev, DiffEvent):
+                    if hasattr(o, "on_board_diff"):
+                        o.on_board_diff(ev.changes)
+                    else:
+                        for coords, symbol in ev.changes.items():
+                            o.on_board_change(coords, symbol)
+                elif isinstance(ev, StateEvent):
+                    o.on_state_change(ev.state, ev.next_turn)
+
+    def _grid_diff(self, before: List[List[str]]) -> Dict[Tuple[int, int], str]:
+        """So lưới hiện tại với *before*; trả các ô đã đổi ký hiệu."""
+        changes: Dict[Tuple[int, int], str] = {}
+        for i, row in enumerate(before):
+            for j, old in enumerate(row):
+                new = self._board.get_mark(i, j)
+                if new != old:
+                    changes[(i, j)] = new
+        return changes
+
+    def _step_back(self, changes: Dict[Tuple[int, int], str]) -> bool:
+        """Lùi một nước theo Board._history; ghi ô thay đổi vào *changes*."""
+        last = self._board.last_move
+        if last is None:
+            return False
+        i, j = last
+        symbol = self._board.get_mark(i, j)
+        self._board.undo_last_move()
+        ai_time = 0.0
+        if self._moves:
+            self._moves.pop()
+            ai_time = self._ai_times.pop()
+        self._redo.append((i, j, symbol, ai_time))
+        changes[(i, j)] = self._board.get_mark(i, j)
+        self._current = symbol                  # Trả lượt cho người vừa đánh
+        return True
+
+    def _step_forward(self, changes: Dict[Tuple[int, int], str]) -> bool:
+        """Tiến một nước từ ngăn xếp redo."""
+        if not self._redo:
+            return False
+        i, j, symbol, ai_time = self._redo.pop()
+        self._board.place(i, j, symbol)
+        self._moves.append((i, j))
+        self._ai_times.append(ai_time)
+        changes[(i, j)] = symbol
+        self._current = PLAYER_O if symbol == PLAYER_X else PLAYER_X
+        return True
+
+    def _after_navigation(self, changes: Dict[Tuple[int, int], str]) -> None:
+        """Tính lại trạng thái từ Board sau undo/redo/seek rồi báo observer."""
+        winner = self._board.get_winner_symbol()
+        if winner is None:
+            self._state = GameState.IN_PROGRESS
+        else:
+            self._state = {PLAYER_X: GameState.X_WON, PLAYER_O: GameState.O_WON}.get(winner, GameState.DRAW)
+            # Giữ quy ước của play(): khi kết thúc, _current là người đánh cuối
+            self._current = PLAYER_O if self._current == PLAYER_X else PLAYER_X
+
+        self._notify_diff(changes)
+        self._notify_state()
+        if not self._redo:                      # Còn nước redo: chưa để AI đánh
+            self._schedule_ai()
+
+    def _schedule_ai(self) -> None:
+        """Hẹn nước AI nếu ván đang chơi và tới lượt AI."""
+        if (self._mode == MODE_BOT and self._state is GameState.IN_PROGRESS
+                and self._current == self._ai_sym):
+            self.scheduler.call_later(DELAY_AI_MOVE, self._ai_move)
 
     def _ai_move(self) -> None:
         """Hàm callback cho nước đi của AI."""
         if not self._ai:
             logger.error("AI chưa được khởi tạo")
             return
+        if (self._closed or self._state is not GameState.IN_PROGRESS
+                or self._current != self._ai_sym):
+            return  # Người chơi đã undo / đổi ván trong lúc chờ
+        t0 = time.perf_counter()
         move = self._ai.best(self._board, self._ai_sym, self._human_sym)
+        self._pending_ai_time = time.perf_counter() - t0
         logger.debug(f"AI chọn nước {move}")
         self.play(*move)  # Gọi lại play để xử lý bình thường
 
+    def _record_game(self) -> None:
+        """Ghi ván vừa kết thúc vào recorder (nếu có), một lần cho mỗi ván."""
+        if self._recorder is None or self._recorded:
+            return
+        self._recorded = True
+        b = self._board
+        self._recorder.write(GameRecord(
+            b.rows, b.cols, b.win_len, self._mode, self._difficulty, b.seed,
+            sorted(b.obstacles), list(self._moves), list(self._ai_times), self._state,
+        ))
+
     # ------------------------------------------------------------------ #
     #                           READ‑ONLY PROPS                          #
     # ------------------------------------------------------------------ #
@@ -168,6 +380,23 @@ class GameController:
         """Ký hiệu người sẽ đánh kế tiếp (hoặc người vừa thắng)."""
         return self._current
 
+    @property
+    def moves(self) -> Tuple[Tuple[int, int], ...]:
+        """Các nước đã đánh của ván hiện tại (X, O luân phiên từ X)."""
+        return tuple(self._moves)
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """Scheduler đang dùng (mặc định Clock của Kivy, tạo ở lần dùng đầu)."""
+        if self._scheduler is None:
+            self._scheduler = KivyScheduler()
+        return self._scheduler
+
+    @property
+    def seed(self):
+        """Hạt giống của ván; cùng seed + cùng nước đi -> cùng obstacle & nước AI."""
+        return self._board.seed
+
     @property
     def board(self) -> Board:
         """Truy cập model Board."""
@@ -0,0 +1,61 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from game_state import GameState
+
+"""
+Sự kiện có kiểu từ GameController
+=====================================================
+Controller không gọi observer ngay cho từng thay đổi mà phát các sự kiện
+dưới đây; chúng được gom (coalesce) thành một GameEventBatch mỗi frame:
+• các ô đổi được gộp thành một diff (ô đổi nhiều lần chỉ giữ giá trị cuối),
+• chỉ giữ trạng thái cuối cùng của ván,
+• vẫn giữ danh sách nước đi để phát âm thanh / log.
+"""
+
+
+class MoveEvent(NamedTuple):
+    """Một nước vừa đánh."""
+    coords: Tuple[int, int]
+    symbol: str
+
+
+class DiffEvent(NamedTuple):
+    """Nhiều ô đổi cùng lúc (undo / redo / seek / shuffle / reset)."""
+    changes: Dict[Tuple[int, int], str]
+
+
+class StateEvent(NamedTuple):
+    """Trạng thái ván hoặc lượt kế tiếp đã đổi."""
+    state: GameState
+    next_turn: Optional[str]
+
+
+class ResetEvent(NamedTuple):
+    """Bắt đầu ván mới trên cùng controller."""
+
+
+GameEvent = Union[MoveEvent, DiffEvent, StateEvent, ResetEvent]
+
+
+class GameEventBatch:
+    """Các sự kiện trong một frame, đã gộp lại."""
+
+    def __init__(self, events: List[GameEvent]) -> None:
+        self.events = events
+        self.moves: List[MoveEvent] = []
+        self.changes: Dict[Tuple[int, int], str] = {}
+        self.state: Optional[StateEvent] = None
+        self.reset = False
+        for ev in events:
+            if isinstance(ev, MoveEvent):
+                self.moves.append(ev)
+                self.changes[ev.coords] = ev.symbol
+            elif isinstance(ev, DiffEvent):
+                self.changes.update(ev.changes)
+            elif isinstance(ev, StateEvent):
+                self.state = ev
+            elif isinstance(ev, ResetEvent):
+                self.reset = True
+
+    def __bool__(self) -> bool:
+        return bool(self.events)
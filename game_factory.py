@@ -1,8 +1,15 @@
+from typing import TYPE_CHECKING, Dict, Optional
+
 from board import Board
 from game_controller import GameController
 from themes import Theme
 from layout import TicTacToeLayout
-from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES
+from game_record import GameRecordWriter
+from scheduler import KivyScheduler
+from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES, GAME_RECORD_PATH, MODE_BOT
+
+if TYPE_CHECKING:
+    from minimax import MinimaxAI
 
 """
 Tạo instance trò chơi hoàn chỉnh
@@ -12,18 +19,57 @@ Cung cấp hàm create_game để sinh:
 2. GameControlle: controller (điều phối lượt & AI)
 3. Theme: chủ đề giao diện (màu, hình ảnh)
 4. TicTacToeLayout: layout Kivy hoàn chỉnh sẵn dùng cho App.
+
+create_controller chỉ sinh Board + GameController để gắn vào layout đã có
+(GameScreen dùng lại layout giữa các ván). MinimaxAI được giữ lại theo độ
+khó nên Zobrist / Q-table không phải dựng lại mỗi ván; close_ai_pool đóng
+chúng khi thoát.
 """
 
+# AI dùng lại giữa các ván, theo độ khó
+_AI_POOL: Dict[str, "MinimaxAI"] = {}
+
+
+def create_controller(mode       : str = "friend",
+                      difficulty : str = "medium",
+                      rows       : int = DEFAULT_ROWS,
+                      cols       : int = DEFAULT_COLS,
+                      win_len    : int = DEFAULT_WIN_LEN,
+                      num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+                      seed       : Optional[int] = None) -> GameController:
+
+    # Một RNG cho cả ván: Board (obstacle) và MinimaxAI dùng chung qua board.rng
+    board    = Board(rows=rows, cols=cols, win_len=win_len,
+                     num_obstacles=num_obstacles, seed=seed)
+    recorder = GameRecordWriter(GAME_RECORD_PATH) if GAME_RECORD_PATH else None
+    ai = None
+    if mode == MODE_BOT:
+        ai = _AI_POOL.get(difficulty)
+        if ai is None:
+            from minimax import MinimaxAI   # import AI lần đầu chơi với máy
+            ai = _AI_POOL[difficulty] = MinimaxAI(difficulty, rng=board.rng)
+    # UI: AI & thông báo observer chạy theo Clock, gom một lần mỗi frame
+    return GameController(board, mode, difficulty, recorder=recorder, ai=ai,
+                          coalesce_frames=True, scheduler=KivyScheduler())
+
+
+def close_ai_pool() -> None:
+    """Đóng và bỏ các AI đã giữ lại (gọi khi thoát ứng dụng)."""
+    for ai in _AI_POOL.values():
+        ai.close()
+    _AI_POOL.clear()
+
+
 def create_game(mode       : str = "friend",
                 difficulty : str = "medium",
                 element    : str = "wood",
                 rows       : int = DEFAULT_ROWS,
                 cols       : int = DEFAULT_COLS,
                 win_len    : int = DEFAULT_WIN_LEN,
-                num_obstacles: int = DEFAULT_NUM_OBSTACLES) -> TicTacToeLayout:
+                num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+                seed       : Optional[int] = None) -> TicTacToeLayout:
 
-    board      = Board(rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles)
-    controller = GameController(board, mode, difficulty)
+    controller = create_controller(mode, difficulty, rows, cols, win_len, num_obstacles, seed)
     Theme.reset()
     theme = Theme.current()
     #theme      = Theme(element)
@@ -1,5 +1,6 @@
-from typing import Tuple, Optional, Protocol
+from typing import Dict, Tuple, Optional, Protocol
 from game_state import GameState
+from game_events import GameEventBatch
 
 """
 Giao diện Observer cho trò chơi
@@ -20,6 +21,23 @@ class GameObserver(Protocol):
         """
         ...
 
+    def on_board_diff(self, changes: Dict[Tuple[int, int], str]) -> None:
+        """(Tuỳ chọn) Được gọi sau undo / redo / seek với các ô đã đổi.
+
+        changes : Dict[Tuple[int, int], str]
+            Toạ độ -> ký hiệu mới; observer không cài đặt hàm này sẽ nhận
+            on_board_change cho từng ô.
+        """
+        ...
+
+    def on_events(self, batch: GameEventBatch) -> None:
+        """(Tuỳ chọn) Nhận mọi sự kiện của một frame đã gộp thành một batch.
+
+        Observer cài đặt hàm này sẽ không nhận các callback lẻ
+        on_board_change / on_board_diff / on_state_change (trừ lúc register).
+        """
+        ...
+
     def on_state_change(self, state: GameState, next_turn: Optional[str]) -> None:
         """Được gọi khi trạng thái ván cờ thay đổi.
 
@@ -0,0 +1,214 @@
+"""
+Lưu & đọc lại ván cờ đã kết thúc
+====================================================
+Định dạng nhị phân append-only, mỗi bản ghi = varint độ dài + payload:
+
+    version | rows | cols | win_len | mode | difficulty | seed
+    | số obstacle | chỉ số ô obstacle... | số nước | (chỉ số ô, µs AI)...
+    | kết quả (GameState.value)
+
+Mọi số nguyên là varint không dấu (LEB128), ô (i, j) lưu dưới dạng
+i * cols + j. Seed có thể âm: lưu zigzag(seed) + 1, 0 = không có seed
+(bản ghi phiên bản 1 lưu seed + 1, vẫn đọc được). Nước đi luân phiên X, O bắt đầu từ X nên không cần lưu ký hiệu.
+Reader duyệt lười từng bản ghi để xử lý hàng triệu ván mà không nạp hết.
+"""
+
+import logging
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from game_state import GameState
+
+logger = logging.getLogger(__name__)
+
+RECORD_VERSION = 2
+_SUPPORTED_VERSIONS = (1, RECORD_VERSION)
+
+
+# ------------------------------------------------------------------ #
+#                              VARINT                                #
+# ------------------------------------------------------------------ #
+def _write_varint(buf: bytearray, value: int) -> None:
+    """Ghi số nguyên không âm dạng LEB128 vào *buf*."""
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _zigzag(value: int) -> int:
+    """Số nguyên có dấu -> không âm: 0, -1, 1, -2... -> 0, 1, 2, 3..."""
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Đọc varint tại *pos*; trả (giá trị, vị trí kế tiếp)."""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_stream_varint(stream: BinaryIO) -> Optional[int]:
+    """Đọc varint trực tiếp từ file; None nếu đã hết file."""
+    result = shift = 0
+    while True:
+        raw = stream.read(1)
+        if not raw:
+            if shift:
+                raise EOFError("Bản ghi bị cắt cụt")
+            return None
+        byte = raw[0]
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result
+        shift += 7
+
+
+# ------------------------------------------------------------------ #
+#                             BẢN GHI                                #
+# ------------------------------------------------------------------ #
+class GameRecord:
+    """Một ván đã kết thúc: cấu hình, seed, obstacle, nước đi, thời gian AI, kết quả."""
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        win_len: int,
+        mode: str,
+        difficulty: str,
+        seed: Optional[int],
+        obstacles: List[Tuple[int, int]],
+        moves: List[Tuple[int, int]],
+        ai_times: List[float],
+        result: GameState,
+    ) -> None:
+        """
+        ai_times : List[float]
+            Thời gian AI (giây) cho từng nước trong *moves*; 0 với nước của người.
+        """
+        self.rows, self.cols, self.win_len = rows, cols, win_len
+        self.mode, self.difficulty = mode, difficulty
+        self.seed      = seed
+        self.obstacles = obstacles
+        self.moves     = moves
+        self.ai_times  = ai_times
+        self.result    = result
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, GameRecord) and vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        return (f"GameRecord({self.rows}x{self.cols}, win_len={self.win_len}, "
+                f"{len(self.moves)} moves, result={self.result.name})")
+
+    # ----------------------- MÃ HOÁ / GIẢI MÃ ------------------------
+    def encode(self) -> bytes:
+        buf = bytearray()
+        for value in (RECORD_VERSION, self.rows, self.cols, self.win_len):
+            _write_varint(buf, value)
+        for text in (self.mode, self.difficulty):
+            raw = text.encode("utf-8")
+            _write_varint(buf, len(raw))
+            buf += raw
+        _write_varint(buf, 0 if self.seed is None else _zigzag(self.seed) + 1)
+
+        _write_varint(buf, len(self.obstacles))
+        for i, j in sorted(self.obstacles):
+            _write_varint(buf, i * self.cols + j)
+
+        _write_varint(buf, len(self.moves))
+        for (i, j), secs in zip(self.moves, self.ai_times):
+            _write_varint(buf, i * self.cols + j)
+            _write_varint(buf, int(round(secs * 1_000_000)))
+
+        _write_varint(buf, self.result.value)
+        return bytes(buf)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "GameRecord":
+        version, pos = _read_varint(data, 0)
+        if version not in _SUPPORTED_VERSIONS:
+            raise ValueError(f"Phiên bản bản ghi không hỗ trợ: {version}")
+        rows, pos = _read_varint(data, pos)
+        cols, pos = _read_varint(data, pos)
+        win_len, pos = _read_varint(data, pos)
+
+        texts = []
+        for _ in range(2):
+            n, pos = _read_varint(data, pos)
+            texts.append(data[pos:pos + n].decode("utf-8"))
+            pos += n
+        seed, pos = _read_varint(data, pos)
+
+        n_obs, pos = _read_varint(data, pos)
+        obstacles = []
+        for _ in range(n_obs):
+            idx, pos = _read_varint(data, pos)
+            obstacles.append(divmod(idx, cols))
+
+        n_moves, pos = _read_varint(data, pos)
+        moves, ai_times = [], []
+        for _ in range(n_moves):
+            idx, pos = _read_varint(data, pos)
+            micros, pos = _read_varint(data, pos)
+            moves.append(divmod(idx, cols))
+            ai_times.append(micros / 1_000_000)
+
+        result, pos = _read_varint(data, pos)
+        if seed == 0:
+            seed = None
+        else:
+            seed = seed - 1 if version == 1 else _unzigzag(seed - 1)
+        return cls(rows, cols, win_len, texts[0], texts[1], seed,
+                   obstacles, moves, ai_times, GameState(result))
+
+
+# ------------------------------------------------------------------ #
+#                          WRITER / READER                           #
+# ------------------------------------------------------------------ #
+class GameRecordWriter:
+    """Ghi nối tiếp (append-only) các ván vào một file nhị phân."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def write(self, record: GameRecord) -> None:
+        """Ghi một bản ghi; lỗi IO chỉ được log để không làm hỏng ván chơi."""
+        payload = record.encode()
+        header = bytearray()
+        _write_varint(header, len(payload))
+        try:
+            with open(self._path, "ab") as f:
+                f.write(bytes(header) + payload)
+        except OSError as exc:
+            logger.warning(f"Không ghi được bản ghi ván vào {self._path}: {exc}")
+
+
+def iter_records(source) -> Iterator[GameRecord]:
+    """Duyệt lười các bản ghi từ đường dẫn hoặc file nhị phân đã mở."""
+    if isinstance(source, (str, bytes)) or hasattr(source, "__fspath__"):
+        with open(source, "rb") as f:
+            yield from iter_records(f)
+        return
+
+    while True:
+        size = _read_stream_varint(source)
+        if size is None:
+            return
+        payload = source.read(size)
+        if len(payload) < size:
+            raise EOFError("Bản ghi bị cắt cụt")
+        yield GameRecord.decode(payload)
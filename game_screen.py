@@ -11,13 +11,19 @@ from kivy.uix.button import Button
 from kivy.app import App
 
 from utils import style_round_button, enable_press_darken, enable_click_sound
-from game_factory import create_game
+from game_factory import create_game, create_controller
+from themes import Theme
 from game_config import (
     BTN_RGBA,            
     BACK_LABEL,          
     DEFAULT_FONT,        
     BACK_BTN_W,          
     BACK_BTN_H,          
+    DEFAULT_DIFFICULTY,
+    DEFAULT_ROWS,
+    DEFAULT_COLS,
+    DEFAULT_WIN_LEN,
+    DEFAULT_NUM_OBSTACLES,
 )
 
 # ------------------------------------------------------------------ #
@@ -31,11 +37,11 @@ class GameScreen(Screen):
     def __init__(
         self,
         mode: str,
-        difficulty: str = "medium",
-        rows: int = 5,
-        cols: int = 5,
-        win_len: int = 4,
-        num_obstacles: int = 5,
+        difficulty: str = DEFAULT_DIFFICULTY,
+        rows: int = DEFAULT_ROWS,
+        cols: int = DEFAULT_COLS,
+        win_len: int = DEFAULT_WIN_LEN,
+        num_obstacles: int = DEFAULT_NUM_OBSTACLES,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -68,6 +74,28 @@ class GameScreen(Screen):
         self.add_widget(back_btn)
 
     # ----------------------- PUBLIC METHOD ---------------------------
+    def configure(
+        self,
+        mode: str,
+        difficulty: str = DEFAULT_DIFFICULTY,
+        rows: int = DEFAULT_ROWS,
+        cols: int = DEFAULT_COLS,
+        win_len: int = DEFAULT_WIN_LEN,
+        num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+    ) -> None:
+        """Dùng lại màn & layout cho ván mới với cấu hình mới."""
+        controller = create_controller(
+            mode,
+            difficulty,
+            rows=rows,
+            cols=cols,
+            win_len=win_len,
+            num_obstacles=num_obstacles,
+        )
+        self.game_widget.bind_controller(controller)
+        self.game_widget.apply_theme(Theme.reset())
+
+
     def apply_theme(self, theme):
         """Truyền theme mới xuống `TicTacToeLayout`."""
         if hasattr(self, "game_widget") and hasattr(self.game_widget, "apply_theme"):
@@ -0,0 +1,302 @@
+"""
+Server nhiều ván cờ trên asyncio
+=========================================================
+Một tiến trình giữ hàng nghìn ván cùng lúc trong bộ nhớ, mỗi ván là một
+GameController (chế độ 2 người, không Kivy) bọc trong _Session nhỏ gọn.
+Nước AI được tính qua AIService (ProcessPool cố định, gộp yêu cầu trùng,
+cache LRU giữa các ván):
+
+• Mỗi request có ngân sách thời gian (MinimaxAI.time_limit + thời gian chờ
+  tối đa); quá hạn thì đánh nước hợp lệ đầu tiên và đếm vào `timeouts`.
+• Hàng đợi bị chặn ở `max_pending`: đầy thì trả lỗi "busy" (backpressure)
+  thay vì để độ trễ tăng vô hạn.
+• Kích thước bàn / win_len / số obstacle bị chặn (MAX_BOARD, MIN_WIN_LEN):
+  tham số sai trả lỗi thay vì cấp phát bàn khổng lồ.
+
+Giao thức: TCP, mỗi dòng một JSON.
+
+    → {"op": "new", "rows": 7, "cols": 7, "win_len": 4, "obstacles": 5,
+       "difficulty": "medium", "seed": 1}
+    ← {"ok": true, "game": 1, "seed": 1, "obstacles": [[r, c], ...]}
+    → {"op": "move", "game": 1, "row": 3, "col": 3}
+    ← {"ok": true, "ai": [r, c] | null, "state": "IN_PROGRESS"}
+    → {"op": "close", "game": 1}          ← {"ok": true}   (chỉ ván của kết nối này)
+    → {"op": "stats"}                     ← {"ok": true, "stats": {...}}
+
+    python game_server.py --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from ai_profiles import get_profile
+from ai_service import DEFAULT_AI_BUDGET, AIService
+from board import Board
+from game_controller import GameController
+from game_state import GameState
+from game_config import (
+    DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES,
+    DEFAULT_AI_LEVEL, MODE_FRIEND,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT        = 8765
+DEFAULT_MAX_GAMES   = 10_000
+DEFAULT_MAX_PENDING = 256      # Số request AI tối đa đang chờ / chạy
+BUDGET_GRACE        = 1.0      # Giây chờ thêm (xếp hàng + IPC) trước khi bỏ
+LATENCY_WINDOW      = 10_000   # Số mẫu độ trễ giữ lại để tính percentile
+MAX_BOARD           = 30       # Cạnh bàn lớn nhất client được tạo
+MIN_WIN_LEN         = 3
+
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Percentile *q* (0..100) theo nearest-rank; 0 nếu chưa có mẫu."""
+    data = sorted(samples)
+    if not data:
+        return 0.0
+    rank = max(0, min(len(data) - 1, math.ceil(q / 100 * len(data)) - 1))
+    return data[rank]
+
+
+# ------------------------------------------------------------------ #
+#                               SESSION                              #
+# ------------------------------------------------------------------ #
+class _Session:
+    """Trạng thái một ván trên server (không observer, không Kivy)."""
+    __slots__ = ("controller", "difficulty", "busy")
+
+    def __init__(self, controller: GameController, difficulty: str):
+        self.controller = controller
+        self.difficulty = difficulty
+        self.busy       = False           # Đang chờ nước AI
+
+
+class ServerMetrics:
+    """Bộ đếm hàng đợi / độ trễ; snapshot() trả dict để gửi qua giao thức."""
+
+    def __init__(self) -> None:
+        self.pending      = 0
+        self.peak_pending = 0
+        self.ai_requests  = 0
+        self.rejected     = 0
+        self.timeouts     = 0
+        self.ai_latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self, games: int) -> Dict[str, float]:
+        lat = list(self.ai_latency)
+        return {
+            "games": games,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "ai_requests": self.ai_requests,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "ai_p50_ms": round(percentile(lat, 50) * 1000, 2),
+            "ai_p99_ms": round(percentile(lat, 99) * 1000, 2),
+        }
+
+
+class ServerError(Exception):
+    """Lỗi trả về client dưới dạng {"ok": false, "error": ...}."""
+
+
+# ------------------------------------------------------------------ #
+#                              GAME SERVER                           #
+# ------------------------------------------------------------------ #
+class GameServer:
+    def __init__(self, executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 max_games: int = DEFAULT_MAX_GAMES, max_pending: int = DEFAULT_MAX_PENDING,
+                 ai_budget: float = DEFAULT_AI_BUDGET, ai_service: Optional[AIService] = None) -> None:
+        """
+        executor : Optional[Executor]
+            Nơi chạy MinimaxAI (None = ProcessPoolExecutor với *workers* tiến trình).
+        ai_service : Optional[AIService]
+            Dịch vụ AI dùng chung (None = tạo mới từ executor / workers / ai_budget).
+        max_games : int
+            Số ván giữ đồng thời; vượt quá thì từ chối "new".
+        max_pending : int
+            Số request AI tối đa đang chờ; vượt quá thì trả "busy".
+        ai_budget : float
+            Ngân sách suy nghĩ (giây) cho mỗi nước AI.
+        """
+        self._ai = ai_service or AIService(workers, executor, time_budget=ai_budget)
+        self._max_games   = max_games
+        self._max_pending = max_pending
+        self._ai_budget   = ai_budget
+        self._sessions: Dict[int, _Session] = {}
+        self._ids = itertools.count(1)
+        self.metrics = ServerMetrics()
+
+    # ----------------------------- MẠNG -----------------------------
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle_client, host, port)
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        owned: List[int] = []                # Ván của kết nối này, đóng khi ngắt
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.handle_line(line, owned)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass                             # Client ngắt / server đang tắt
+        finally:
+            for game_id in owned:
+                self._sessions.pop(game_id, None)
+            writer.close()
+
+    async def handle_line(self, line: bytes, owned: Optional[List[int]] = None) -> dict:
+        """Xử lý một dòng request, luôn trả một dict trả lời."""
+        try:
+            req = json.loads(line)
+            op = req.get("op")
+            if op == "new":
+                reply = self.new_game(req)
+                if owned is not None:
+                    owned.append(reply["game"])
+                return reply
+            if op == "move":
+                return await self.move(req)
+            if op == "close":
+                game_id = req.get("game")
+                if owned is not None:
+                    if game_id not in owned:     # Chỉ đóng ván của chính kết nối này
+                        raise ServerError("unknown game")
+                    owned.remove(game_id)
+                self._sessions.pop(game_id, None)
+                return {"ok": True}
+            if op == "stats":
+                stats = self.metrics.snapshot(len(self._sessions))
+                stats["ai"] = self._ai.stats()
+                return {"ok": True, "stats": stats}
+            raise ServerError(f"unknown op {op!r}")
+        except ServerError as exc:
+            return {"ok": False, "error": str(exc)}
+        except (ValueError, TypeError, KeyError, AttributeError) as exc:
+            return {"ok": False, "error": f"bad request: {exc}"}
+
+    # ----------------------------- LỆNH -----------------------------
+    def new_game(self, req: dict) -> dict:
+        if len(self._sessions) >= self._max_games:
+            raise ServerError("server full")
+        rows, cols = int(req.get("rows", DEFAULT_ROWS)), int(req.get("cols", DEFAULT_COLS))
+        win_len = int(req.get("win_len", DEFAULT_WIN_LEN))
+        num_obstacles = int(req.get("obstacles", DEFAULT_NUM_OBSTACLES))
+        # Tham số đến từ mạng: chặn trước khi cấp phát bàn
+        if not (1 <= rows <= MAX_BOARD and 1 <= cols <= MAX_BOARD):
+            raise ServerError(f"board must be 1..{MAX_BOARD} on each side")
+        if not MIN_WIN_LEN <= win_len <= max(rows, cols):
+            raise ServerError(f"win_len must be {MIN_WIN_LEN}..{max(rows, cols)}")
+        if not 0 <= num_obstacles < rows * cols:
+            raise ServerError("obstacles must leave at least one free cell")
+        # Tên lạ sẽ thành AI ngẫu nhiên + một MinimaxAI thừa trong mỗi worker;
+        # hồ sơ không listed (vd. "mcts") không dành cho người chơi
+        difficulty = req.get("difficulty", DEFAULT_AI_LEVEL)
+        profile = get_profile(difficulty) if isinstance(difficulty, str) else None
+        if profile is None or not profile.listed:
+            raise ServerError(f"unknown difficulty {difficulty!r}")
+        board = Board(rows, cols, win_len, num_obstacles, seed=req.get("seed"))
+        game_id = next(self._ids)
+        self._sessions[game_id] = _Session(GameController(board, MODE_FRIEND), difficulty)
+        return {"ok": True, "game": game_id, "seed": board.seed,
+                "obstacles": sorted(board.obstacles)}
+
+    async def move(self, req: dict) -> dict:
+        session = self._sessions.get(req["game"])
+        if session is None:
+            raise ServerError("unknown game")
+        if session.busy:
+            raise ServerError("AI is thinking")
+        ctrl = session.controller
+        before = ctrl.board.history_len
+        ctrl.play(int(req["row"]), int(req["col"]))
+        if ctrl.board.history_len == before:
+            raise ServerError("illegal move")
+
+        ai_move = None
+        if ctrl.state is GameState.IN_PROGRESS:
+            session.busy = True
+            try:
+                ai_move = await self._ai_move(session)
+            finally:
+                session.busy = False
+            ctrl.play(*ai_move)
+        return {"ok": True, "ai": ai_move, "state": ctrl.state.name}
+
+    async def _ai_move(self, session: _Session) -> Tuple[int, int]:
+        m = self.metrics
+        if m.pending >= self._max_pending:
+            m.rejected += 1
+            session.controller.undo()            # Trả lại nước người để client gửi lại
+            raise ServerError("busy")
+        m.pending += 1
+        m.peak_pending = max(m.peak_pending, m.pending)
+        m.ai_requests += 1
+        ctrl = session.controller
+        b = ctrl.board
+        ai_sym = ctrl.current_player
+        t0 = time.perf_counter()
+        try:
+            fut = asyncio.wrap_future(self._ai.submit(b, ai_sym, session.difficulty))
+            # shield: Future có thể dùng chung với ván khác (dedup), không huỷ khi quá hạn
+            return tuple(await asyncio.wait_for(asyncio.shield(fut), self._ai_budget + BUDGET_GRACE))
+        except asyncio.TimeoutError:
+            m.timeouts += 1
+            return min(b.get_legal_moves())
+        except Exception as exc:
+            ctrl.undo()                          # Như "busy": không để ván kẹt ở lượt AI
+            raise ServerError(f"AI failed: {exc}") from exc
+        finally:
+            m.pending -= 1
+            m.ai_latency.append(time.perf_counter() - t0)
+
+    def close(self) -> None:
+        self._ai.close()
+
+
+# ------------------------------------------------------------------ #
+#                                 CLI                                #
+# ------------------------------------------------------------------ #
+async def _run(args: argparse.Namespace) -> None:
+    server = GameServer(workers=args.workers, max_games=args.max_games,
+                        max_pending=args.max_pending, ai_budget=args.budget)
+    tcp = await server.serve(args.host, args.port)
+    print(f"Listening on {args.host}:{args.port}")
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        server.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--max-games", type=int, default=DEFAULT_MAX_GAMES)
+    ap.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING)
+    ap.add_argument("--budget", type=float, default=DEFAULT_AI_BUDGET, help="giây cho mỗi nước AI")
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)   # engine bật DEBUG khi import
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
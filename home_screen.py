@@ -8,11 +8,13 @@ from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.app import App
 from kivy.uix.textinput import TextInput
+from ai_profiles import listed_profiles
+from texture_cache import get_texture, image_variant
 from utils import style_round_button, style_round_texture_widget, style_round_widget, enable_press_darken, enable_click_sound
 from kivy.core.window import Window
 from kivy.graphics import Rectangle
 from kivy.uix.scrollview import ScrollView
-from game_config import FONT_BOLD, FONT_LOBSTER, BG_ERROR, SELECT_DIF, BTN_BOT, BTN_FRIEND, TITLE_FS, SETTING_FS, BUTTON_FS
+from game_config import MODE_BOT, DEFAULT_BG_IMAGE, FONT_BOLD, FONT_LOBSTER, BG_ERROR, SELECT_DIF, BTN_BOT, BTN_FRIEND, TITLE_FS, SETTING_FS, BUTTON_FS
 from kivy.metrics import dp
 
 """
@@ -30,7 +32,8 @@ class HomeScreen(Screen):
         # --- NỀN -------------------------------------------------------
         root = FloatLayout()
         with root.canvas.before:
-            self.bg = Rectangle(source='assets/wood/bg.png', pos=root.pos, size=root.size)
+            self.bg = Rectangle(texture=get_texture(image_variant(DEFAULT_BG_IMAGE, max(Window.size))),
+                                pos=root.pos, size=root.size)
         root.bind(size=self._update_bg, pos=self._update_bg)
         
         main_layout = BoxLayout(orientation='vertical', padding=50, spacing=30)
@@ -126,7 +129,7 @@ class HomeScreen(Screen):
         # Bo góc + màu
         style_round_texture_widget(
             vs_bot_btn,
-            image_path=BTN_BOT,
+            image_path=image_variant(BTN_BOT, Window.width),
             radius=12
         )
         # Hiệu ứng nhấn làm tối đi + âm thanh
@@ -147,7 +150,7 @@ class HomeScreen(Screen):
         )
         style_round_texture_widget(
             vs_friend_btn,
-            image_path=BTN_FRIEND,
+            image_path=image_variant(BTN_FRIEND, Window.width),
             radius=12
         )
         enable_press_darken(vs_friend_btn, factor=0.5)
@@ -194,18 +197,20 @@ class HomeScreen(Screen):
             title_font= FONT_BOLD,
             content=content,
             size_hint=(0.7, 0.4),
-            background=SELECT_DIF,
+            background=image_variant(SELECT_DIF, Window.width * 0.7),
             title_color=(1,1,1,1),
             title_align='center',
             title_size='28sp' 
         )
         
+        profiles = listed_profiles()
+
         def create_popup_button(caption: str, diff_level: str) -> Button:
             btn = Button(
                 text=caption,
                 markup=True,                 
                 font_size='20sp',
-                size_hint=(1, .3),
+                size_hint=(1, .9 / len(profiles)),
                 color=(0, 0, 0, .7),          
                 background_normal='',        
                 background_down='',
@@ -220,10 +225,9 @@ class HomeScreen(Screen):
 
         popup.separator_color = (1, 0.6, 0.2, 1)
 
-        # -------- 3 nút --------
-        content.add_widget(create_popup_button('[b]Easy[/b]',   'easy'))
-        content.add_widget(create_popup_button('[b]Medium[/b]', 'medium'))
-        content.add_widget(create_popup_button('[b]Hard[/b]',   'hard'))
+        # -------- mỗi hồ sơ độ khó một nút (ai_profiles) --------
+        for name in profiles:
+            content.add_widget(create_popup_button(f'[b]{name.title()}[/b]', name))
 
         popup.open()
     
@@ -258,14 +262,28 @@ class HomeScreen(Screen):
             if num_obstacles >= (rows * cols): # Đảm bảo còn ít nhất 1 ô trống để chơi
                  self._show_error_popup("Lỗi logic", "Số chướng ngại vật quá lớn, không đủ ô trống để chơi.")
                  return
-
             # Truyền các tham số mới này khi bắt đầu game
-            app.start_game(mode, difficulty, rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles)
+            def launch(*_):
+                app.start_game(mode, difficulty, rows=rows, cols=cols, win_len=win_len, num_obstacles=num_obstacles)
+
+            # Chơi với máy trên cấu hình (không obstacle) đã được pn_solver.py
+            # chứng minh là thắng chắc: chỉ cảnh báo, người chơi vẫn chơi tiếp được
+            if mode == MODE_BOT and num_obstacles == 0:
+                from pn_solver import RESULT_DRAW, get_proofs   # nạp khi bấm chơi, không lúc khởi động
+                winner = get_proofs().result(rows, cols, win_len)
+                if winner not in (None, RESULT_DRAW):
+                    self._show_error_popup("Cấu hình không cân bằng",
+                                           f"Bàn {rows}x{cols}, thắng {win_len} ô: {winner} luôn thắng nếu đánh đúng. "
+                                           "Có thể đổi kích thước, độ dài thắng hoặc thêm chướng ngại vật.",
+                                           on_continue=launch)
+                    return
+            launch()
 
     # ------------------------------------------------------------------ #
     #                           POPUP ERROR                              #
     # ------------------------------------------------------------------ #
-    def _show_error_popup(self, title, message):
+    def _show_error_popup(self, title, message, on_continue=None):
+        """Popup báo lỗi; có *on_continue* thì là cảnh báo kèm nút "Vẫn chơi"."""
         # ------ Layout gốc của popup ------
         content = BoxLayout(orientation='vertical',
                             spacing=dp(10),
@@ -322,7 +340,24 @@ class HomeScreen(Screen):
         style_round_button(close_btn, rgba=(0, 0, 0, .7), radius=10)
         enable_press_darken(close_btn, factor=0.5)
         enable_click_sound(close_btn) 
-        content.add_widget(close_btn)
+        if on_continue is None:
+            content.add_widget(close_btn)
+        else:
+            close_btn.text = '[b]Quay lại[/b]'
+            continue_btn = Button(
+                text='[b]Vẫn chơi[/b]',
+                markup=True,
+                color=(.9, .9, .9, 1)
+            )
+            style_round_button(continue_btn, rgba=(0, 0, 0, .7), radius=10)
+            enable_press_darken(continue_btn, factor=0.5)
+            enable_click_sound(continue_btn)
+            close_btn.size_hint = (1, 1)
+            buttons = BoxLayout(orientation='horizontal', spacing=dp(10),
+                                size_hint=(1, None), height=dp(40))
+            buttons.add_widget(close_btn)
+            buttons.add_widget(continue_btn)
+            content.add_widget(buttons)
 
         # ------ Tạo và mở Popup ------
         popup = Popup(
@@ -333,9 +368,11 @@ class HomeScreen(Screen):
             separator_color=(1, 0, 0, 1),
             content=content,
             size_hint=(0.7, 0.3),
-            background=BG_ERROR,
+            background=image_variant(BG_ERROR, Window.width * 0.7),
             auto_dismiss=False
         )
 
         close_btn.bind(on_release=popup.dismiss)
+        if on_continue is not None:
+            continue_btn.bind(on_release=lambda *_: (popup.dismiss(), on_continue()))
         popup.open()
@@ -9,14 +9,17 @@ from kivy.graphics import Rectangle
 from kivy.properties import StringProperty
 
 from board_widget    import BoardWidget
+from canvas_board_widget import CanvasBoardWidget
 from board           import Board
 from game_controller import GameController
 from game_state      import GameState
+from game_events     import GameEventBatch
 from themes          import Theme
 from sound_manager   import SoundManager
+from texture_cache   import get_texture, image_variant
 from utils           import style_round_button, enable_press_darken, enable_click_sound
 from game_config     import (
-    DIM_ALPHA, BTN_RGBA, BTN_W, BTN_H, FONT_BOLD,
+    DIM_ALPHA, BTN_RGBA, BTN_W, BTN_H, FONT_BOLD, CANVAS_RENDER_MIN_CELLS,
     STATUS_X_TURN, STATUS_X_WIN, STATUS_O_WIN, STATUS_DRAW,
 ) 
 
@@ -24,7 +27,7 @@ from game_config     import (
 Layout tổng hợp cho một ván cờ
 ========================================================
 Gồm:
-• BoardWidget (view bàn cờ)
+• BoardWidget / CanvasBoardWidget (view bàn cờ; lưới lớn dùng canvas)
 • 3 nút điều khiển (Restart, Shuffle Obstacles, Undo)
 • Nhãn trạng thái (ai tới lượt, ai thắng, hoà)
 • Observer lắng nghe thay đổi từ GameController
@@ -78,22 +81,22 @@ class TicTacToeLayout(FloatLayout):
         super().__init__(**kw)
         self._controller, self._board = controller, controller._board
         self._state = GameState.IN_PROGRESS
-        self._sounds = SoundManager()
+        self._finished_shown = False          # Bàn đang hiển thị trạng thái "kết thúc"?
+        self._sounds = SoundManager.shared()
+        self._sounds.play_bg()
         self._theme = theme
 
         # --- Background --------------------------------------------
         with self.canvas.before:
-            self._bg = Rectangle(source=theme.bg, pos=self.pos, size=self.size)
+            self._bg = Rectangle(texture=self._bg_texture(theme), pos=self.pos, size=self.size)
         self.bind(size=self._sync_bg, pos=self._sync_bg)
 
         # --- Khung trung tâm chứa BoardWidget ----------------------
         self._frame = FloatLayout(size_hint=(None, None))
         self.add_widget(self._frame)
 
-        self._grid = BoardWidget(self._board, on_cell_cb=self._controller.play)
-        self._grid.pos_hint = {"center_x": .5, "center_y": .5}
-        self._frame.add_widget(self._grid)
-        self._grid.reset(self._board)
+        self._grid = None
+        self._build_grid()
 
         # --- Nhãn trạng thái dưới cùng -----------------------------
         self._status_lbl = Label(
@@ -116,20 +119,70 @@ class TicTacToeLayout(FloatLayout):
         self._undo_btn   = self._UndoBtn(self._undo_move);   self.add_widget(self._undo_btn)
 
         # --- Geometry ---------------------------------------------
-        Window.bind(on_resize=lambda *_: self._update_geometry())
+        Window.bind(on_resize=self._update_geometry)
         self._update_geometry()
 
         # --- Đăng ký lắng nghe controller -------------------------
         self._controller.register(self)
 
+    # ------------------------------------------------------------------ #
+    #                        TÁI SỬ DỤNG LAYOUT                          #
+    # ------------------------------------------------------------------ #
+    def bind_controller(self, controller: GameController) -> None:
+        """
+        Gắn ván mới vào layout sẵn có: giữ nguyên nút/nhãn, chỉ dựng lại
+        BoardWidget khi kích thước (rows, cols) hoặc loại renderer thay đổi.
+        """
+        self._controller.close()
+        self._controller, self._board = controller, controller._board
+        self._state = GameState.IN_PROGRESS
+        self._sounds.play_bg()
+
+        if self._grid_fits(self._board):
+            self._grid.reset(self._board)
+        else:
+            self._build_grid()
+            if self._finished_shown:          # Lưới mới khớp trạng thái đang hiển thị
+                self._dim_board(True)
+        self._controller.register(self)
+
+    def dispose(self) -> None:
+        """Gỡ mọi handler của Window và ngắt controller khi bỏ hẳn layout."""
+        Window.unbind(on_resize=self._update_geometry)
+        self._grid.dispose()
+        self._controller.close()
+
+    def _renderer_for(self, board: Board):
+        if board.rows * board.cols >= CANVAS_RENDER_MIN_CELLS:
+            return CanvasBoardWidget
+        return BoardWidget
+
+    def _grid_fits(self, board: Board) -> bool:
+        return (type(self._grid) is self._renderer_for(board)
+                and (self._grid.rows, self._grid.cols) == (board.rows, board.cols))
+
+    def _build_grid(self) -> None:
+        """(Re)tạo view bàn cờ; widget cũ được gỡ handler trước khi bỏ."""
+        if self._grid is not None:
+            self._grid.dispose()
+            self._frame.remove_widget(self._grid)
+        self._grid = self._renderer_for(self._board)(self._board, on_cell_cb=self._on_cell)
+        self._grid.pos_hint = {"center_x": .5, "center_y": .5}
+        self._frame.add_widget(self._grid)
+        self._grid.reset(self._board)
+
+    def _on_cell(self, row: int, col: int) -> None:
+        """Chuyển click tới controller hiện tại (controller đổi giữa các ván)."""
+        self._controller.play(row, col)
+
     # ------------------------------------------------------------------ #
     #                          THEME UPDATE                              #
     # ------------------------------------------------------------------ #
     def apply_theme(self, theme):
         """Controller gọi khi chuyển theme mới."""
         self._theme = theme
-        self._bg.source = theme.bg           
-        self._grid.reset(self._board)   
+        self._bg.texture = self._bg_texture(theme)
+        self._grid.refresh_theme()
 
     # ------------------------------------------------------------------ #
     #                     OBSERVER CALLBACKS (Model → View)              #
@@ -139,29 +192,47 @@ class TicTacToeLayout(FloatLayout):
         self._sounds.play_tap()
         self._update_undo_btn()
 
+    def on_board_diff(self, changes):
+        """Undo / redo / seek / reset / shuffle: chỉ vẽ lại các ô thay đổi."""
+        self._grid.apply_diff(changes)
+        self._update_undo_btn()
+
+    def on_events(self, batch: GameEventBatch):
+        """Một batch mỗi frame: vẽ diff đã gộp, một tiếng tap, trạng thái cuối."""
+        if batch.changes:
+            self._grid.apply_diff(batch.changes)
+        if batch.moves:
+            self._sounds.play_tap()
+        if batch.state is not None:
+            self.on_state_change(batch.state.state, batch.state.next_turn)
+        else:
+            self._update_undo_btn()
+
     def on_state_change(self, state: GameState, next_turn: Optional[str]):
         msg = {
             GameState.X_WON: STATUS_X_WIN,
             GameState.O_WON: STATUS_O_WIN,
             GameState.DRAW : STATUS_DRAW,
         }.get(state, f"[b]{next_turn}'s turn[/b]")
-        self._status_lbl.text = msg
+        if self._status_lbl.text != msg:
+            self._status_lbl.text = msg
 
+        # Chỉ xử lý nút / khoá bàn khi chuyển giữa đang chơi <-> kết thúc
         finished = state in (GameState.X_WON, GameState.O_WON, GameState.DRAW)
-        if finished:
-            self._sounds.play_win() if state != GameState.DRAW else self._sounds.play_draw()
-            self._restart_btn.disabled, self._restart_btn.opacity = False, 1
-            self._shuffle_btn.disabled = True
-        else:
-            self._restart_btn.disabled, self._restart_btn.opacity = True, DIM_ALPHA
-            self._shuffle_btn.disabled = False
-
-        # ▼ Khoá / mở các ô trên bàn cờ
-        for cell in self._grid._cells.values():    
-            cell.disabled = finished               
-        self._dim_board(finished)
-
-        self._state = state          
+        if finished != self._finished_shown:
+            self._finished_shown = finished
+            if finished:
+                self._sounds.play_win() if state != GameState.DRAW else self._sounds.play_draw()
+                self._restart_btn.disabled, self._restart_btn.opacity = False, 1
+                self._shuffle_btn.disabled = True
+            else:
+                self._restart_btn.disabled, self._restart_btn.opacity = True, DIM_ALPHA
+                self._shuffle_btn.disabled = False
+
+            # ▼ Khoá / mở các ô trên bàn cờ
+            self._dim_board(finished)
+
+        self._state = state
         self._update_undo_btn()
 
     # ------------------------------------------------------------------ #
@@ -169,10 +240,7 @@ class TicTacToeLayout(FloatLayout):
     # ------------------------------------------------------------------ #
     def _dim_board(self, dim: bool):
             """Mờ / hiện rõ toàn bộ ô trên bàn cờ + khóa hoặc mở click."""
-            alpha = DIM_ALPHA if dim else 1
-            for cell in self._grid._cells.values():
-                cell.disabled = dim
-                cell.opacity  = alpha
+            self._grid.set_locked(dim, DIM_ALPHA if dim else 1)
 
     def _update_undo_btn(self):
         """Bật / tắt Undo tùy vào trạng thái ván và lịch sử nước đi."""
@@ -188,23 +256,18 @@ class TicTacToeLayout(FloatLayout):
         self._theme = Theme.next_theme()
 
         # 2) Cập nhật background
-        self._bg.source = self._theme.bg
+        self._bg.texture = self._bg_texture(self._theme)
 
-        # 3) Reset logic & khung cờ như cũ
+        # 3) Reset logic: controller gửi diff các ô đổi + trạng thái mới
+        #    (mở khoá bàn, nút, nhãn), rồi vẽ lại ô còn theme cũ
         self._controller.reset()
-        self._grid.reset(self._board)   # XOCell sẽ tự lấy Theme.current()
-        self._dim_board(False)
-        # 4) Khôi phục trạng thái nút / nhãn
-        self._restart_btn.disabled, self._restart_btn.opacity = True, DIM_ALPHA
-        self._shuffle_btn.disabled = False
-        self._status_lbl.text = "[b]X's turn[/b]"
+        self._grid.refresh_theme()
 
     def _shuffle_obstacles(self):
-        self._controller.reshuffle_obstacles(); self._grid.reset(self._board)
+        self._controller.reshuffle_obstacles()
 
     def _undo_move(self):
         self._controller.undo()
-        self._grid.reset(self._board)
         self._update_undo_btn()
 
     # ------------------------------------------------------------------ #
@@ -217,4 +280,9 @@ class TicTacToeLayout(FloatLayout):
         y = (win_h - side) / 2
         self._frame.size, self._frame.pos = (side, side), (x, y)
 
+    @staticmethod
+    def _bg_texture(theme):
+        """Nền theme ở bản thu nhỏ vừa cửa sổ (nếu đã build asset)."""
+        return get_texture(image_variant(theme.bg, max(Window.size)))
+
     def _sync_bg(self, *_): self._bg.pos, self._bg.size = self.pos, self.size
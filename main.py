@@ -1,4 +1,14 @@
+import sys
+
+import startup_profile
+
+# Tách cờ riêng trước khi Kivy đọc sys.argv (Kivy báo lỗi với option lạ)
+if "--profile-startup" in sys.argv:
+    sys.argv.remove("--profile-startup")
+    startup_profile.enable()
+
 from tic_tac_toe_app import TicTacToeApp
+startup_profile.mark("import app (kivy + home)")
 
 if __name__ == "__main__":
     TicTacToeApp().run()
@@ -0,0 +1,400 @@
+"""
+Monte Carlo Tree Search cho bàn lớn
+=========================================================
+Trên bàn 15x15 trở lên, alpha-beta với hàm đánh giá viết tay hiếm khi qua
+được độ sâu 2 trong thời gian cho phép. MCTSEngine là backend thứ hai của
+MinimaxAI (hồ sơ có strategy "mcts", xem ai_profiles):
+
+• UCT + progressive widening: mỗi nút chỉ mở thêm con khi đủ lượt thăm
+  (1 + widening * visits ** widening_power), theo thứ tự ưu tiên của các ô
+  lân cận (cách quân đã đánh tối đa NEIGHBOURHOOD ô).
+• Playout theo lô (playout_batch ván / lá) trên bản sao gọn của bàn: danh
+  sách ký hiệu ô + bộ đếm quân theo đoạn thắng (như Board). Playout
+  "heuristic" thắng ngay / chặn ngay nếu có, còn lại đánh ngẫu nhiên;
+  "random" đánh ngẫu nhiên hoàn toàn.
+• Cây được giữ giữa các nước: lần tìm sau bắt đầu từ nút con ứng với nước
+  của đối thủ nếu thế cờ khớp (stats["reused"] = lượt thăm giữ lại).
+• mcts_workers > 1: playout chạy song song trên ProcessPool (leaf
+  parallelism, virtual loss để các lá đang chờ không bị chọn lại).
+
+Kết quả phụ thuộc thời gian / tiến trình nên AIService không cache nước
+của hồ sơ này. Hồ sơ có sẵn "mcts" (ai_profiles.BUILTIN_PROFILES, listed=False:
+không hiện như một mức độ khó cho người chơi) chỉnh được qua ai_profiles.json, vd.
+
+    {"mcts": {"time_budget": 1.0, "mcts_workers": 4}}
+
+rồi so với "hard" bằng tournament.py.
+"""
+
+import logging
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from ai_profiles import PLAYOUT_HEURISTIC, DifficultyProfile
+from board import Board
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOURHOOD = 2               # Ứng viên: ô trống cách quân gần nhất <= 2 ô
+MAX_GEOMETRIES = 8              # Số dạng bàn (kể cả obstacle) giữ trong cache
+
+
+# ------------------------------------------------------------------ #
+#                     BÀN GỌN DÙNG CHO PLAYOUT                       #
+# ------------------------------------------------------------------ #
+class _Geometry:
+    """Đoạn thắng của một bàn (kích thước + obstacle): ô -> đoạn, đoạn -> ô."""
+    __slots__ = ("rows", "cols", "win_len", "cell_segs", "seg_cells", "neighbours")
+
+    def __init__(self, board: Board):
+        self.rows, self.cols, self.win_len = board.rows, board.cols, board._win_len
+        self.cell_segs = board._cell_segs
+        seg_cells: List[List[int]] = [[] for _ in range(board._n_segs)]
+        for idx, segs in enumerate(self.cell_segs):
+            for s in segs:
+                seg_cells[s].append(idx)
+        self.seg_cells = [tuple(cells) for cells in seg_cells]
+        rows, cols = self.rows, self.cols
+        self.neighbours = [
+            tuple(i * cols + j
+                  for i in range(max(0, r - NEIGHBOURHOOD), min(rows, r + NEIGHBOURHOOD + 1))
+                  for j in range(max(0, c - NEIGHBOURHOOD), min(cols, c + NEIGHBOURHOOD + 1))
+                  if (i, j) != (r, c))
+            for r in range(rows) for c in range(cols)]
+
+
+_GEOMETRIES: Dict[Tuple[int, int, int, Tuple[int, ...]], _Geometry] = {}
+
+
+def _geometry(rows: int, cols: int, win_len: int, cells: List[str]) -> _Geometry:
+    """_Geometry của bàn *cells* (dùng chung giữa các lần tìm / playout)."""
+    obstacles = tuple(i for i, v in enumerate(cells) if v == Board.OBSTACLE)
+    key = (rows, cols, win_len, obstacles)
+    geo = _GEOMETRIES.get(key)
+    if geo is None:
+        grid = [[Board.EMPTY] * cols for _ in range(rows)]
+        for i in obstacles:
+            grid[i // cols][i % cols] = Board.OBSTACLE
+        if len(_GEOMETRIES) >= MAX_GEOMETRIES:
+            _GEOMETRIES.pop(next(iter(_GEOMETRIES)))
+        geo = _GEOMETRIES[key] = _Geometry(Board.from_grid(grid, win_len))
+    return geo
+
+
+def _seg_counts(geo: _Geometry, cells: List[str]) -> Dict[str, List[int]]:
+    counts = {p: [0] * len(geo.seg_cells) for p in Board._PLAYERS}
+    cell_segs = geo.cell_segs
+    for idx, v in enumerate(cells):
+        own = counts.get(v)
+        if own is not None:
+            for s in cell_segs[idx]:
+                own[s] += 1
+    return counts
+
+
+def _playouts(geo: _Geometry, cells: List[str], counts: Dict[str, List[int]], to_move: str,
+              n: int, rng: random.Random, heuristic: bool) -> Dict[Optional[str], int]:
+    """
+    *n* ván ngẫu nhiên từ thế cờ (cells, counts), *to_move* đi trước; trả
+    số ván theo người thắng (None = hoà). cells / counts không bị sửa.
+    """
+    x, o = Board._PLAYERS
+    empty = Board.EMPTY
+    win_len = geo.win_len
+    need = win_len - 1
+    cell_segs, seg_cells = geo.cell_segs, geo.seg_cells
+    free = [i for i, v in enumerate(cells) if v == empty]
+
+    # Ô thắng sẵn có của mỗi bên (đoạn có win_len - 1 quân, không có quân đối thủ)
+    start_threats: Dict[str, List[int]] = {x: [], o: []}
+    if heuristic:
+        for p, q in ((x, o), (o, x)):
+            cp, cq = counts[p], counts[q]
+            for s, n_own in enumerate(cp):
+                if n_own == need and not cq[s]:
+                    for e in seg_cells[s]:
+                        if cells[e] == empty:
+                            start_threats[p].append(e)
+                            break
+
+    results: Dict[Optional[str], int] = {x: 0, o: 0, None: 0}
+    for _ in range(n):
+        board = cells[:]
+        own_counts = {x: counts[x][:], o: counts[o][:]}
+        threats = {x: start_threats[x][:], o: start_threats[o][:]}
+        order = free[:]
+        rng.shuffle(order)
+        pos, end = 0, len(order)
+        p, q = to_move, (o if to_move == x else x)
+        winner = None
+        while True:
+            c = -1
+            if heuristic:
+                for e in threats[p]:            # Thắng ngay
+                    if board[e] == empty:
+                        c = e
+                        break
+                else:
+                    for e in threats[q]:        # Chặn ngay
+                        if board[e] == empty:
+                            c = e
+                            break
+            if c < 0:
+                while pos < end and board[order[pos]] != empty:
+                    pos += 1
+                if pos == end:
+                    break                       # Hết ô: hoà
+                c = order[pos]
+                pos += 1
+            board[c] = p
+            cp, cq = own_counts[p], own_counts[q]
+            for s in cell_segs[c]:
+                k = cp[s] + 1
+                cp[s] = k
+                if cq[s]:
+                    continue
+                if k == win_len:
+                    winner = p
+                    break
+                if heuristic and k == need:
+                    for e in seg_cells[s]:
+                        if board[e] == empty:
+                            threats[p].append(e)
+                            break
+            if winner is not None:
+                break
+            p, q = q, p
+        results[winner] += 1
+    return results
+
+
+def _playout_job(rows: int, cols: int, win_len: int, cells: str, to_move: str,
+                 n: int, seed: int, heuristic: bool) -> Dict[Optional[str], int]:
+    """Một lô playout trong tiến trình worker (tham số gọn, pickle được)."""
+    cells_list = list(cells)
+    geo = _geometry(rows, cols, win_len, cells_list)
+    return _playouts(geo, cells_list, _seg_counts(geo, cells_list), to_move, n,
+                     random.Random(seed), heuristic)
+
+
+# ------------------------------------------------------------------ #
+#                               CÂY                                  #
+# ------------------------------------------------------------------ #
+class _Node:
+    """
+    Nút cây: *move* do *player* đánh để tới nút này; wins tính theo *player*
+    (thắng = 1, hoà = 0.5). untried = ứng viên chưa mở, tốt nhất ở cuối.
+    """
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins", "winner")
+
+    def __init__(self, move: int, player: str, parent: Optional["_Node"]):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: List["_Node"] = []
+        self.untried: Optional[List[int]] = None
+        self.visits = 0
+        self.wins = 0.0
+        self.winner: Optional[str] = None       # Ván kết thúc tại nút (DRAW = hoà)
+
+
+DRAW = "draw"
+
+
+class MCTSEngine:
+    """Tìm nước bằng MCTS theo một DifficultyProfile strategy "mcts"."""
+
+    def __init__(self, profile: DifficultyProfile):
+        self.profile = profile
+        self.stats: Dict[str, object] = {}
+        self._root: Optional[_Node] = None
+        self._root_cells: Optional[List[str]] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        """Dừng pool playout (nếu có)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    # ----------------------------- API ------------------------------
+    def best(self, board: Board, ai_symbol: str, time_limit: float,
+             rng: random.Random) -> Tuple[int, int]:
+        """Nước nhiều lượt thăm nhất sau time_limit giây / node_budget playout."""
+        start = time.time()
+        cells = [v for row in board._grid for v in row]
+        geo = _geometry(board.rows, board.cols, board._win_len, cells)
+        counts = _seg_counts(geo, cells)
+        root, reused = self._reuse_root(cells, ai_symbol)
+        self._root, self._root_cells = root, cells
+
+        profile = self.profile
+        max_playouts = profile.node_budget if profile.node_budget is not None else math.inf
+        playouts = iterations = max_depth = 0
+        in_flight: Dict[Future, List[_Node]] = {}
+        workers = max(1, profile.mcts_workers)
+        if workers > 1 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+
+        while True:
+            out_of_budget = (playouts + len(in_flight) * profile.playout_batch >= max_playouts
+                             or time.time() - start >= time_limit)
+            if in_flight and (out_of_budget or len(in_flight) >= workers):
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    results = fut.result()
+                    playouts += sum(results.values())
+                    self._backpropagate(in_flight.pop(fut), results, virtual=True)
+                continue
+            if out_of_budget and iterations:
+                break
+
+            # Chọn + mở rộng trên bản sao của bàn gốc
+            leaf_cells = cells[:]
+            leaf_counts = {p: c[:] for p, c in counts.items()}
+            path = self._select(root, geo, leaf_cells, leaf_counts, rng)
+            iterations += 1
+            max_depth = max(max_depth, len(path) - 1)
+            leaf = path[-1]
+            if leaf.winner is not None:
+                n = profile.playout_batch
+                results = {leaf.winner if leaf.winner != DRAW else None: n}
+                playouts += n
+                self._backpropagate(path, results)
+                continue
+            to_move = _other(leaf.player)
+            if workers == 1:
+                results = _playouts(geo, leaf_cells, leaf_counts, to_move, profile.playout_batch,
+                                    rng, profile.playout == PLAYOUT_HEURISTIC)
+                playouts += profile.playout_batch
+                self._backpropagate(path, results)
+            else:
+                for node in path:               # Virtual loss: lá đang chờ kém hấp dẫn hơn
+                    node.visits += 1
+                fut = self._executor.submit(
+                    _playout_job, geo.rows, geo.cols, geo.win_len, "".join(leaf_cells), to_move,
+                    profile.playout_batch, rng.getrandbits(32), profile.playout == PLAYOUT_HEURISTIC)
+                in_flight[fut] = path
+
+        best_child = max(root.children, key=lambda child: child.visits)
+        elapsed = time.time() - start
+        self.stats = {
+            "profile": profile.name, "playouts": playouts, "iterations": iterations,
+            "playouts_per_s": round(playouts / max(elapsed, 1e-6), 1),
+            "root_visits": root.visits, "reused": reused, "depth": max_depth,
+            "best_visits": best_child.visits,
+            "best_win_rate": round(best_child.wins / max(best_child.visits, 1), 3),
+            "elapsed_ms": round(elapsed * 1000, 1),
+        }
+        # Giữ cây con của nước vừa chọn cho lần tìm sau
+        self._root = best_child
+        best_child.parent = None
+        self._root_cells = cells[:]
+        self._root_cells[best_child.move] = ai_symbol
+        return divmod(best_child.move, board.cols)
+
+    # ----------------------------- NỘI BỘ ----------------------------
+    def _reuse_root(self, cells: List[str], ai_symbol: str) -> Tuple[_Node, int]:
+        """
+        Nút gốc cho thế cờ *cells*: cây con của gốc cũ nếu thế cờ là gốc cũ
+        + một nước của đối thủ, ngược lại một cây mới.
+        """
+        old, old_cells = self._root, self._root_cells
+        if old is not None and old_cells is not None and len(old_cells) == len(cells):
+            diff = [i for i, (a, b) in enumerate(zip(old_cells, cells)) if a != b]
+            if (len(diff) == 1 and old_cells[diff[0]] == Board.EMPTY
+                    and old.player == ai_symbol and cells[diff[0]] == _other(ai_symbol)):
+                for child in old.children:
+                    if child.move == diff[0]:
+                        child.parent = None
+                        return child, child.visits
+        return _Node(-1, _other(ai_symbol), None), 0
+
+    def _select(self, root: _Node, geo: _Geometry, cells: List[str],
+                counts: Dict[str, List[int]], rng: random.Random) -> List[_Node]:
+        """UCT từ gốc tới một nút mới mở (hoặc nút kết thúc); đánh các nước vào cells / counts."""
+        profile = self.profile
+        c_uct = profile.uct_c
+        node = root
+        path = [node]
+        while node.winner is None:
+            if node.untried is None:
+                node.untried = _candidates(geo, cells, counts, _other(node.player), rng)
+                if not node.untried and not node.children:
+                    node.winner = DRAW
+                    break
+            allowed = 1 + int(profile.widening * node.visits ** profile.widening_power)
+            if node.untried and len(node.children) < allowed:
+                move = node.untried.pop()
+                child = _Node(move, _other(node.player), node)
+                node.children.append(child)
+                if _play(geo, cells, counts, move, child.player):
+                    child.winner = child.player
+                path.append(child)
+                return path
+            log_n = math.log(max(node.visits, 1))
+            node = max(node.children, key=lambda ch: (
+                ch.wins / ch.visits + c_uct * math.sqrt(log_n / ch.visits) if ch.visits else math.inf))
+            _play(geo, cells, counts, node.move, node.player)
+            path.append(node)
+        return path
+
+    @staticmethod
+    def _backpropagate(path: List[_Node], results: Dict[Optional[str], int], virtual: bool = False) -> None:
+        n = sum(results.values())
+        draws = results.get(None, 0)
+        for node in path:
+            node.visits += n - 1 if virtual else n
+            node.wins += results.get(node.player, 0) + 0.5 * draws
+
+
+def _other(symbol: str) -> str:
+    x, o = Board._PLAYERS
+    return o if symbol == x else x
+
+
+def _play(geo: _Geometry, cells: List[str], counts: Dict[str, List[int]], idx: int, symbol: str) -> bool:
+    """Đặt *symbol* vào ô *idx* của bàn gọn; trả True nếu thắng."""
+    cells[idx] = symbol
+    own, other = counts[symbol], counts[_other(symbol)]
+    won = False
+    for s in geo.cell_segs[idx]:
+        own[s] += 1
+        if own[s] == geo.win_len and not other[s]:
+            won = True
+    return won
+
+
+def _candidates(geo: _Geometry, cells: List[str], counts: Dict[str, List[int]],
+                mover: str, rng: random.Random) -> List[int]:
+    """
+    Ô trống lân cận quân đã đánh, xếp tăng dần theo ưu tiên (pop() lấy ô tốt
+    nhất): thắng ngay > chặn thắng > điểm đoạn sống qua ô (quân mình / đối
+    thủ trong đoạn càng nhiều càng cao). Bàn trống: các ô gần tâm.
+    """
+    empty = Board.EMPTY
+    stones = [i for i, v in enumerate(cells) if v in Board._PLAYERS]
+    if stones:
+        near = {j for i in stones for j in geo.neighbours[i] if cells[j] == empty}
+    else:
+        center = (geo.rows // 2) * geo.cols + geo.cols // 2
+        near = {j for j in geo.neighbours[center] + (center,) if cells[j] == empty}
+    if not near:
+        near = {i for i, v in enumerate(cells) if v == empty}
+    own, other = counts[mover], counts[_other(mover)]
+    need = geo.win_len - 1
+    scored = []
+    for idx in near:
+        score = rng.random()                    # Phá thế hoà ngẫu nhiên
+        for s in geo.cell_segs[idx]:
+            a, b = own[s], other[s]
+            if not b:
+                score += 4 ** a if a < need else 1e9
+            if not a:
+                score += 0.9 * 4 ** b if b < need else 1e8
+        scored.append((score, idx))
+    scored.sort()
+    return [idx for _, idx in scored]
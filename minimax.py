@@ -3,432 +3,1074 @@ import logging
 import math
 import random
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
+from ai_calibration import CALIBRATION_SECONDS, Calibration, get_calibration
+from ai_profiles import DEFAULT_WEIGHTS, STRATEGY_MCTS, STRATEGY_QLEARNING, DifficultyProfile, get_profile
 from board import Board
 
+if TYPE_CHECKING:
+    # mcts / pn_solver chỉ nạp khi hồ sơ cần tới (xem _best_mcts, proofs)
+    from mcts import MCTSEngine
+    from pn_solver import ProofBook
+
 # Định nghĩa DEFAULT_TIME_LIMIT trực tiếp trong minimax.py
 DEFAULT_TIME_LIMIT = 2.0 # Giới hạn thời gian mặc định cho AI (ví dụ: 2 giây)
 
+# Loại giá trị trong transposition table
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+MAX_SEARCH_DEPTH = 12
+# Khoá Zobrist sinh từ RNG riêng có seed cố định, không lấy từ RNG của ván:
+# AI dùng lại giữa các ván phải đánh y như AI mới tạo với cùng seed
+ZOBRIST_SEED = 0x2B0B
+NODE_BUDGET_EXCEEDED = "Node budget exceeded"
+
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Cờ của một ô trong lượt chấm điểm (xem MinimaxAI._score_moves)
+MOVE_WINS, MOVE_BLOCKS, MOVE_THREAT, MOVE_COUNTER, MOVE_FOUR = 1, 2, 4, 8, 16
+# Thế cờ có một trong các cờ này chưa "yên": chấm tĩnh ở chân trời dễ sai
+FORCING = MOVE_BLOCKS | MOVE_THREAT | MOVE_COUNTER | MOVE_FOUR
+# _order_moves chỉ giữ các nước ép buộc khi thấy một trong các cờ này
+FORCING_ORDER = MOVE_WINS | MOVE_BLOCKS | MOVE_THREAT | MOVE_COUNTER
+
+
+class _PlyBuffer:
+    """
+    Bộ đệm dùng lại của một tầng tìm kiếm: nước ứng viên (chỉ số ô), giá trị
+    và cờ theo chỉ số ô. Cấp một lần cho mỗi kích thước bàn.
+    """
+    __slots__ = ("cand", "tmp", "values", "flags", "seen")
+
+    def __init__(self, n: int):
+        self.cand: List[int] = [0] * n
+        self.tmp: List[int] = [0] * n
+        self.values: List[float] = [0] * n
+        self.flags: List[int] = [0] * n
+        self.seen = 0                  # OR các cờ của lượt chấm gần nhất
+
+
+# (rows, cols) -> (mọi đường ngang / dọc / chéo dưới dạng chỉ số ô,
+#                  chỉ số ô -> ((đường, 2 * vị trí trên đường), ...))
+_LINES: Dict[Tuple[int, int], Tuple[List[Tuple[int, ...]], List[Tuple[Tuple[int, int], ...]]]] = {}
+
+
+def _board_lines(rows: int, cols: int):
+    """Các đường của bàn rows x cols và 4 đường đi qua mỗi ô (dùng chung giữa các bàn)."""
+    cached = _LINES.get((rows, cols))
+    if cached is None:
+        lines: List[Tuple[int, ...]] = []
+        cell_lines: List[List[Tuple[int, int]]] = [[] for _ in range(rows * cols)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(rows):
+                for c in range(cols):
+                    if 0 <= r - dr < rows and 0 <= c - dc < cols:
+                        continue               # Không phải ô đầu đường
+                    line = []
+                    i, j = r, c
+                    while 0 <= i < rows and 0 <= j < cols:
+                        # Vị trí lưu sẵn dạng độ dời bit trong mã đường (2 bit / ô)
+                        cell_lines[i * cols + j].append((len(lines), 2 * len(line)))
+                        line.append(i * cols + j)
+                        i, j = i + dr, j + dc
+                    lines.append(tuple(line))
+        cached = _LINES[(rows, cols)] = (lines, [tuple(cl) for cl in cell_lines])
+    return cached
+
+
+def _line_score(values: List[str], ai_symbol: str, table: List[List[float]]) -> float:
+    """Tổng điểm các chuỗi quân (tối đa) trên một đường; table[2 * của AI + mở][độ dài]."""
+    score = 0
+    n = len(values)
+    i = 0
+    players = Board._PLAYERS
+    empty = Board.EMPTY
+    while i < n:
+        v = values[i]
+        if v not in players:
+            i += 1
+            continue
+        j = i + 1
+        while j < n and values[j] == v:
+            j += 1
+        is_open = i > 0 and j < n and values[i - 1] == empty and values[j] == empty
+        score += table[2 * (v == ai_symbol) + is_open][j - i]
+        i = j
+    return score
+
+
+def _is_open_run(values: List[str], idx: int, length: int, empty: str) -> bool:
+    """Chuỗi chứa values[idx] dài đúng *length* và hai đầu là ô trống."""
+    v = values[idx]
+    i = j = idx
+    last = len(values) - 1
+    while i > 0 and values[i - 1] == v:
+        i -= 1
+    while j < last and values[j + 1] == v:
+        j += 1
+    return (j - i + 1 == length and i > 0 and j < last
+            and values[i - 1] == empty and values[j + 1] == empty)
+
+
+# Mã 2 bit của một ô trong mã đường; mép bàn được mã như obstacle
+EMPTY_CODE, BLOCKED_CODE = 0, 3
+CELL_CODES: Dict[str, int] = {Board.EMPTY: EMPTY_CODE, Board._PLAYERS[0]: 1, Board._PLAYERS[1]: 2,
+                              Board.OBSTACLE: BLOCKED_CODE}
+_CODE_CELLS = {code: symbol for symbol, code in CELL_CODES.items()}
+
+MAX_WINDOW_CELLS = 7            # Cửa sổ tra bảng tối đa (4 ** 7 mục); chuỗi dài hơn đọc tiếp từng ô
+_LONG_RUN = -(1 << 30)          # left / right: cửa sổ toàn quân một bên, chưa đủ để phân lớp
+
+
+class _Windows:
+    """
+    Phân lớp cửa sổ các ô cạnh một ô trống (mã 2 bit / ô). Lớp ghi lại đúng
+    phần ảnh hưởng tới điểm khi ô đó đổi: ô kề trống / bị chặn, hoặc chuỗi
+    quân kề (bên, độ dài tối đa *sat*, ô ngay sau chuỗi trống hay không).
+    Chuỗi dài từ *sat* trở lên có điểm như nhau nên không cần nhìn xa hơn
+    sat + 1 ô. Lớp đại diện (reps) là các ô tính từ ô kề ra ngoài.
+    left[mã] = lớp * số lớp (cửa sổ bên trái, ô kề ở 2 bit cao nhất),
+    right[mã] = lớp (cửa sổ bên phải, ô kề ở 2 bit thấp nhất); _LONG_RUN
+    nếu cửa sổ (bị giới hạn MAX_WINDOW_CELLS ô) toàn quân một bên.
+    """
+    __slots__ = ("sat", "width", "reps", "ids", "left", "right")
+
+    def __init__(self, sat: int):
+        self.sat = sat
+        self.width = width = min(sat + 1, MAX_WINDOW_CELLS)
+        reps: List[Tuple[int, ...]] = [(EMPTY_CODE,), (BLOCKED_CODE,)]
+        for player in (1, 2):
+            for length in range(1, sat):
+                for far in (EMPTY_CODE, BLOCKED_CODE):
+                    reps.append((player,) * length + (far,))
+            reps.append((player,) * sat + (BLOCKED_CODE,))
+        self.reps = reps
+        self.ids = {rep: i for i, rep in enumerate(reps)}
+        n = len(reps)
+        self.left, self.right = [0] * 4 ** width, [0] * 4 ** width
+        for code in range(4 ** width):
+            near_low = [(code >> (2 * k)) & 3 for k in range(width)]
+            right = self.classify(near_low)
+            left = self.classify(near_low[::-1])
+            self.right[code] = _LONG_RUN if right is None else right
+            self.left[code] = _LONG_RUN if left is None else left * n
+
+    def classify(self, cells: List[int]) -> Optional[int]:
+        """Lớp của các ô *cells* (từ ô kề ra ngoài); None nếu chưa đủ ô."""
+        first = cells[0]
+        if first == EMPTY_CODE or first == BLOCKED_CODE:
+            return self.ids[(first,)]
+        sat = self.sat
+        length = 1
+        while length < len(cells) and cells[length] == first:
+            length += 1
+        if length >= sat:
+            return self.ids[(first,) * sat + (BLOCKED_CODE,)]
+        if length == len(cells):
+            return None
+        far = EMPTY_CODE if cells[length] == EMPTY_CODE else BLOCKED_CODE
+        return self.ids[(first,) * length + (far,)]
+
+
+_WINDOWS: Dict[int, _Windows] = {}
+
+
+class _LinePatterns:
+    """
+    Bảng tra điểm / đe doạ theo mẫu cho một win_len và một bên AI.
+    Mã đường: 2 bit / ô (CELL_CODES) + sat + 1 ô bị chặn ở mỗi đầu; ô ở vị
+    trí p chiếm bit 2p + offset. Với ô trống tại p:
+        key = left[(mã >> (2p + lshift)) & mask] + right[(mã >> (2p + rshift)) & mask]
+    (key < 0: chuỗi kề dài hơn cửa sổ, tính bằng slow_key).
+    delta[bên][key] = điểm đường tăng thêm khi *bên* đặt quân vào ô đó;
+    flags[bên][key] = MOVE_THREAT nếu tạo chuỗi win_len - 1 mở hai đầu,
+    | MOVE_COUNTER nếu đối thủ đặt vào đó sẽ tạo chuỗi như vậy.
+    """
+    __slots__ = ("windows", "mask", "lshift", "rshift", "offset", "left", "right", "delta", "flags")
+
+    def __init__(self, win_len: int, ai_symbol: str, run_table: List[List[float]]):
+        sat = max(win_len, 3)              # Chuỗi dài hơn thế có điểm không đổi
+        windows = _WINDOWS.get(sat)
+        if windows is None:
+            windows = _WINDOWS[sat] = _Windows(sat)
+        self.windows = windows
+        self.mask = 4 ** windows.width - 1
+        self.offset = 2 * (sat + 1)
+        self.lshift = self.offset - 2 * windows.width
+        self.rshift = self.offset + 2
+        self.left, self.right = windows.left, windows.right
+        reps = windows.reps
+        n = len(reps)
+        need, empty = win_len - 1, Board.EMPTY
+        players = Board._PLAYERS
+        self.delta = {p: [0] * (n * n) for p in players}
+        self.flags = {p: [0] * (n * n) for p in players}
+        for lc, rep_left in enumerate(reps):
+            for rc, rep_right in enumerate(reps):
+                # Đường đại diện (hai đầu đường tính là bị chặn như mép bàn)
+                line = [_CODE_CELLS[c] for c in reversed(rep_left)] + [empty] + [_CODE_CELLS[c] for c in rep_right]
+                pos = len(rep_left)
+                before = _line_score(line, ai_symbol, run_table)
+                gain, opens = {}, {}
+                for p in players:
+                    line[pos] = p
+                    gain[p] = _line_score(line, ai_symbol, run_table) - before
+                    opens[p] = _is_open_run(line, pos, need, empty)
+                    line[pos] = empty
+                key = lc * n + rc
+                for p, q in (players, players[::-1]):
+                    self.delta[p][key] = gain[p]
+                    self.flags[p][key] = (MOVE_THREAT if opens[p] else 0) | (MOVE_COUNTER if opens[q] else 0)
+
+    def slow_key(self, code: int, shift: int) -> int:
+        """key khi một bên là chuỗi dài hơn cửa sổ: đọc từng ô tới sat + 1 ô."""
+        windows = self.windows
+        bit = shift + self.offset          # Bit của ô đang xét
+        span = range(1, windows.sat + 2)
+        left = windows.classify([(code >> (bit - 2 * d)) & 3 for d in span])
+        right = windows.classify([(code >> (bit + 2 * d)) & 3 for d in span])
+        return left * len(windows.reps) + right
+
+    def empty_code(self, length: int) -> int:
+        """Mã của đường *length* ô trống (chỉ có các ô chặn ở hai đầu)."""
+        edge = (1 << self.offset) - 1
+        return edge | (edge << (self.offset + 2 * length))
+
+
 class MinimaxAI:
     """
-    AI cho cờ Caro: easy = Q-learning; hard = Minimax tối ưu với chặn sát khi (win_len - 1) hoặc (win_len - 2).
+    AI cho cờ Caro, điều khiển bởi một DifficultyProfile (ai_profiles.py):
+    strategy "qlearning" = Q-learning; "search" = Minimax alpha-beta + IDDFS
+    giới hạn bởi độ sâu / số nút / thời gian của hồ sơ, với chặn sát khi
+    (win_len - 1) hoặc (win_len - 2); "mcts" = MCTSEngine (mcts.py).
     """
 
-    def __init__(self, difficulty: str = "medium"):
+    def __init__(self, difficulty: Union[str, DifficultyProfile] = "medium",
+                 rng: Optional[random.Random] = None, calibration: Optional[Calibration] = None,
+                 proofs: Optional["ProofBook"] = None):
+        if isinstance(difficulty, DifficultyProfile):
+            self.profile: Optional[DifficultyProfile] = difficulty
+            difficulty = difficulty.name
+        else:
+            self.profile = get_profile(difficulty)
         self.difficulty = difficulty
+        # RNG riêng của ván (dùng chung với Board) để tái lập được nước đi
+        self._rng = rng if rng is not None else random.Random()
         self.board = Board()  # Sample board để lấy cấu hình
-        # max_depth_hard sẽ được thiết lập dựa trên kích thước bàn cờ
-        self.max_depth_hard = self._get_dynamic_max_depth()
-        # Độ sâu cố định cho chế độ medium, giảm tối đa để nhanh nhất
-        self.max_depth_medium = 1 # Đã điều chỉnh để cực kỳ nhanh.
-        self.transposition_table: Dict[str, float] = {}
-        
-        # Khởi tạo bảng Zobrist
-        self.zobrist_keys = {}
-        for i in range(self.board.rows):
-            for j in range(self.board.cols):
-                # Các ký hiệu có thể xuất hiện trên bảng (EMPTY, OBSTACLE, X, O)
-                for symbol in [self.board.EMPTY, self.board.OBSTACLE, 'X', 'O']:
-                    # Sửa lỗi: random.getandbits(64) -> random.getrandbits(64)
-                    self.zobrist_keys[(i, j, symbol)] = random.getrandbits(64)
-        
-        logger.debug(f"Initialized MinimaxAI with difficulty: {difficulty}, dynamic max_depth for hard: {self.max_depth_hard}, fixed max_depth for medium: {self.max_depth_medium}")
-
-        # Q-table dùng cho difficulty "easy"
+        # Ngân sách thời gian IDDFS cho mỗi nước (server đặt theo từng request)
+        self.time_limit = self.profile.time_budget if self.profile else DEFAULT_TIME_LIMIT
+        self._weights = self.profile.weights if self.profile else DEFAULT_WEIGHTS
+        # Khoá: hash Zobrist -> (độ sâu, loại giá trị, giá trị)
+        self.transposition_table: Dict[int, Tuple[int, int, float]] = {}
+        self.nodes = 0                         # Số nút đã duyệt ở lần tìm gần nhất
+        self.stats: Dict[str, object] = {}     # Thống kê lần tìm gần nhất (xem _best_search)
+        self._budget_armed = True              # Tắt khi tìm độ sâu 1 (luôn chạy hết)
+        self._node_limit: float = math.inf
+        self._nps: Optional[float] = None      # Nút / giây đã hiệu chỉnh cho dạng bàn hiện tại
+        self._calibration = calibration
+        self._proofs = proofs
+        self._run_tables: Dict[Tuple[int, int], List[List[float]]] = {}
+        self._pattern_tables: Dict[Tuple[int, str], _LinePatterns] = {}
+        self._plies: List[_PlyBuffer] = []     # Bộ đệm theo tầng (xem _begin_search)
+        self._search_shape = (0, 0)
+        self.q_nodes = 0                       # Nút quiescence của độ sâu IDDFS hiện tại
+        self.q_exhausted = 0                   # Số lần quiescence hết ngân sách (trả điểm tĩnh)
+        self._q_limit = 0
+        self.lmr_reduced = 0                   # Nước muộn được tìm nông hơn
+        self.lmr_researched = 0                # ... rồi phải tìm lại đủ sâu
+        self.extended = 0                      # Nước đe doạ được tìm sâu thêm
+        self._mcts: Optional["MCTSEngine"] = None  # Cây MCTS giữ giữa các nước
+
+        # Khởi tạo bảng Zobrist: khoá của ô idx, ký hiệu k ở zobrist[4 * idx + k]
+        self._zobrist: List[int] = []
+        self._zobrist_rng = random.Random(ZOBRIST_SEED)
+        self._ensure_zobrist(self.board.rows * self.board.cols)
+
+        logger.debug(f"Initialized MinimaxAI with profile: {self.profile}")
+
+        # Q-table dùng cho strategy "qlearning"
         self.q_table = collections.defaultdict(
             lambda: [0.0] * (self.board.rows * self.board.cols) # Kích thước bảng Q phụ thuộc vào số ô
         )
         self.learning_rate = 0.1
         self.discount_factor = 0.9
-        self.exploration_rate = 0.2
+        self.exploration_rate = self.profile.exploration if self.profile else 0.2
         self.last_state = None
         self.last_action = None
 
-    def _get_dynamic_max_depth(self) -> int:
+    def use_rng(self, rng: random.Random) -> None:
+        """Gắn RNG của ván mới khi AI được dùng lại giữa các ván."""
+        self._rng = rng
+
+    def close(self) -> None:
+        """Giải phóng tài nguyên ngoài tiến trình (pool playout của MCTS nếu có)."""
+        if self._mcts is not None:
+            self._mcts.close()
+            self._mcts = None
+
+    @property
+    def calibration(self) -> Calibration:
+        """Bảng nút / giây theo dạng bàn (mặc định: dùng chung cả tiến trình)."""
+        if self._calibration is None:
+            self._calibration = get_calibration()
+        return self._calibration
+
+    @property
+    def proofs(self) -> "ProofBook":
+        """Sổ chứng minh của pn_solver (mặc định: dùng chung cả tiến trình)."""
+        if self._proofs is None:
+            from pn_solver import get_proofs
+            self._proofs = get_proofs()
+        return self._proofs
+
+    def _ensure_zobrist(self, n_cells: int) -> None:
+        """Sinh thêm khoá Zobrist cho bàn có *n_cells* ô (bàn lớn hơn bàn mẫu 5x5)."""
+        # Các ký hiệu có thể xuất hiện trên bảng (EMPTY, OBSTACLE, X, O)
+        while len(self._zobrist) < 4 * n_cells:
+            self._zobrist.append(self._zobrist_rng.getrandbits(64))
+
+    def _plan_search(self, board: Board, branching: float) -> Tuple[int, float]:
+        """
+        (độ sâu tối đa, số nút tối đa) cho lần tìm này. Số nút = node_budget
+        của hồ sơ, giới hạn thêm bởi số nút máy này duyệt được trong
+        time_limit (đo bằng micro-benchmark, xem ai_calibration). Độ sâu =
+        sâu nhất mà cây với hệ số nhánh *branching* còn vừa số nút đó.
         """
-        Điều chỉnh độ sâu tìm kiếm động dựa trên kích thước bàn cờ.
-        Bàn cờ càng lớn, độ sâu càng nhỏ để giữ tốc độ.
+        profile = self.profile
+        if profile.depth_cap == 1:
+            return 1, math.inf                 # Độ sâu 1 luôn chạy hết, không cần đo
+        shape = (board.rows, board.cols, board._win_len)
+        self._nps = self.calibration.nodes_per_second(shape, self._measure_nps)
+        node_limit = self._nps * self.time_limit
+        if profile.node_budget is not None:
+            node_limit = min(node_limit, profile.node_budget)
+        if profile.depth_cap is not None:
+            return min(profile.depth_cap, MAX_SEARCH_DEPTH), node_limit
+        depth = int(math.log(max(node_limit, 2)) / math.log(branching))
+        return max(1, min(depth, MAX_SEARCH_DEPTH, len(board.get_legal_moves()))), node_limit
+
+    def _measure_nps(self, shape: Tuple[int, int, int]) -> float:
         """
-        board_area = self.board.rows * self.board.cols
-        if board_area <= 25:  # Ví dụ 5x5, win_len 4
-            return 8  # Độ sâu này thường mang lại sức mạnh tốt mà vẫn nhanh
-        elif board_area <= 49: # Ví dụ 7x7
-            return 6
-        elif board_area <= 100: # Ví dụ 10x10
-            return 4
-        else: # Bàn cờ lớn hơn nhiều
-            return 3 # Giảm độ sâu để tránh quá tải
+        Micro-benchmark: nút / giây của IDDFS (sâu 1, 2, 3...) trên thế cờ khai
+        cuộc của *shape*, cùng tỉ lệ nút lá / nút trong như khi tìm thật.
+        """
+        rows, cols, win_len = shape
+        board = Board(rows, cols, win_len, 0, seed=0)
+        center = (rows // 2, cols // 2)
+        opening = sorted(board.get_legal_moves(),
+                         key=lambda m: (abs(m[0] - center[0]) + abs(m[1] - center[1]), m))
+        for symbol, (r, c) in zip("XOX", opening):
+            board.place(r, c, symbol)
+
+        probe = MinimaxAI(DifficultyProfile("calibration"), rng=random.Random(0),
+                          calibration=self.calibration)
+        probe.time_limit = CALIBRATION_SECONDS
+        probe._begin_search(board, "O", "X")
+        start = time.time()
+        try:
+            for depth in range(1, MAX_SEARCH_DEPTH + 1):
+                probe.transposition_table.clear()
+                probe._search_root(board, depth, "O", "X", start)
+        except TimeoutError:
+            pass
+        return probe.nodes / max(time.time() - start, 1e-6)
 
     def best(self, board: Board, ai_symbol: str, human_symbol: str) -> Tuple[int, int]:
         """
-        Xác định nước đi tốt nhất dựa trên độ khó đã chọn, sử dụng IDDFS cho chế độ "hard",
-        Minimax với độ sâu cố định cho chế độ "medium", và Q-learning cho "easy".
+        Xác định nước đi tốt nhất theo hồ sơ độ khó: IDDFS có giới hạn cho
+        strategy "search", Q-learning cho "qlearning", MCTS cho "mcts".
         """
         self.board = board # Cập nhật board hiện tại cho AI
+        legal_moves = list(board.get_legal_moves())
+        if not legal_moves:
+            return (0, 0) # Không có nước đi nào khả dụng
 
-        if self.difficulty == "easy":
-            state = self._get_state_representation(board)
-            legal_moves = list(board.get_legal_moves())
-            if not legal_moves:
-                return (0, 0) # Không có nước đi nào khả dụng
-
-            chosen_move = None # Đảm bảo biến chosen_move được khởi tạo
+        if self.profile is None:
+            logger.error(f"Unknown difficulty level: '{self.difficulty}'. Falling back to random move.")
+            return self._rng.choice(legal_moves)
+        if self.profile.strategy == STRATEGY_QLEARNING:
+            return self._best_qlearning(board, legal_moves)
+        if self.profile.strategy == STRATEGY_MCTS:
+            return self._best_mcts(board, ai_symbol)
+        return self._best_search(board, legal_moves, ai_symbol, human_symbol)
+
+    def _best_mcts(self, board: Board, ai_symbol: str) -> Tuple[int, int]:
+        if self._mcts is None:
+            from mcts import MCTSEngine
+            self._mcts = MCTSEngine(self.profile)
+        move = self._mcts.best(board, ai_symbol, self.time_limit, self._rng)
+        self.stats = self._mcts.stats
+        self.nodes = self.stats["playouts"]
+        logger.debug(f"MCTS stats: {self.stats}. Final move: {move}")
+        return move
+
+    def _best_qlearning(self, board: Board, legal_moves: List[Tuple[int, int]]) -> Tuple[int, int]:
+        state = self._get_state_representation(board)
+        chosen_move = None # Đảm bảo biến chosen_move được khởi tạo
+
+        if self._rng.random() < self.exploration_rate:
+            # Khám phá: chọn một nước đi ngẫu nhiên
+            chosen_move = self._rng.choice(legal_moves)
+        else:
+            # Khai thác: chọn nước đi tốt nhất từ Q-table
+            best_score = -math.inf
+            move_options = []
+
+            for r, c in legal_moves:
+                idx = r * board.cols + c
+                if idx < len(self.q_table[state]): # Kiểm tra giới hạn để tránh lỗi
+                    score = self.q_table[state][idx]
+                    if score > best_score:
+                        best_score = score
+                        chosen_move = (r, c) # Gán giá trị vào chosen_move
+                        move_options = [(r, c)]
+                    elif score == best_score:
+                        move_options.append((r, c))
+
+            if move_options:
+                chosen_move = self._rng.choice(move_options) # Gán giá trị vào chosen_move
+            else: # Fallback nếu không có nước đi nào có điểm số tốt, chọn ngẫu nhiên
+                chosen_move = self._rng.choice(legal_moves) # Gán giá trị vào chosen_move
+
+        self.last_state = state
+        self.last_action = chosen_move # Sử dụng biến đã được gán giá trị
+        return chosen_move
+
+    def _best_search(self, board: Board, legal_moves: List[Tuple[int, int]],
+                     ai_symbol: str, human_symbol: str) -> Tuple[int, int]:
+        profile = self.profile
+        if profile.use_proofs:
+            move = self.proofs.move(board, ai_symbol)
+            if move is not None:
+                self.nodes = 0
+                self.stats = {"profile": profile.name, "depth": 0, "nodes": 0, "stop": "proof"}
+                logger.debug(f"Proof book move: {move}")
+                return move
+        start_time = time.time()
+        # Hệ số nhánh hiệu dụng của alpha-beta khi sắp xếp nước tốt ~ căn bậc hai
+        branching = max(2.0, math.sqrt(len(legal_moves)))
+        max_depth, self._node_limit = self._plan_search(board, branching)
+        self._begin_search(board, ai_symbol, human_symbol)
+        # Xóa bảng chuyển vị cho mỗi lần tìm kiếm mới
+        self.transposition_table.clear()
+        self.nodes = 0
+        self._q_limit = profile.quiescence_budget
+        q_total = self.q_exhausted = 0
+        self.lmr_reduced = self.lmr_researched = self.extended = 0
+        # Danh sách (điểm, nước) của độ sâu hoàn thành gần nhất, tốt nhất trước
+        scored: List[Tuple[float, Tuple[int, int]]] = []
+        depth_done, stop = 0, "depth"
+
+        # IDDFS: Tăng dần độ sâu cho đến khi hết độ sâu / số nút / thời gian
+        for current_depth in range(1, max_depth + 1):
+            # Độ sâu 1 luôn chạy hết (rẻ như 'medium') để luôn có nước đã đánh giá
+            self._budget_armed = current_depth > 1
+            nodes_before = self.nodes
+            self.q_nodes = 0                   # Ngân sách quiescence tính riêng cho mỗi độ sâu
+            try:
+                scored = self._search_root(board, current_depth, ai_symbol, human_symbol, start_time)
+            except TimeoutError as exc:
+                stop = "nodes" if exc.args[0] == NODE_BUDGET_EXCEEDED else "time"
+                break
+            finally:
+                q_total += self.q_nodes
+            depth_done = current_depth
 
-            if random.uniform(0, 1) < self.exploration_rate:
-                # Khám phá: chọn một nước đi ngẫu nhiên
-                chosen_move = random.choice(legal_moves)
-            else:
-                # Khai thác: chọn nước đi tốt nhất từ Q-table
-                best_score = -math.inf
-                move_options = []
-
-                for r, c in legal_moves:
-                    idx = r * board.cols + c
-                    if idx < len(self.q_table[state]): # Kiểm tra giới hạn để tránh lỗi
-                        score = self.q_table[state][idx]
-                        if score > best_score:
-                            best_score = score
-                            chosen_move = (r, c) # Gán giá trị vào chosen_move
-                            move_options = [(r, c)]
-                        elif score == best_score:
-                            move_options.append((r, c))
-                
-                if move_options:
-                    chosen_move = random.choice(move_options) # Gán giá trị vào chosen_move
-                else: # Fallback nếu không có nước đi nào có điểm số tốt, chọn ngẫu nhiên
-                    chosen_move = random.choice(legal_moves) # Gán giá trị vào chosen_move
-
-            self.last_state = state
-            self.last_action = chosen_move # Sử dụng biến đã được gán giá trị
-            return chosen_move
-
-        elif self.difficulty == "medium":
-            logger.debug(f"Starting Minimax search for 'medium' difficulty at fixed depth: {self.max_depth_medium}")
-            start_time = time.time()
-            legal_moves = list(board.get_legal_moves())
-            if not legal_moves:
-                return (0, 0) # Không có nước đi nào khả dụng
-
-            best_value = -math.inf
-            best_move = legal_moves[0] # Khởi tạo với một nước đi hợp lệ
-            
-            # Sắp xếp nước đi cho chế độ medium để có hiệu suất tốt hơn
-            # Đây là yếu tố chính giúp nó giỏi hơn easy mà vẫn nhanh
-            moves_to_consider = self._get_ordered_moves(board, ai_symbol, human_symbol)
-            if not moves_to_consider: # Fallback nếu không có nước đi nào sau khi sắp xếp
-                return (0, 0)
-            
-            # Với depth=1, ta chỉ cần lặp qua các nước đi hợp lệ và đánh giá chúng trực tiếp.
-            # Không cần gọi đệ quy _minimax nữa, giúp nhanh hơn rất nhiều.
-            for r, c in moves_to_consider:
-                board.place(r, c, ai_symbol)
-                value = self._evaluate_board(board, ai_symbol, human_symbol)
-                board.undo_last_move()
+            # Nếu AI tìm thấy nước thắng hoặc thua chắc chắn ở độ sâu hiện tại, dừng lại
+            if scored[0][0] in (math.inf, -math.inf):
+                stop = "solved"
+                break
+            # Kiểm tra thời gian sau mỗi lần hoàn thành một độ sâu
+            if time.time() - start_time >= self.time_limit:
+                stop = "time"
+                break
+            # Không bắt đầu độ sâu mới nếu ước lượng nó không kịp xong trong ngân sách
+            if self.nodes + (self.nodes - nodes_before) * branching > self._node_limit:
+                stop = "projected"
+                break
 
-                if value > best_value:
-                    best_value = value
-                    best_move = (r, c)
-            
-            end_time = time.time()
-            logger.debug(f"Minimax search for 'medium' took {end_time - start_time:.4f} seconds. Final move: {best_move}")
+        move = self._pick_root_move(scored) if scored else legal_moves[0]
+        elapsed = time.time() - start_time
+        self.stats = {
+            "profile": profile.name, "depth": depth_done, "max_depth": max_depth,
+            "nodes": self.nodes, "node_limit": self._node_limit, "stop": stop,
+            "q_nodes": q_total, "q_exhausted": self.q_exhausted,
+            "lmr_reduced": self.lmr_reduced, "lmr_researched": self.lmr_researched,
+            "extended": self.extended,
+            "elapsed_ms": round(elapsed * 1000, 1), "calibrated_nps": self._nps,
+        }
+        logger.debug(f"Search stats: {self.stats}. Final move: {move}")
+        return move
+
+    def _search_root(self, board: Board, depth: int, ai_symbol: str, human_symbol: str,
+                     start_time: float) -> List[Tuple[float, Tuple[int, int]]]:
+        """
+        Duyệt các nước gốc ở *depth*; trả (điểm, nước) giảm dần theo điểm,
+        nước bằng điểm giữ thứ tự sắp xếp. Không tra bảng chuyển vị ở gốc để
+        luôn có nước đi; khi top_k > 1 mỗi nước gốc được tìm với cửa sổ đầy
+        đủ để điểm của các ứng viên so sánh được với nhau. Đây là nơi duy
+        nhất chỉ số ô được đổi lại thành toạ độ (r, c).
+        """
+        k = self._order_moves(0, self._score_moves(board, ai_symbol, 0), True)
+        buf = self._plies[0]
+        cand, coords = buf.cand, self._coords
+        if depth == 1:
+            # Giá trị lá đã có từ lượt chấm điểm, không cần đặt thử từng nước
+            self.nodes += k
+            scored = [(self._leaf_value(board, 0, cand[i], True, -math.inf, math.inf,
+                                        ai_symbol, human_symbol, start_time, self.time_limit),
+                       coords[cand[i]]) for i in range(k)]
+            scored.sort(key=lambda item: item[0], reverse=True)
+            return scored
+
+        full_window = self.profile.top_k > 1
+        alpha = -math.inf
+        scored = []
+        for i in range(k):
+            idx = cand[i]
+            value = self._search_move(board, 0, i, idx, depth, True,
+                                      -math.inf if full_window else alpha, math.inf,
+                                      ai_symbol, human_symbol, start_time, self.time_limit,
+                                      self.profile.threat_extensions)
+            scored.append((value, coords[idx]))
+            alpha = max(alpha, value)
+            if value == math.inf and not full_window:
+                break
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored
+
+    def _pick_root_move(self, scored: List[Tuple[float, Tuple[int, int]]]) -> Tuple[int, int]:
+        """Nước tốt nhất, hoặc (xác suất noise) một nước ngẫu nhiên trong top_k."""
+        best_value, best_move = scored[0]
+        profile = self.profile
+        if profile.top_k <= 1 or profile.noise <= 0 or best_value == math.inf:
             return best_move
+        if self._rng.random() >= profile.noise:
+            return best_move
+        candidates = [move for value, move in scored[:profile.top_k] if value != -math.inf]
+        return self._rng.choice(candidates or [best_move])
 
-        elif self.difficulty == "hard":
-            start_time = time.time()
-            legal_moves = list(board.get_legal_moves())
-            if not legal_moves:
-                return (0, 0) # Không có nước đi nào khả dụng
-            
-            best_move_so_far = legal_moves[0] 
-            best_score_so_far = -math.inf
-
-            # Xóa bảng chuyển vị cho mỗi lần tìm kiếm mới
-            self.transposition_table.clear() 
-
-            # IDDFS: Tăng dần độ sâu cho đến khi hết thời gian
-            for current_depth in range(1, self.max_depth_hard + 1):
-                logger.debug(f"Starting IDDFS search at depth: {current_depth}")
-                try:
-                    # Gọi Minimax với giới hạn thời gian
-                    score, move = self._minimax_id(
-                        board, current_depth, True, -math.inf, math.inf,
-                        ai_symbol, human_symbol, start_time, DEFAULT_TIME_LIMIT
-                    )
-
-                    # Nếu AI tìm thấy nước thắng hoặc thua chắc chắn ở độ sâu hiện tại, dừng lại
-                    if score == math.inf or score == -math.inf:
-                        best_move_so_far = move if move is not None else best_move_so_far
-                        best_score_so_far = score
-                        logger.debug(f"Found winning/losing move at depth {current_depth}. Stopping IDDFS.")
-                        break # Dừng IDDFS nếu tìm thấy nước thắng/thua
-
-                    # Chỉ cập nhật nước đi tốt nhất nếu đã tìm thấy ở độ sâu hiện tại
-                    # và điểm số tốt hơn hoặc bằng điểm số hiện tại
-                    if move is not None and score > best_score_so_far:
-                        best_score_so_far = score
-                        best_move_so_far = move
-                    
-                    # Nếu không tìm thấy nước đi ở độ sâu hiện tại, hãy dùng nước đã tìm được
-                    elif move is None and current_depth == 1:
-                        pass
-
-                    logger.debug(f"Finished depth {current_depth}. Best move so far: {best_move_so_far} with score: {best_score_so_far}")
-
-                except TimeoutError:
-                    logger.debug(f"Timeout at depth {current_depth}. Using best move found so far.")
-                    break # Dừng IDDFS nếu hết thời gian
-
-                # Kiểm tra thời gian sau mỗi lần hoàn thành một độ sâu
-                if time.time() - start_time >= DEFAULT_TIME_LIMIT:
-                    logger.debug(f"Time limit reached after depth {current_depth}. Using best move found so far.")
-                    break
-            
-            end_time = time.time()
-            logger.debug(f"Minimax IDDFS search took {end_time - start_time:.4f} seconds. Final move: {best_move_so_far}")
-            
-            return best_move_so_far
-        else:
-            logger.error(f"Unknown difficulty level: '{self.difficulty}'. Falling back to random move.")
-            legal_moves = list(board.get_legal_moves())
-            if legal_moves:
-                return random.choice(legal_moves)
-            return (0,0)
+    def _search_move(self, board: Board, ply: int, i: int, idx: int, depth: int, maximizing_player: bool,
+                     alpha: float, beta: float, ai_symbol: str, human_symbol: str,
+                     start_time: float, time_limit: float, extensions: int) -> float:
+        """
+        Đánh nước *idx* (thứ *i* theo thứ tự sắp xếp) của tầng *ply* rồi tìm
+        nút con với độ sâu chọn lọc: nước tạo đe doạ được tìm sâu thêm một
+        tầng (còn *extensions* lượt mở rộng trên nhánh); nước muộn ở thế cờ
+        yên được tìm nông hơn trước (late-move reduction) và chỉ tìm lại đủ
+        sâu nếu kết quả vượt alpha / beta.
+        """
+        profile = self.profile
+        buf = self._plies[ply]
+        forcing = buf.flags[idx] & (MOVE_FOUR | MOVE_THREAT)
+        child_depth = depth - 1
+        if forcing and extensions:
+            child_depth += 1
+            extensions -= 1
+            self.extended += 1
+        reduced = child_depth - profile.lmr_reduction
+        reduce = (profile.lmr_after and i >= profile.lmr_after and reduced >= 0
+                  and not forcing and not buf.seen & FORCING_ORDER)
+        if reduce and reduced == 0:
+            # Giảm về độ sâu 0: điểm tĩnh đã có từ lượt chấm điểm, khỏi đặt thử
+            self.lmr_reduced += 1
+            self.nodes += 1
+            value = buf.values[idx]
+            if not ((value > alpha) if maximizing_player else (value < beta)):
+                return value
+            self.lmr_researched += 1
+            reduce = False
+
+        self._play(board, idx, ai_symbol if maximizing_player else human_symbol)
+        try:
+            if reduce:
+                self.lmr_reduced += 1
+                value = self._minimax_id(board, reduced, not maximizing_player, alpha, beta,
+                                         ai_symbol, human_symbol, start_time, time_limit, ply + 1, extensions)
+                if not ((value > alpha) if maximizing_player else (value < beta)):
+                    return value
+                self.lmr_researched += 1
+            return self._minimax_id(board, child_depth, not maximizing_player, alpha, beta,
+                                    ai_symbol, human_symbol, start_time, time_limit, ply + 1, extensions)
+        finally:
+            self._unplay(board, idx) # Hoàn tác nước đi (kể cả khi hết ngân sách)
 
     def _minimax_id(self, board: Board, depth: int, maximizing_player: bool, alpha: float, beta: float,
-                     ai_symbol: str, human_symbol: str, start_time: float, time_limit: float) -> Tuple[float, Optional[Tuple[int, int]]]:
+                    ai_symbol: str, human_symbol: str, start_time: float, time_limit: float,
+                    ply: int, extensions: int = 0) -> float:
         """
-        Thuật toán Minimax với cắt tỉa Alpha-Beta, Transposition Table và giới hạn thời gian.
-        Dùng cho chế độ 'hard'.
+        Thuật toán Minimax với cắt tỉa Alpha-Beta, Transposition Table và giới
+        hạn thời gian / số nút (TimeoutError khi vượt). *ply* = khoảng cách
+        tới gốc, chọn bộ đệm nước đi của tầng; *extensions* = số lần còn được
+        mở rộng nước đe doạ trên nhánh (xem _search_move).
         """
-        
-        # Kiểm tra thời gian trước khi bắt đầu một nút mới trong cây tìm kiếm
-        if time.time() - start_time >= time_limit:
-            raise TimeoutError("Time limit exceeded")
 
-        # Kiểm tra Transposition Table (Zobrist Hashing)
-        state_key = self._calculate_zobrist_hash(board)
-        if state_key in self.transposition_table:
-            # Transposition table lưu giá trị của trạng thái, không lưu nước đi
-            # Vì vậy, nếu trạng thái đã có, ta chỉ trả về giá trị đã tính toán
-            # Nước đi (thứ hai trong tuple) sẽ là None vì chúng ta không lưu nó
-            return self.transposition_table[state_key], None
+        # Kiểm tra ngân sách trước khi bắt đầu một nút mới trong cây tìm kiếm
+        self.nodes += 1
+        if self._budget_armed:
+            if self.nodes > self._node_limit:
+                raise TimeoutError(NODE_BUDGET_EXCEEDED)
+            if time.time() - start_time >= time_limit:
+                raise TimeoutError("Time limit exceeded")
 
         # Base cases: game over hoặc độ sâu đạt tới giới hạn
         if board.has_winner_any():
             winner_sym = board.get_winner_symbol()
             if winner_sym == ai_symbol:
-                return math.inf, None # AI thắng
+                return math.inf # AI thắng
             elif winner_sym == human_symbol:
-                return -math.inf, None # Người chơi thắng
+                return -math.inf # Người chơi thắng
         elif board.is_draw():
-            return 0, None # Hòa
-        
-        if depth == 0:
-            return self._evaluate_board(board, ai_symbol, human_symbol), None
-
-        # Lấy các nước đi đã được sắp xếp
-        moves_to_consider = self._get_ordered_moves(board, ai_symbol if maximizing_player else human_symbol,
-                                                    human_symbol if maximizing_player else ai_symbol)
+            return 0 # Hòa
 
-        if not moves_to_consider:
-            return self._evaluate_board(board, ai_symbol, human_symbol), None
+        if depth == 0:
+            return self._line_total + self._center_total   # = _evaluate_board, cập nhật dần
+
+        # Kiểm tra Transposition Table (Zobrist Hashing). Giá trị chỉ dùng được
+        # nếu đã tìm ít nhất *depth* tầng; giá trị bị cắt tỉa chỉ là cận.
+        state_key = self._hash
+        entry = self.transposition_table.get(state_key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value = entry
+            if flag == TT_EXACT:
+                return value
+            if flag == TT_LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+        alpha_orig, beta_orig = alpha, beta
+
+        # Chấm điểm mọi nước một lượt rồi sắp xếp, ngay trong bộ đệm của tầng
+        mover = ai_symbol if maximizing_player else human_symbol
+        k = self._order_moves(ply, self._score_moves(board, mover, ply), maximizing_player)
+        if not k:
+            return self._line_total + self._center_total
+        buf = self._plies[ply]
+        cand = buf.cand
+
+        if depth == 1:
+            self.nodes += k
+            if not (self._q_limit and buf.seen & FORCING):
+                # Nút ngay trên lá, thế cờ yên: giá trị mọi nút con đã có sẵn, chính xác
+                values = buf.values
+                best_value = values[cand[0]]
+                for i in range(1, k):
+                    value = values[cand[i]]
+                    if (value > best_value) if maximizing_player else (value < best_value):
+                        best_value = value
+                self.transposition_table[state_key] = (depth, TT_EXACT, best_value)
+                return best_value
 
         best_value = -math.inf if maximizing_player else math.inf
-        best_move = None
 
-        for r, c in moves_to_consider:
-            # Kiểm tra thời gian trước khi thực hiện nước đi
-            if time.time() - start_time >= time_limit:
-                raise TimeoutError("Time limit exceeded")
-
-            board.place(r, c, ai_symbol if maximizing_player else human_symbol)
-            
-            try:
-                # Đệ quy gọi _minimax_id
-                value, _ = self._minimax_id(board, depth - 1, not maximizing_player, alpha, beta, ai_symbol, human_symbol, start_time, time_limit)
-            except TimeoutError:
-                board.undo_last_move() # Đảm bảo hoàn tác nếu có timeout
-                raise # Ném lại ngoại lệ để dừng tìm kiếm
-
-            board.undo_last_move() # Hoàn tác nước đi
+        for i in range(k):
+            idx = cand[i]
+            if depth == 1:
+                value = self._leaf_value(board, ply, idx, maximizing_player, alpha, beta,
+                                         ai_symbol, human_symbol, start_time, time_limit)
+            else:
+                # Đệ quy gọi _minimax_id (qua độ sâu chọn lọc)
+                value = self._search_move(board, ply, i, idx, depth, maximizing_player, alpha, beta,
+                                          ai_symbol, human_symbol, start_time, time_limit, extensions)
 
             if maximizing_player:
                 if value > best_value:
                     best_value = value
-                    best_move = (r, c)
                 alpha = max(alpha, best_value)
             else: # minimizing_player
                 if value < best_value:
                     best_value = value
-                    best_move = (r, c)
                 beta = min(beta, best_value)
 
             # Alpha-Beta Pruning
             if beta <= alpha:
                 break
-        
-        self.transposition_table[state_key] = best_value
-        return best_value, best_move
 
-    def _get_ordered_moves(self, board: Board, player_symbol: str, opponent_symbol: str) -> List[Tuple[int, int]]:
+        if best_value <= alpha_orig:
+            flag = TT_UPPER
+        elif best_value >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.transposition_table[state_key] = (depth, flag, best_value)
+        return best_value
+
+    # ------------------------------------------------------------------ #
+    #                 QUIESCENCE (NƯỚC ÉP BUỘC Ở CHÂN TRỜI)              #
+    # ------------------------------------------------------------------ #
+    def _leaf_value(self, board: Board, ply: int, idx: int, maximizing_player: bool,
+                    alpha: float, beta: float, ai_symbol: str, human_symbol: str,
+                    start_time: float, time_limit: float) -> float:
         """
-        Sắp xếp các nước đi tiềm năng để tối ưu hóa cắt tỉa Alpha-Beta.
-        Ưu tiên: Nước thắng > Nước chặn thắng > Nước tạo chuỗi mở của mình (win_len - 1)
-        > Nước chặn chuỗi mở của đối thủ (win_len - 1) > Các nước đi tạo thế mạnh khác.
+        Giá trị nút lá sau nước *idx* của tầng *ply*: điểm tĩnh từ lượt chấm
+        điểm, hoặc quiescence nếu thế cờ còn nước ép buộc (đối thủ đang dọa
+        thắng / tạo chuỗi mở, hoặc chính nước này tạo đe doạ).
         """
-        legal_moves = list(board.get_legal_moves())
-        
-        # 1. Ưu tiên các nước đi thắng ngay
-        winning_moves = []
-        for r, c in legal_moves:
-            board.place(r, c, player_symbol)
-            if board.has_winner(r, c, player_symbol):
-                winning_moves.append((r, c))
-            board.undo_last_move()
-        if winning_moves:
-            return winning_moves
-
-        # 2. Ưu tiên các nước đi chặn thắng của đối thủ
-        blocking_moves = []
-        for r, c in legal_moves:
-            board.place(r, c, opponent_symbol) # Giả sử đối thủ đi
-            if board.has_winner(r, c, opponent_symbol):
-                blocking_moves.append((r, c))
-            board.undo_last_move()
-        if blocking_moves:
-            return blocking_moves
-
-        # 3. Ưu tiên tạo chuỗi mở (win_len - 1) của mình (tấn công)
-        # và chặn chuỗi mở (win_len - 1) của đối thủ (phòng thủ chủ động)
-        high_priority_moves = []
-        for r, c in legal_moves:
-            # Kiểm tra tạo chuỗi mở của mình
-            board.place(r, c, player_symbol)
-            if self._is_creating_open_sequence(board, player_symbol, (r,c), board._win_len - 1):
-                high_priority_moves.append((r, c))
-            board.undo_last_move()
-        
-        # Sau đó kiểm tra chặn chuỗi mở của đối thủ
-        for r, c in legal_moves:
-            board.place(r, c, opponent_symbol) # Giả sử đối thủ đi
-            if self._is_creating_open_sequence(board, opponent_symbol, (r,c), board._win_len - 1):
-                # Nước này sẽ được AI chặn lại, nên ta thêm vào high_priority_moves cho player_symbol
-                if (r,c) not in high_priority_moves: # Tránh trùng lặp
-                    high_priority_moves.append((r, c))
-            board.undo_last_move()
-
-        if high_priority_moves:
-            random.shuffle(high_priority_moves)
-            return high_priority_moves
-
-        # 4. Đánh giá các nước đi còn lại bằng heuristic
-        scored_moves = []
-        remaining_moves = [move for move in legal_moves if move not in winning_moves and move not in blocking_moves and move not in high_priority_moves]
-
-        for r, c in remaining_moves:
-            board.place(r, c, player_symbol)
-            score = self._evaluate_board_for_ordering(board, player_symbol, opponent_symbol)
-            board.undo_last_move()
-            scored_moves.append((score, (r, c)))
-
-        # Sắp xếp các nước đi giảm dần theo điểm số heuristic
-        scored_moves.sort(key=lambda x: x[0], reverse=True)
-
-        # Kết hợp tất cả các loại nước đi
-        ordered_moves = []
-        ordered_moves.extend(winning_moves)
-        ordered_moves.extend(blocking_moves)
-        ordered_moves.extend(high_priority_moves)
-        ordered_moves.extend([move for score, move in scored_moves])
-                
-        return ordered_moves
-
-    def _is_creating_open_sequence(self, board: Board, symbol: str, move: Tuple[int, int], length: int) -> bool:
-        """
-        Kiểm tra xem việc đặt quân tại 'move' có tạo ra một chuỗi 'length' mở hai đầu hay không.
-        """
-        r_move, c_move = move
-        rows, cols = board.rows, board.cols
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)] # Ngang, dọc, chéo chính, chéo phụ
-
-        for dr, dc in directions:
-            current_len = 0
-            open_ends = 0
-
-            # Kiểm tra về một phía
-            for k in range(length):
-                cur_r, cur_c = r_move + k * dr, c_move + k * dc
-                if not (0 <= cur_r < rows and 0 <= cur_c < cols and board._grid[cur_r][cur_c] == symbol):
-                    break
-                current_len += 1
-            
-            # Nếu chuỗi đạt được độ dài mong muốn từ điểm đặt quân theo một hướng
-            if current_len == length:
-                # Kiểm tra đầu còn lại của chuỗi
-                # Điểm trước chuỗi (ngược hướng)
-                prev_r, prev_c = r_move - dr, c_move - dc
-                if 0 <= prev_r < rows and 0 <= prev_c < cols and board._grid[prev_r][prev_c] == board.EMPTY:
-                    open_ends += 1
-                
-                # Điểm sau chuỗi (cùng hướng)
-                next_r, next_c = r_move + length * dr, c_move + length * dc
-                if 0 <= next_r < rows and 0 <= next_c < cols and board._grid[next_r][next_c] == board.EMPTY:
-                    open_ends += 1
-                
-                if open_ends == 2:
-                    return True # Chuỗi mở hai đầu
-
-            # Reset current_len và kiểm tra theo hướng ngược lại
-            current_len = 0
-            open_ends = 0
-            
-            # Kiểm tra về phía ngược lại (quan trọng cho các chuỗi ở giữa)
-            for k in range(length):
-                cur_r, cur_c = r_move - k * dr, c_move - k * dc
-                if not (0 <= cur_r < rows and 0 <= cur_c < cols and board._grid[cur_r][cur_c] == symbol):
-                    break
-                current_len += 1
-
-            if current_len == length:
-                # Kiểm tra đầu còn lại của chuỗi
-                # Điểm sau chuỗi (ngược hướng với hướng kiểm tra hiện tại)
-                next_r, next_c = r_move + dr, c_move + dc # Đây là đầu ban đầu của chuỗi nếu đi ngược lại
-                if 0 <= next_r < rows and 0 <= next_c < cols and board._grid[next_r][next_c] == board.EMPTY:
-                    open_ends += 1
-                
-                # Điểm trước chuỗi (cùng hướng với hướng kiểm tra hiện tại)
-                prev_r, prev_c = r_move - length * dr, c_move - length * dc
-                if 0 <= prev_r < rows and 0 <= prev_c < cols and board._grid[prev_r][prev_c] == board.EMPTY:
-                    open_ends += 1
-                
-                if open_ends == 2:
-                    return True # Chuỗi mở hai đầu
-
-        return False
-
-    def _evaluate_board_for_ordering(self, board: Board, player_sym: str, opponent_sym: str) -> float:
-        """
-        Hàm đánh giá rút gọn, chỉ tập trung vào việc tạo các chuỗi tiềm năng
-        và kiểm soát trung tâm, dùng để sắp xếp nước đi.
-        """
-        score = 0
-        for length in range(2, board._win_len + 1):
-            score += self._count_sequences(board, player_sym, length) * (10**(length-1)) 
-            score += self._count_open_sequences(board, player_sym, length) * (10**(length)) * 1.2
-
-        for length in range(2, board._win_len + 1):
-            score -= self._count_sequences(board, opponent_sym, length) * (10**(length-1)) * 1.8
-            score -= self._count_open_sequences(board, opponent_sym, length) * (10**(length)) * 2.5
-
-        center_row, center_col = board.rows // 2, board.cols // 2
-        if board._grid[center_row][center_col] == board.EMPTY:
-            score += 50
+        buf = self._plies[ply]
+        value = buf.values[idx]
+        if (not self._q_limit or value == math.inf or value == -math.inf
+                or not (buf.seen & (MOVE_BLOCKS | MOVE_COUNTER)
+                        or buf.flags[idx] & (MOVE_THREAT | MOVE_FOUR))):
+            return value
+        self._play(board, idx, ai_symbol if maximizing_player else human_symbol)
+        try:
+            return self._quiesce(board, not maximizing_player, alpha, beta, ai_symbol, human_symbol,
+                                 start_time, time_limit, ply + 1, self.profile.quiescence_depth)
+        finally:
+            self._unplay(board, idx)
+
+    def _quiesce(self, board: Board, maximizing_player: bool, alpha: float, beta: float,
+                 ai_symbol: str, human_symbol: str, start_time: float, time_limit: float,
+                 ply: int, q_depth: int) -> float:
+        """
+        Quiescence search: chỉ xét nước thắng ngay, nước chặn bắt buộc và nước
+        tạo đe doạ (ô thắng / chuỗi win_len - 1 mở); bên đi có thể "đứng yên"
+        với điểm tĩnh. Dùng ngân sách nút riêng (quiescence_budget, đếm ở
+        q_nodes); hết ngân sách thì trả điểm tĩnh thay vì dừng tìm kiếm.
+        """
+        self.q_nodes += 1
+        if self._budget_armed and time.time() - start_time >= time_limit:
+            raise TimeoutError("Time limit exceeded")
+        if board.is_draw():
+            return 0
+        stand_pat = self._line_total + self._center_total
+        if self.q_nodes > self._q_limit:
+            self.q_exhausted += 1
+            return stand_pat
+
+        if ply == len(self._plies):
+            self._plies.append(_PlyBuffer(len(self._cells)))
+        mover = ai_symbol if maximizing_player else human_symbol
+        k = self._score_moves(board, mover, ply)
+        buf = self._plies[ply]
+        cand, flags, seen = buf.cand, buf.flags, buf.seen
+        win = math.inf if maximizing_player else -math.inf
+        if seen & MOVE_WINS:
+            return win
+        if seen & MOVE_BLOCKS:
+            # Đối thủ dọa thắng: hai ô trở lên thì không chặn kịp, một ô thì bắt buộc chặn
+            forced = -1
+            for i in range(k):
+                if flags[cand[i]] & MOVE_BLOCKS:
+                    if forced >= 0:
+                        return -win
+                    forced = cand[i]
+            self._play(board, forced, mover)
+            try:
+                return self._quiesce(board, not maximizing_player, alpha, beta, ai_symbol, human_symbol,
+                                     start_time, time_limit, ply + 1, q_depth)
+            finally:
+                self._unplay(board, forced)
+
+        best_value = stand_pat
+        if maximizing_player:
+            alpha = max(alpha, best_value)
+        else:
+            beta = min(beta, best_value)
+        if q_depth == 0 or alpha >= beta or not seen & (MOVE_THREAT | MOVE_FOUR):
+            return best_value
+        for i in range(k):
+            idx = cand[i]
+            if not flags[idx] & (MOVE_THREAT | MOVE_FOUR):
+                continue
+            self._play(board, idx, mover)
+            try:
+                value = self._quiesce(board, not maximizing_player, alpha, beta, ai_symbol, human_symbol,
+                                      start_time, time_limit, ply + 1, q_depth - 1)
+            finally:
+                self._unplay(board, idx)
+            if maximizing_player:
+                if value > best_value:
+                    best_value = value
+                alpha = max(alpha, best_value)
+            else:
+                if value < best_value:
+                    best_value = value
+                beta = min(beta, best_value)
+            if beta <= alpha:
+                break
+        return best_value
 
-        return score
+    # ------------------------------------------------------------------ #
+    #          TRẠNG THÁI TÌM KIẾM (CHỈ SỐ Ô, CẬP NHẬT DẦN)              #
+    # ------------------------------------------------------------------ #
+    def _begin_search(self, board: Board, ai_symbol: str, human_symbol: str) -> None:
+        """
+        Dựng trạng thái của lần tìm: ô phẳng theo chỉ số i * cols + j, mã 2 bit
+        của từng đường (_LinePatterns), tổng điểm các đường (= phần heuristic
+        của _evaluate_board), điểm trung tâm và hash Zobrist. Trong lúc tìm,
+        mọi nước đi qua _play / _unplay để cập nhật dần thay vì tính lại.
+        """
+        rows, cols = board.rows, board.cols
+        n = rows * cols
+        self._ai_sym, self._human_sym = ai_symbol, human_symbol
+        self._cols = cols
+        self._need = board._win_len - 1
+        self._coords = board._all_cells()
+        lines, self._cell_lines = _board_lines(rows, cols)
+        self._patterns = patterns = self._line_patterns(board._win_len, ai_symbol)
+
+        if self._search_shape != (rows, cols):
+            # Cấp một lần cho mỗi kích thước bàn, các lần tìm sau ghi đè tại chỗ
+            self._search_shape = (rows, cols)
+            self._cells = [board.EMPTY] * n
+            self._line_codes = [0] * len(lines)
+            self._plies = []
+        # Đủ tầng cho độ sâu tối đa cộng các tầng mở rộng đe doạ của hồ sơ
+        while len(self._plies) < MAX_SEARCH_DEPTH + 1 + self.profile.threat_extensions:
+            self._plies.append(_PlyBuffer(n))
+
+        grid, cells, codes = board._grid, self._cells, self._line_codes
+        for idx, (r, c) in enumerate(self._coords):
+            cells[idx] = grid[r][c]
+        # Đường chỉ có obstacle được 0 điểm; quân được cộng dần như khi đánh
+        obstacle, offset = board.OBSTACLE, patterns.offset
+        for line_id, line in enumerate(lines):
+            code = patterns.empty_code(len(line))
+            for pos, idx in enumerate(line):
+                if cells[idx] == obstacle:
+                    code |= BLOCKED_CODE << (2 * pos + offset)
+            codes[line_id] = code
+        self._line_total = 0
+        for idx, symbol in enumerate(cells):
+            if symbol == ai_symbol or symbol == human_symbol:
+                self._update_lines(idx, board.EMPTY, symbol)
+
+        w = self._weights
+        center_row, center_col = rows // 2, cols // 2
+        self._center_bonus: Dict[int, Dict[str, float]] = {}
+        for r in range(max(0, center_row - 1), min(rows, center_row + 2)):
+            for c in range(max(0, center_col - 1), min(cols, center_col + 2)):
+                if (r, c) == (center_row, center_col):
+                    bonus = {ai_symbol: w["center_own"], human_symbol: -w["center_opp"]}
+                else:
+                    bonus = {ai_symbol: w["ring_own"], human_symbol: -w["ring_opp"]}
+                self._center_bonus[r * cols + c] = bonus
+        self._center_total = sum(bonus.get(cells[idx], 0) for idx, bonus in self._center_bonus.items())
+
+        self._ensure_zobrist(n)
+        self._codes = {board.EMPTY: 0, board.OBSTACLE: 1, ai_symbol: 2, human_symbol: 3}
+        self._hash = 0
+        for idx, symbol in enumerate(cells):
+            self._hash ^= self._zobrist[4 * idx + self._codes[symbol]]
+
+    def _play(self, board: Board, idx: int, symbol: str) -> None:
+        r, c = self._coords[idx]
+        board.place(r, c, symbol)
+        self._set_cell(idx, symbol)
+
+    def _unplay(self, board: Board, idx: int) -> None:
+        board.undo_last_move()
+        self._set_cell(idx, Board.EMPTY)
+
+    def _set_cell(self, idx: int, symbol: str) -> None:
+        """Đổi ô *idx*; cập nhật hash, điểm 4 đường qua ô và điểm trung tâm."""
+        cells = self._cells
+        old = cells[idx]
+        cells[idx] = symbol
+        zobrist, codes = self._zobrist, self._codes
+        self._hash ^= zobrist[4 * idx + codes[old]] ^ zobrist[4 * idx + codes[symbol]]
+
+        self._update_lines(idx, old, symbol)
+
+        bonus = self._center_bonus.get(idx)
+        if bonus is not None:
+            self._center_total += bonus.get(symbol, 0) - bonus.get(old, 0)
+
+    def _update_lines(self, idx: int, old: str, symbol: str) -> None:
+        """
+        Ô *idx* đổi giữa trống và quân: cập nhật mã 4 đường qua ô và tổng
+        điểm đường bằng bảng _LinePatterns (ngữ cảnh hai bên ô không đổi nên
+        bỏ quân = trừ đúng phần đã cộng khi đặt).
+        """
+        pat = self._patterns
+        left, right, mask, lshift, rshift = pat.left, pat.right, pat.mask, pat.lshift, pat.rshift
+        if symbol == Board.EMPTY:
+            gains, sign, diff = pat.delta[old], -1, -CELL_CODES[old]
+        else:
+            gains, sign, diff = pat.delta[symbol], 1, CELL_CODES[symbol]
+        diff <<= pat.offset
+        codes = self._line_codes
+        total = self._line_total
+        for line_id, shift in self._cell_lines[idx]:
+            code = codes[line_id]
+            key = left[(code >> (shift + lshift)) & mask] + right[(code >> (shift + rshift)) & mask]
+            if key < 0:
+                key = pat.slow_key(code, shift)
+            total += sign * gains[key]
+            codes[line_id] = code + (diff << shift)
+        self._line_total = total
+
+    # ------------------------------------------------------------------ #
+    #               CHẤM ĐIỂM NƯỚC ĐI (MỘT LƯỢT / THẾ CỜ)                #
+    # ------------------------------------------------------------------ #
+    def _score_moves(self, board: Board, mover: str, ply: int) -> int:
+        """
+        Chấm mọi ô trống cho *mover* trong một lượt, ghi vào bộ đệm tầng *ply*
+        (cand = chỉ số ô; values / flags theo chỉ số ô); trả số ứng viên.
+        Cờ: thắng ngay / chặn thắng / tạo ô thắng (bộ đếm đoạn của Board),
+        tạo / chặn chuỗi win_len - 1 mở. Giá trị = _evaluate_board sau nước đó = điểm hiện tại
+        (cập nhật dần) + chênh lệch trên 4 đường đi qua ô; chênh lệch và cờ
+        chuỗi mở của mỗi đường là một lần tra bảng _LinePatterns theo mã hai
+        cửa sổ cạnh ô, không phải đặt thử từng nước rồi quét lại đường.
+        """
+        buf = self._plies[ply]
+        cand, values, flags = buf.cand, buf.values, buf.flags
+        ai_symbol = self._ai_sym
+        other = self._human_sym if mover == ai_symbol else ai_symbol
+        win_value = math.inf if mover == ai_symbol else -math.inf
+        base = self._line_total + self._center_total
+        pat = self._patterns
+        left, right, mask, lshift, rshift = pat.left, pat.right, pat.mask, pat.lshift, pat.rshift
+        gains, line_flags = pat.delta[mover], pat.flags[mover]
+        codes, cell_lines, center_bonus = self._line_codes, self._cell_lines, self._center_bonus
+        cols, need = self._cols, self._need
+
+        counts_mover = board._seg_counts[mover]
+        counts_other = board._seg_counts[other]
+        cell_segs = board._cell_segs
+        open_segs = board._open_segs
+        legal = board._legal                   # Chỉ đọc, không sao chép
+        last_move = len(legal) == 1
+
+        k = seen = 0
+        for r, c in legal:
+            idx = r * cols + c
+            segs = cell_segs[idx]
+            f = 0
+            for s in segs:
+                if counts_mover[s] == need:
+                    f |= MOVE_WINS
+                elif counts_mover[s] == need - 1 and not counts_other[s]:
+                    f |= MOVE_FOUR             # Tạo ô thắng cho nước sau
+                if counts_other[s] == need:
+                    f |= MOVE_BLOCKS
+            delta = 0
+            for line_id, shift in cell_lines[idx]:
+                code = codes[line_id]
+                key = left[(code >> (shift + lshift)) & mask] + right[(code >> (shift + rshift)) & mask]
+                if key < 0:
+                    key = pat.slow_key(code, shift)
+                delta += gains[key]
+                f |= line_flags[key]
+
+            if f & MOVE_WINS:
+                value = win_value
+            elif last_move or (open_segs <= len(segs) and open_segs == self._closed_by(segs, counts_mover, counts_other)):
+                value = 0                      # Hòa: bàn đầy hoặc mọi đoạn đã chết
+            else:
+                value = base + delta
+                bonus = center_bonus.get(idx)
+                if bonus is not None:
+                    value += bonus[mover]
+            values[idx] = value
+            flags[idx] = f
+            cand[k] = idx
+            k += 1
+            seen |= f
+        buf.seen = seen
+        return k
+
+    @staticmethod
+    def _closed_by(segs: Tuple[int, ...], counts_mover: List[int], counts_other: List[int]) -> int:
+        """Số đoạn còn sống qua ô sẽ chết khi *mover* đi vào (đã có quân đối thủ)."""
+        closed = 0
+        for s in segs:
+            if counts_other[s] and not counts_mover[s]:
+                closed += 1
+        return closed
+
+    def _order_moves(self, ply: int, k: int, maximizing: bool) -> int:
+        """
+        Sắp xếp k ứng viên của tầng *ply* tại chỗ để tối ưu hóa cắt tỉa
+        Alpha-Beta; trả số nước cần xét.
+        Ưu tiên: Nước thắng > Nước chặn thắng > Nước tạo / chặn chuỗi mở
+        (win_len - 1) > các nước còn lại theo giá trị (AI giảm dần, người tăng
+        dần). Ba nhóm đầu đứng một mình thì chỉ xét nhóm đó.
+        """
+        buf = self._plies[ply]
+        cand, flags, seen = buf.cand, buf.flags, buf.seen
+        if seen & (MOVE_WINS | MOVE_BLOCKS):
+            mask = MOVE_WINS if seen & MOVE_WINS else MOVE_BLOCKS
+            j = 0
+            for i in range(k):
+                idx = cand[i]
+                if flags[idx] & mask:
+                    cand[j] = idx
+                    j += 1
+            return j
+        if seen & (MOVE_THREAT | MOVE_COUNTER):
+            tmp = buf.tmp
+            j = 0
+            for i in range(k):
+                idx = cand[i]
+                if flags[idx] & MOVE_THREAT:
+                    tmp[j] = idx
+                    j += 1
+            for i in range(k):
+                idx = cand[i]
+                if flags[idx] & (MOVE_THREAT | MOVE_COUNTER) == MOVE_COUNTER:
+                    tmp[j] = idx
+                    j += 1
+            randrange = self._rng.randrange
+            for i in range(j - 1, 0, -1):      # Fisher-Yates trên j phần tử đầu
+                r = randrange(i + 1)
+                tmp[i], tmp[r] = tmp[r], tmp[i]
+            buf.cand, buf.tmp = tmp, cand
+            return j
+        cand[:k] = sorted(cand[:k], key=buf.values.__getitem__, reverse=maximizing)
+        return k
+
+    def _run_table(self, win_len: int, max_len: int) -> List[List[float]]:
+        """
+        table[2 * (của AI) + (mở hai đầu)][L] = điểm của một chuỗi dài L, đúng
+        bằng phần chuỗi đó góp vào _evaluate_board với trọng số của hồ sơ.
+        """
+        key = (win_len, max_len)
+        table = self._run_tables.get(key)
+        if table is None:
+            w = self._weights
+            table = [[], [], [], []]
+            for own, prefix, sign in ((True, "own_", 1), (False, "opp_", -1)):
+                for is_open in (False, True):
+                    values = [0.0] * (max_len + 1)
+                    for length in range(1, max_len + 1):
+                        v = 0
+                        for k, tag in ((win_len - 1, "1"), (win_len - 2, "2")):
+                            if 0 <= k <= length:
+                                v += w[f"{prefix}seq_{tag}"]
+                            if is_open and length == k:
+                                v += w[f"{prefix}open_{tag}"]
+                        if length >= 2:
+                            v += w[f"{prefix}len2"]
+                        if length >= 3:
+                            v += w[f"{prefix}len3"]
+                        values[length] = sign * v
+                    table[2 * own + is_open] = values
+            self._run_tables[key] = table
+        return table
+
+    def _line_patterns(self, win_len: int, ai_symbol: str) -> "_LinePatterns":
+        """Bảng tra theo mẫu của (win_len, bên AI), dựng từ _run_table của hồ sơ."""
+        key = (win_len, ai_symbol)
+        patterns = self._pattern_tables.get(key)
+        if patterns is None:
+            # Đường đại diện: tối đa max(win_len, 3) + 1 ô mỗi bên + ô đang xét
+            run_table = self._run_table(win_len, 2 * max(win_len, 3) + 3)
+            patterns = self._pattern_tables[key] = _LinePatterns(win_len, ai_symbol, run_table)
+        return patterns
+
+    def _evaluate_lines(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
+        """_evaluate_board (phần heuristic) tính theo các đường; dùng để kiểm tra."""
+        table = self._run_table(board._win_len, max(board.rows, board.cols))
+        cells = [board._grid[r][c] for r, c in board._all_cells()]
+        lines, _ = _board_lines(board.rows, board.cols)
+        return (sum(_line_score([cells[i] for i in line], ai_symbol, table) for line in lines)
+                + self._center_score(board, ai_symbol, human_symbol))
 
     def _evaluate_board(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
         """
@@ -443,44 +1085,51 @@ class MinimaxAI:
         elif board.is_draw():
             return 0 # Hòa
 
+        # Trọng số lấy từ hồ sơ độ khó (ai_profiles.DEFAULT_WEIGHTS)
+        w = self._weights
+        win_len = board._win_len
+
         # Heuristic cho AI (tạo thế mạnh)
         ai_eval_score = 0
-        ai_eval_score += self._count_open_sequences(board, ai_symbol, board._win_len - 1) * 1000000
-        ai_eval_score += self._count_sequences(board, ai_symbol, board._win_len - 1) * 20000
-        ai_eval_score += self._count_open_sequences(board, ai_symbol, board._win_len - 2) * 10000
-        ai_eval_score += self._count_sequences(board, ai_symbol, board._win_len - 2) * 2000
-        ai_eval_score += self._count_sequences(board, ai_symbol, 2) * 100
-        ai_eval_score += self._count_sequences(board, ai_symbol, 3) * 400
+        ai_eval_score += self._count_open_sequences(board, ai_symbol, win_len - 1) * w["own_open_1"]
+        ai_eval_score += self._count_sequences(board, ai_symbol, win_len - 1) * w["own_seq_1"]
+        ai_eval_score += self._count_open_sequences(board, ai_symbol, win_len - 2) * w["own_open_2"]
+        ai_eval_score += self._count_sequences(board, ai_symbol, win_len - 2) * w["own_seq_2"]
+        ai_eval_score += self._count_sequences(board, ai_symbol, 2) * w["own_len2"]
+        ai_eval_score += self._count_sequences(board, ai_symbol, 3) * w["own_len3"]
 
         # Heuristic cho người chơi (phòng thủ), tăng cường hình phạt
         human_eval_score = 0
-        human_eval_score += self._count_open_sequences(board, human_symbol, board._win_len - 1) * 2000000
-        human_eval_score += self._count_sequences(board, human_symbol, board._win_len - 1) * 30000
-        human_eval_score += self._count_open_sequences(board, human_symbol, board._win_len - 2) * 15000
-        human_eval_score += self._count_sequences(board, human_symbol, board._win_len - 2) * 2500
-        human_eval_score += self._count_sequences(board, human_symbol, 2) * 120
-        human_eval_score += self._count_sequences(board, human_symbol, 3) * 500
-
-        # Ưu tiên các ô ở trung tâm (thường là vị trí chiến lược)
+        human_eval_score += self._count_open_sequences(board, human_symbol, win_len - 1) * w["opp_open_1"]
+        human_eval_score += self._count_sequences(board, human_symbol, win_len - 1) * w["opp_seq_1"]
+        human_eval_score += self._count_open_sequences(board, human_symbol, win_len - 2) * w["opp_open_2"]
+        human_eval_score += self._count_sequences(board, human_symbol, win_len - 2) * w["opp_seq_2"]
+        human_eval_score += self._count_sequences(board, human_symbol, 2) * w["opp_len2"]
+        human_eval_score += self._count_sequences(board, human_symbol, 3) * w["opp_len3"]
+
+        score = ai_eval_score - human_eval_score + self._center_score(board, ai_symbol, human_symbol)
+        return score
+
+    def _center_score(self, board: Board, ai_symbol: str, human_symbol: str) -> float:
+        """Ưu tiên các ô ở trung tâm (thường là vị trí chiến lược)."""
+        w = self._weights
         center_score = 0
         center_row, center_col = board.rows // 2, board.cols // 2
         
         if board._grid[center_row][center_col] == ai_symbol:
-            center_score += 200
+            center_score += w["center_own"]
         elif board._grid[center_row][center_col] == human_symbol:
-            center_score -= 250
+            center_score -= w["center_opp"]
         
         neighbors = [(r, c) for r in range(max(0, center_row-1), min(board.rows, center_row+2))
                              for c in range(max(0, center_col-1), min(board.cols, center_col+2))
                              if (r,c) != (center_row, center_col)]
         for r, c in neighbors:
             if board._grid[r][c] == ai_symbol:
-                center_score += 40
+                center_score += w["ring_own"]
             elif board._grid[r][c] == human_symbol:
-                center_score -= 50
-
-        score = ai_eval_score - human_eval_score + center_score
-        return score
+                center_score -= w["ring_opp"]
+        return center_score
 
     def _count_sequences(self, board: Board, symbol: str, length: int) -> int:
         """
@@ -557,17 +1206,6 @@ class MinimaxAI:
                                 count += 1
         return count
 
-    def _calculate_zobrist_hash(self, board: Board) -> str:
-        """
-        Tính toán Zobrist Hash cho trạng thái bàn cờ hiện tại.
-        """
-        current_hash = 0
-        for r in range(board.rows):
-            for c in range(board.cols):
-                symbol = board._grid[r][c]
-                current_hash ^= self.zobrist_keys.get((r, c, symbol), 0) 
-        return str(current_hash)
-
     def _get_state_representation(self, board: Board) -> Tuple[str, ...]:
         """
         Tạo một biểu diễn trạng thái bàn cờ dưới dạng tuple để sử dụng cho Q-table.
@@ -583,7 +1221,7 @@ class MinimaxAI:
         reward: float,
     ) -> None:
         """
-        Cập nhật Q-table cho Q-learning (chỉ dùng cho difficulty "easy").
+        Cập nhật Q-table cho Q-learning (chỉ dùng cho strategy "qlearning").
         """
         if self.last_state is None or self.last_action is None:
             return
@@ -0,0 +1,535 @@
+"""
+Giải cấu hình bàn bằng proof-number search (df-pn)
+=========================================================
+Trả lời câu hỏi "cấu hình (rows, cols, win_len, obstacle) này bên đi trước
+có thắng chắc không?". PNSolver chứng minh / bác bỏ mục tiêu "attacker
+thắng" bằng depth-first proof-number search (df-pn):
+
+• Nút OR (attacker đi) / AND (defender đi) theo dạng phi / delta: phi là
+  proof number của bên đang đi, delta là disproof number; hoà tính là
+  attacker thua.
+• Cắt nhánh như luật cờ: thắng ngay là lá; đối thủ có một ô thắng thì
+  phải chặn đúng ô đó, có hai ô trở lên thì thua; attacker hết đoạn thắng
+  còn sống thì bị bác bỏ. Chỉ xét ô thuộc đoạn còn sống của một trong hai
+  bên (ô khác chỉ như bỏ lượt).
+• Transposition table khoá bằng Zobrist hash (không có chu trình: quân chỉ
+  được thêm vào); khi vượt max_entries, bỏ một nửa mục tốn ít công nhất,
+  ưu tiên giữ mục đã chứng minh.
+• max_nodes / time_limit: vượt thì kết quả là "unknown".
+
+Kết quả có thể lưu vào sổ chứng minh (ProofBook, file AI_PROOFS_PATH):
+kết quả của cấu hình + nước của bên thắng trên cây chứng minh, hoặc nước
+giữ hoà của cả hai bên nếu cấu hình hoà. Hồ sơ có use_proofs (xem
+ai_profiles) đánh theo sổ khi thế cờ có trong đó (bot cầm O dùng được
+sổ trên cấu hình hoà); HomeScreen từ chối cấu hình không obstacle đã được
+chứng minh là thắng chắc.
+
+    python pn_solver.py --rows 4 --cols 4 --win-len 3 --save
+    python pn_solver.py --rows 5 --cols 5 --win-len 4 --obstacles 5 --seed 7 --max-nodes 2000000
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from board import Board
+from game_config import AI_PROOFS_PATH
+
+logger = logging.getLogger(__name__)
+
+INF = 10 ** 9                   # phi / delta của nút đã giải
+ZOBRIST_SEED = 0x5EED           # Cố định: cùng thế cờ cùng khoá giữa các lần chạy
+DEFAULT_MAX_NODES = 1_000_000
+DEFAULT_MAX_ENTRIES = 2_000_000
+PROOFS_VERSION = 1
+MAX_PROOF_MOVES = 50_000        # Số thế cờ tối đa của mỗi cấu hình trong sổ
+
+RESULT_DRAW = "draw"
+RESULT_UNKNOWN = "unknown"
+
+_UNKNOWN_NODE = (1, 1, 0)
+
+
+class ProofResult(NamedTuple):
+    result: str                             # "X", "O", "draw" hoặc "unknown"
+    nodes: int
+    seconds: float
+    tt_size: int
+    first_move: Optional[Tuple[int, int]]   # Nước thắng của bên đang đi (nếu có)
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _other(symbol: str) -> str:
+    x, o = Board._PLAYERS
+    return o if symbol == x else x
+
+
+def to_move(board: Board) -> str:
+    """Bên tới lượt: X đi trước nên số quân bằng nhau là lượt X."""
+    x, o = Board._PLAYERS
+    grid = board._grid
+    n_x = sum(row.count(x) for row in grid)
+    n_o = sum(row.count(o) for row in grid)
+    return x if n_x == n_o else o
+
+
+def position_key(board: Board) -> str:
+    """Khoá thế cờ trong sổ: ký hiệu các ô theo hàng."""
+    return "".join("".join(row) for row in board._grid)
+
+
+def config_key(rows: int, cols: int, win_len: int, obstacles: Iterable[int] = ()) -> str:
+    """Khoá cấu hình: kích thước, win_len và chỉ số ô obstacle (r * cols + c)."""
+    key = f"{rows}x{cols}w{win_len}"
+    cells = sorted(obstacles)
+    return f"{key}|{','.join(map(str, cells))}" if cells else key
+
+
+def board_config_key(board: Board) -> str:
+    return config_key(board.rows, board.cols, board.win_len,
+                      (r * board.cols + c for r, c in board.obstacles))
+
+
+def _symmetries(rows: int, cols: int, obstacles: List[int]) -> List[List[int]]:
+    """
+    Các phép đối xứng của bàn (lật / xoay; bàn vuông có 8, bàn chữ nhật 4)
+    giữ nguyên tập obstacle, dạng hoán vị ô -> ô; phép đồng nhất đứng đầu.
+    """
+    maps = [lambda r, c: (r, c), lambda r, c: (rows - 1 - r, c),
+            lambda r, c: (r, cols - 1 - c), lambda r, c: (rows - 1 - r, cols - 1 - c)]
+    if rows == cols:
+        maps += [lambda r, c: (c, r), lambda r, c: (cols - 1 - c, r),
+                 lambda r, c: (c, rows - 1 - r), lambda r, c: (cols - 1 - c, rows - 1 - r)]
+    blocked = set(obstacles)
+    perms = []
+    for f in maps:
+        perm = [0] * (rows * cols)
+        for r in range(rows):
+            for c in range(cols):
+                i, j = f(r, c)
+                perm[r * cols + c] = i * cols + j
+        if {perm[i] for i in blocked} == blocked:
+            perms.append(perm)
+    return perms
+
+
+# ------------------------------------------------------------------ #
+#                               DF-PN                                #
+# ------------------------------------------------------------------ #
+class PNSolver:
+    """df-pn cho mục tiêu "attacker thắng" trên một Board (không sửa Board)."""
+
+    def __init__(self, max_nodes: Optional[int] = DEFAULT_MAX_NODES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 time_limit: Optional[float] = None) -> None:
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.evicted = 0
+        self._tt: Dict[int, Tuple[int, int, int]] = {}
+
+    # ---------------------------- API ---------------------------- #
+    def prove(self, board: Board, attacker: str) -> Optional[bool]:
+        """True = attacker thắng chắc, False = không thắng được, None = hết ngân sách."""
+        self._setup(board, attacker)
+        if board.has_winner_any():
+            return board.get_winner_symbol() == attacker
+        self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        try:
+            self._mid(min(self._hashes), self._root_mover, INF, INF)
+        except _BudgetExceeded:
+            return None
+        phi, delta, _ = self._tt[min(self._hashes)]
+        proven = phi == 0 if self._root_mover == attacker else delta == 0
+        return proven
+
+    def winning_move(self) -> Optional[int]:
+        """Sau prove() thành công với attacker đang đi: chỉ số ô thắng ở gốc."""
+        if self._root_mover != self._attacker:
+            return None
+        return self._proof_child(self._root_mover)
+
+    def proof_moves(self, limit: int = MAX_PROOF_MOVES, side: Optional[str] = None) -> Dict[str, int]:
+        """
+        Nước của *side* trên cây lời giải (khoá thế cờ -> chỉ số ô), tối đa
+        *limit* thế cờ. Mặc định *side* là attacker sau prove() thành công;
+        sau prove() thất bại, side = defender cho các nước giữ attacker
+        không thắng được (hoà hoặc defender thắng). Nhánh có mục đã bị bỏ
+        khỏi transposition table thì dừng ở đó (sổ chỉ thiếu, không sai).
+        """
+        side = side or self._attacker
+        moves: Dict[str, int] = {}
+        seen = set()
+
+        def walk(mover: str) -> None:
+            position = "".join(self._cells)
+            if position in seen or len(moves) >= limit:
+                return
+            seen.add(position)
+            children, terminal = self._expand(mover)
+            if terminal is not None:
+                return
+            if mover == side:
+                idx = self._proof_child(mover)
+                if idx is None:
+                    return
+                moves[position] = idx
+                children = [idx]
+            for idx in children:
+                self._place(idx, mover)
+                walk(_other(mover))
+                self._remove(idx, mover)
+
+        walk(self._root_mover)
+        return moves
+
+    # ------------------------- TRẠNG THÁI ------------------------- #
+    def _setup(self, board: Board, attacker: str) -> None:
+        rows, cols = board.rows, board.cols
+        self._attacker, self._defender = attacker, _other(attacker)
+        self._win_len = board.win_len
+        self._cells: List[str] = [v for row in board._grid for v in row]
+        self._cell_segs = board._cell_segs
+        seg_cells: List[List[int]] = [[] for _ in range(board._n_segs)]
+        for idx, segs in enumerate(self._cell_segs):
+            for s in segs:
+                seg_cells[s].append(idx)
+        self._seg_cells = [tuple(cells) for cells in seg_cells]
+        self._counts = {p: list(board._seg_counts[p]) for p in Board._PLAYERS}
+        # Ô nhiều đoạn đi qua (gần tâm) được xét trước khi phi / delta bằng nhau
+        self._order = sorted(range(rows * cols), key=lambda i: -len(self._cell_segs[i]))
+        # Mỗi phép đối xứng giữ nguyên obstacle có một bảng Zobrist (ảnh của
+        # ô qua phép đó); khoá của thế cờ là hash nhỏ nhất -> các thế cờ đối
+        # xứng nhau dùng chung một mục, nước đối xứng ở cùng nút bị gộp
+        rng = random.Random(ZOBRIST_SEED)
+        base = {p: [rng.getrandbits(64) for _ in range(rows * cols)] for p in Board._PLAYERS}
+        perms = _symmetries(rows, cols, [i for i, v in enumerate(self._cells) if v == Board.OBSTACLE])
+        self._zobrist = {p: [[keys[perm[i]] for i in range(rows * cols)] for perm in perms]
+                         for p, keys in base.items()}
+        self._hashes = [0] * len(perms)
+        for idx, v in enumerate(self._cells):
+            if v in self._zobrist:
+                self._toggle(idx, v)
+        self._root_mover = to_move(board)
+        self._tt.clear()
+        self.nodes = self.evicted = 0
+
+    def _toggle(self, idx: int, symbol: str) -> None:
+        hashes = self._hashes
+        for t, keys in enumerate(self._zobrist[symbol]):
+            hashes[t] ^= keys[idx]
+
+    def _children(self, mover: str, moves: List[int]) -> Tuple[List[int], List[int]]:
+        """(nước, khoá thế cờ con) sau khi gộp các nước cho cùng thế cờ (đối xứng)."""
+        pairs = list(zip(self._hashes, self._zobrist[mover]))
+        seen = set()
+        kept, child_keys = [], []
+        for idx in moves:
+            key = min(h ^ keys[idx] for h, keys in pairs)
+            if key not in seen:
+                seen.add(key)
+                kept.append(idx)
+                child_keys.append(key)
+        return kept, child_keys
+
+    def _place(self, idx: int, symbol: str) -> None:
+        self._cells[idx] = symbol
+        self._toggle(idx, symbol)
+        counts = self._counts[symbol]
+        for s in self._cell_segs[idx]:
+            counts[s] += 1
+
+    def _remove(self, idx: int, symbol: str) -> None:
+        self._cells[idx] = Board.EMPTY
+        self._toggle(idx, symbol)
+        counts = self._counts[symbol]
+        for s in self._cell_segs[idx]:
+            counts[s] -= 1
+
+    def _expand(self, mover: str) -> Tuple[List[int], Optional[Tuple[int, int]]]:
+        """
+        (nước cần xét, None) hoặc ([], (phi, delta)) nếu thế cờ đã rõ kết quả
+        với bên *mover* đang đi.
+        """
+        opp = _other(mover)
+        own_c, opp_c = self._counts[mover], self._counts[opp]
+        need = self._win_len - 1
+        cells, seg_cells = self._cells, self._seg_cells
+        empty = Board.EMPTY
+        defender_c = self._counts[self._defender]
+        attacker_live = False
+        live = set()
+        must = set()
+        for s, cell_list in enumerate(seg_cells):
+            n_own, n_opp = own_c[s], opp_c[s]
+            if n_opp == 0:
+                if n_own == need:
+                    return [], (0, INF)                 # Thắng ngay
+                live.update(cell_list)
+            if n_own == 0:
+                if n_opp == need:
+                    must.update(i for i in cell_list if cells[i] == empty)
+                live.update(cell_list)
+            if defender_c[s] == 0:
+                attacker_live = True
+        mover_succeeds = (0, INF)
+        mover_fails = (INF, 0)
+        if not attacker_live:
+            return [], mover_fails if mover == self._attacker else mover_succeeds
+        if len(must) > 1:
+            return [], mover_fails                      # Không chặn hết được
+        if must:
+            return list(must), None
+        moves = [i for i in self._order if i in live and cells[i] == empty]
+        if not moves:                                   # Hoà: attacker không thắng
+            return [], mover_fails if mover == self._attacker else mover_succeeds
+        return moves, None
+
+    # ---------------------------- TÌM ---------------------------- #
+    def _mid(self, h: int, mover: str, th_phi: int, th_delta: int) -> None:
+        """Mở rộng nút *h* tới khi phi >= th_phi hoặc delta >= th_delta."""
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _BudgetExceeded()
+        if self._deadline is not None and not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _BudgetExceeded()
+        start = self.nodes
+        moves, terminal = self._expand(mover)
+        if terminal is not None:
+            self._store(h, terminal[0], terminal[1], 1)
+            return
+        tt = self._tt
+        moves, child_keys = self._children(mover, moves)
+        opp = _other(mover)
+        while True:
+            # phi = min delta(con), delta = tổng phi(con)
+            best = -1
+            best_phi = 0
+            delta1 = delta2 = INF
+            phi_sum = 0
+            for i, key in enumerate(child_keys):
+                c_phi, c_delta, _ = tt.get(key, _UNKNOWN_NODE)
+                phi_sum += c_phi
+                if c_delta < delta1:
+                    delta2, delta1 = delta1, c_delta
+                    best, best_phi = i, c_phi
+                elif c_delta < delta2:
+                    delta2 = c_delta
+            phi, delta = delta1, min(phi_sum, INF)
+            if phi >= th_phi or delta >= th_delta:
+                break
+            idx = moves[best]
+            child_th_phi = min(INF, th_delta - delta + best_phi)
+            child_th_delta = min(th_phi, delta2 + 1)
+            self._place(idx, mover)
+            try:
+                self._mid(child_keys[best], opp, child_th_phi, child_th_delta)
+            finally:
+                self._remove(idx, mover)
+        self._store(h, phi, delta, self.nodes - start + 1)
+
+    def _store(self, h: int, phi: int, delta: int, work: int) -> None:
+        tt = self._tt
+        tt[h] = (phi, delta, work)
+        if len(tt) > self.max_entries:
+            # Giữ nửa tốn nhiều công nhất, mục đã giải đứng trước
+            keep = sorted(tt.items(), key=lambda item: (min(item[1][0], item[1][1]) == 0, item[1][2]),
+                          reverse=True)[:self.max_entries // 2]
+            self.evicted += len(tt) - len(keep)
+            tt.clear()
+            tt.update(keep)
+
+    def _proof_child(self, mover: str) -> Optional[int]:
+        """Con đã bị bác bỏ (delta = 0) của thế cờ hiện tại, tức nước thắng của *mover*."""
+        moves, terminal = self._expand(mover)
+        if terminal is not None:
+            return self._winning_cell(mover) if terminal[0] == 0 else None
+        for idx, key in zip(*self._children(mover, moves)):
+            entry = self._tt.get(key)
+            if entry is not None and entry[1] == 0:
+                return idx
+        return None
+
+    def _winning_cell(self, mover: str) -> Optional[int]:
+        own_c, opp_c = self._counts[mover], self._counts[_other(mover)]
+        need = self._win_len - 1
+        for s, cell_list in enumerate(self._seg_cells):
+            if own_c[s] == need and opp_c[s] == 0:
+                for i in cell_list:
+                    if self._cells[i] == Board.EMPTY:
+                        return i
+        return None
+
+
+def analyse(board: Board, max_nodes: Optional[int] = DEFAULT_MAX_NODES,
+            max_entries: int = DEFAULT_MAX_ENTRIES, time_limit: Optional[float] = None,
+            proof_moves: Optional[Dict[str, int]] = None,
+            draw_moves: Optional[Dict[str, Dict[str, int]]] = None) -> ProofResult:
+    """
+    Kết quả khi cả hai bên đánh đúng từ thế cờ *board*: thử chứng minh bên
+    đang đi thắng, không được thì bên kia thắng, bác bỏ cả hai là hoà.
+    *max_nodes* / *time_limit* áp cho từng lần chứng minh. Nếu truyền
+    *proof_moves*, nước của bên thắng trên cây chứng minh được thêm vào đó;
+    nếu truyền *draw_moves* và kết quả là hoà, draw_moves[bên] = nước giữ
+    hoà của bên đó (trên cây bác bỏ "đối thủ thắng").
+    """
+    t0 = time.perf_counter()
+    mover = to_move(board)
+    solver = PNSolver(max_nodes, max_entries, time_limit)
+    nodes = tt_size = 0
+    result, first_move = RESULT_UNKNOWN, None
+    unknown = False
+    holds: Dict[str, Dict[str, int]] = {}
+    for attacker in (mover, _other(mover)):
+        proven = solver.prove(board, attacker)
+        if proven is False and draw_moves is not None:
+            holds[_other(attacker)] = solver.proof_moves(side=_other(attacker))
+        nodes += solver.nodes
+        tt_size = max(tt_size, len(solver._tt))
+        if proven:
+            result = attacker
+            idx = None if board.has_winner_any() else solver.winning_move()
+            if idx is not None:
+                first_move = (idx // board.cols, idx % board.cols)
+            if proof_moves is not None:
+                proof_moves.update(solver.proof_moves())
+            break
+        unknown = unknown or proven is None
+    else:
+        result = RESULT_UNKNOWN if unknown else RESULT_DRAW
+        if result == RESULT_DRAW and draw_moves is not None:
+            draw_moves.update(holds)
+    return ProofResult(result, nodes, round(time.perf_counter() - t0, 3), tt_size, first_move)
+
+
+# ------------------------------------------------------------------ #
+#                           SỔ CHỨNG MINH                            #
+# ------------------------------------------------------------------ #
+class ProofBook:
+    """
+    Khoá cấu hình -> {"result", "nodes", "seconds", "moves", "draws"};
+    "moves" là nước của bên thắng theo khoá thế cờ, "draws" (cấu hình hoà)
+    là nước giữ hoà của từng bên. Bên thua không có mục nào: mọi nước đều
+    thua nếu đối thủ đánh đúng, để tìm kiếm thường chọn. Nạp lười từ file,
+    ghi lại mỗi khi thêm cấu hình.
+    """
+
+    def __init__(self, path: Optional[str] = AI_PROOFS_PATH) -> None:
+        self.path = path
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def result(self, rows: int, cols: int, win_len: int, obstacles: Iterable[int] = ()) -> Optional[str]:
+        """Kết quả đã chứng minh của cấu hình (None nếu chưa có trong sổ)."""
+        entry = self._load().get(config_key(rows, cols, win_len, obstacles))
+        return entry["result"] if entry else None
+
+    def move(self, board: Board, symbol: str) -> Optional[Tuple[int, int]]:
+        """
+        Nước theo sổ cho *symbol* nếu thế cờ nằm trên cây lời giải: nước
+        thắng khi cấu hình là *symbol* thắng, nước giữ hoà khi cấu hình hoà.
+        """
+        entries = self._load()
+        if not entries:
+            return None
+        entry = entries.get(board_config_key(board))
+        if not entry:
+            return None
+        if entry["result"] == symbol:
+            moves = entry["moves"]
+        elif entry["result"] == RESULT_DRAW:
+            moves = entry.get("draws", {}).get(symbol, {})
+        else:
+            return None
+        idx = moves.get(position_key(board))
+        if idx is None:
+            return None
+        move = divmod(idx, board.cols)
+        return move if board.is_empty(*move) else None
+
+    def record(self, key: str, result: ProofResult, moves: Dict[str, int],
+               draw_moves: Optional[Dict[str, Dict[str, int]]] = None) -> None:
+        with self._lock:
+            self._load()[key] = {"result": result.result, "nodes": result.nodes,
+                                 "seconds": result.seconds, "moves": moves,
+                                 "draws": draw_moves or {}}
+            self._save()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as fh:
+                        data = json.load(fh)
+                    if data.get("version") == PROOFS_VERSION:
+                        self._entries = dict(data["configs"])
+                except (OSError, ValueError, KeyError) as exc:
+                    logger.warning(f"Ignoring {self.path}: {exc}")
+        return self._entries
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        data = {"version": PROOFS_VERSION, "configs": self._entries}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logger.warning(f"Cannot save {self.path}: {exc}")
+
+
+_DEFAULT: Optional[ProofBook] = None
+
+
+def get_proofs() -> ProofBook:
+    """ProofBook dùng chung của tiến trình (file AI_PROOFS_PATH)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = ProofBook()
+    return _DEFAULT
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=4)
+    ap.add_argument("--cols", type=int, default=4)
+    ap.add_argument("--win-len", type=int, default=3)
+    ap.add_argument("--obstacles", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=0, help="seed của vị trí obstacle")
+    ap.add_argument("--symmetric", action="store_true", help="obstacle đối xứng tâm")
+    ap.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES, help="mỗi lần chứng minh")
+    ap.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                    help="số mục transposition table tối đa")
+    ap.add_argument("--time-limit", type=float, default=None, help="giây, mỗi lần chứng minh")
+    ap.add_argument("--save", action="store_true", help=f"ghi kết quả vào {AI_PROOFS_PATH}")
+    args = ap.parse_args()
+
+    board = Board(args.rows, args.cols, args.win_len, args.obstacles, seed=args.seed,
+                  symmetric_obstacles=args.symmetric)
+    moves: Dict[str, int] = {}
+    draw_moves: Dict[str, Dict[str, int]] = {}
+    res = analyse(board, args.max_nodes, args.max_entries, args.time_limit, moves, draw_moves)
+    key = board_config_key(board)
+    print(f"{key}: {res.result}  nodes={res.nodes}  time={res.seconds:.2f}s  "
+          f"nodes/s={res.nodes / max(res.seconds, 1e-6):.0f}  tt={res.tt_size}"
+          + (f"  first move={res.first_move}" if res.first_move else ""))
+    if args.save and res.result != RESULT_UNKNOWN:
+        get_proofs().record(key, res, moves, draw_moves)
+        saved = len(moves) + sum(map(len, draw_moves.values()))
+        print(f"saved {saved} proof moves to {AI_PROOFS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
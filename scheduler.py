@@ -0,0 +1,94 @@
+"""
+Bộ lập lịch cho GameController
+=====================================================
+GameController không gọi thẳng kivy.clock.Clock mà dùng một Scheduler:
+• KivyScheduler     – Clock của Kivy (ứng dụng có giao diện).
+• AsyncioScheduler  – event loop asyncio (server, công cụ chạy nền).
+• ImmediateScheduler – chạy đồng bộ ngay sau lời gọi hiện tại (test,
+  batch simulator): không cần event loop, không chờ delay.
+"""
+
+import asyncio
+from collections import deque
+from typing import Callable, Optional, Protocol
+
+
+class Scheduler(Protocol):
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Gọi *callback* sau *delay* giây."""
+        ...
+
+    def create_trigger(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Trả hàm kích hoạt: gọi nhiều lần trong một frame -> *callback* chạy một lần."""
+        ...
+
+
+class KivyScheduler:
+    """Dùng Clock của Kivy (import lười để phần lõi không phụ thuộc Kivy)."""
+
+    def __init__(self) -> None:
+        from kivy.clock import Clock
+        self._clock = Clock
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self._clock.schedule_once(lambda *_: callback(), delay)
+
+    def create_trigger(self, callback: Callable[[], None]) -> Callable[[], None]:
+        return self._clock.create_trigger(lambda *_: callback())
+
+
+class AsyncioScheduler:
+    """Dùng event loop asyncio; trigger gộp về một lần call_soon mỗi vòng lặp."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self._loop = loop
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self.loop.call_later(delay, callback)
+
+    def create_trigger(self, callback: Callable[[], None]) -> Callable[[], None]:
+        pending = False
+
+        def _run() -> None:
+            nonlocal pending
+            pending = False
+            callback()
+
+        def trigger() -> None:
+            nonlocal pending
+            if not pending:
+                pending = True
+                self.loop.call_soon(_run)
+        return trigger
+
+
+class ImmediateScheduler:
+    """
+    Chạy callback đồng bộ, bỏ qua delay. Callback đặt trong lúc một callback
+    khác đang chạy được xếp hàng (trampoline) nên không đệ quy sâu khi AI
+    và người giả lập đánh liên tiếp hàng trăm nước.
+    """
+
+    def __init__(self) -> None:
+        self._queue: deque = deque()
+        self._running = False
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self._queue.append(callback)
+        if self._running:
+            return
+        self._running = True
+        try:
+            while self._queue:
+                self._queue.popleft()()
+        finally:
+            self._running = False
+
+    def create_trigger(self, callback: Callable[[], None]) -> Callable[[], None]:
+        return callback
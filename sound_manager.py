@@ -1,39 +1,115 @@
-from kivy.core.audio import SoundLoader
-from game_config import SOUND_DIR, SOUND_BG_MUSIC, SOUND_CLICK_TAP, SOUND_DRAW, SOUND_WIN, SOUND_CLICK_BTN, VOLUME_DEFAULT
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from game_config import (
+    SOUND_DIR, SOUND_BG_MUSIC, SOUND_CLICK_TAP, SOUND_DRAW, SOUND_WIN, SOUND_CLICK_BTN,
+    VOLUME_DEFAULT, MAX_TAP_VOICES,
+)
 
 """
 Quản lý nhạc nền & hiệu ứng âm thanh
 ==========================================================
-• Tải file âm thanh một lần, tái sử dụng suốt vòng lặp app.
-• Phát nhạc nền lặp (loop) & SFX (tap, win, draw, click).
+• Một dịch vụ âm thanh dùng chung cho cả tiến trình (SoundManager.shared()).
+• Tải file một lần: preload() nạp nền trong thread, còn lại nạp lười khi phát.
+• File thiếu (vd. bg_music.ogg) chỉ được log một lần rồi bỏ qua.
+• Tap phát qua một nhóm voice giới hạn (MAX_TAP_VOICES) để bấm nhanh không nghẽn.
 """
+
+logger = logging.getLogger(__name__)
+
+
 class SoundManager:
 # ------------------------------------------------------------------ #
 #                           SOUND MANAGER                           #
 # ------------------------------------------------------------------ #
-    def __init__(self, auto_play_bg=True):
-        # Nhạc & hiệu ứng
-        self.bg   = SoundLoader.load(f"{SOUND_DIR}/{SOUND_BG_MUSIC}")
-        self.tap  = SoundLoader.load(f"{SOUND_DIR}/{SOUND_CLICK_TAP}")
-        self.win  = SoundLoader.load(f"{SOUND_DIR}/{SOUND_WIN}")
-        self.draw = SoundLoader.load(f"{SOUND_DIR}/{SOUND_DRAW}")
-        self.click = SoundLoader.load(f"{SOUND_DIR}/{SOUND_CLICK_BTN}")
-        for s in (self.bg, self.tap, self.win, self.draw):
-            if s: s.volume = VOLUME_DEFAULT
-
-        if auto_play_bg and self.bg:
-            self.bg.loop = True
-            self.bg.play()
+    # key -> (tên file, số voice)
+    _FILES = {
+        "bg":    (SOUND_BG_MUSIC, 1),
+        "tap":   (SOUND_CLICK_TAP, MAX_TAP_VOICES),
+        "win":   (SOUND_WIN, 1),
+        "draw":  (SOUND_DRAW, 1),
+        "click": (SOUND_CLICK_BTN, 1),
+    }
+    _shared: Optional["SoundManager"] = None
+
+    def __init__(self):
+        self._voices: Dict[str, List] = {}
+        self._next_voice: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "SoundManager":
+        """Instance dùng chung của tiến trình (tạo khi cần, chưa nạp file nào)."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    # ----------------------------- NẠP ------------------------------
+    def preload(self) -> None:
+        """Nạp mọi âm thanh trong thread nền; không chặn UI."""
+        threading.Thread(target=self._load_all, name="sound-preload", daemon=True).start()
+
+    def _load_all(self):
+        for key in self._FILES:
+            self._get(key)
+
+    def _get(self, key: str) -> List:
+        """Danh sách voice của *key*; nạp lần đầu, rỗng nếu file thiếu/lỗi."""
+        voices = self._voices.get(key)
+        if voices is not None:
+            return voices
+        with self._lock:
+            if key not in self._voices:
+                self._voices[key] = self._load(key)
+            return self._voices[key]
+
+    def _load(self, key: str) -> List:
+        filename, count = self._FILES[key]
+        path = f"{SOUND_DIR}/{filename}"
+        if not os.path.exists(path):
+            logger.warning(f"Thiếu file âm thanh {path}, bỏ qua")
+            return []
+        from kivy.core.audio import SoundLoader  # khởi tạo audio provider lần đầu cần
+        voices = []
+        for _ in range(count):
+            snd = SoundLoader.load(path)
+            if not snd:
+                break
+            snd.volume = VOLUME_DEFAULT
+            voices.append(snd)
+        return voices
 
     # ----------------------- WRAPPER METHODS -------------------------
-    def play_tap(self):  self._safe(self.tap)
-    def play_win(self):  self._safe(self.win)
-    def play_draw(self): self._safe(self.draw)
-    def play_click(self):
-        """Click button: stop & play để luôn phát từ đầu."""
-        if self.click:
-            self.click.stop()  
-            self.click.play()
+    def play_tap(self):   self._play("tap")
+    def play_win(self):   self._play("win")
+    def play_draw(self):  self._play("draw")
+    def play_click(self): self._play("click")
+
+    def play_bg(self):
+        """Phát nhạc nền lặp (nếu có file)."""
+        voices = self._get("bg")
+        if voices and voices[0].state != "play":
+            voices[0].loop = True
+            self._safe(voices[0])
+
+    def stop_bg(self):
+        """Dừng nhạc nền (không nạp file nếu chưa từng phát)."""
+        for snd in self._voices.get("bg") or ():
+            snd.stop()
+
+    def _play(self, key: str):
+        """Phát voice kế tiếp (xoay vòng) của *key*, luôn phát lại từ đầu."""
+        voices = self._get(key)
+        if not voices:
+            return
+        idx = self._next_voice.get(key, 0)
+        self._next_voice[key] = (idx + 1) % len(voices)
+        snd = voices[idx]
+        if snd.state == "play":
+            snd.stop()
+        self._safe(snd)
 
     # ----------------------- HELPER STATIC ---------------------------
     @staticmethod
@@ -0,0 +1,52 @@
+"""
+Đo thời gian khởi động
+===========================================
+Ghi mốc thời gian cho từng pha khởi động (import, build, frame đầu) khi chạy
+`python main.py --profile-startup`, rồi in bảng báo cáo. Khi không bật,
+mark() gần như không tốn gì.
+"""
+
+import logging
+import time
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_T0 = time.perf_counter()
+_enabled = False
+_marks: List[Tuple[str, float]] = []
+
+
+def enable() -> None:
+    """Bật ghi mốc (gọi sớm nhất có thể, trước khi import Kivy)."""
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def mark(phase: str) -> None:
+    """Ghi mốc kết thúc pha *phase*."""
+    if _enabled:
+        _marks.append((phase, time.perf_counter()))
+
+
+def phases() -> List[Tuple[str, float]]:
+    """Danh sách (tên pha, thời lượng giây) theo thứ tự."""
+    result, prev = [], _T0
+    for name, t in _marks:
+        result.append((name, t - prev))
+        prev = t
+    return result
+
+
+def report() -> str:
+    """Bảng thời gian từng pha + tổng từ lúc nạp module này."""
+    lines = ["Startup profile:"]
+    for name, secs in phases():
+        lines.append(f"  {name:<28} {secs * 1000:8.1f} ms")
+    total = (_marks[-1][1] - _T0) if _marks else 0.0
+    lines.append(f"  {'TOTAL':<28} {total * 1000:8.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,395 @@
+import json
+import math
+import random
+
+import pytest
+
+from ai_calibration import Calibration
+from ai_profiles import BUILTIN_PROFILES, load_profiles, make_profile
+from board import Board
+from minimax import MOVE_WINS, MinimaxAI
+
+X, O = "X", "O"
+
+
+# ------------------ hồ sơ từ file JSON ---------------- #
+def test_load_profiles_overrides_and_adds(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({
+        "hard":   {"node_budget": 123},
+        "sloppy": {"depth_cap": 2, "top_k": 3, "noise": 1.0,
+                   "weights": {"opp_open_1": 5}},
+    }))
+    profiles = load_profiles(str(path))
+    assert list(profiles)[:3] == ["easy", "medium", "hard"]
+    assert profiles["hard"].node_budget == 123
+    assert profiles["hard"].time_budget == BUILTIN_PROFILES["hard"].time_budget
+    sloppy = profiles["sloppy"]
+    assert sloppy.weights["opp_open_1"] == 5
+    assert sloppy.weights["own_open_1"] == BUILTIN_PROFILES["hard"].weights["own_open_1"]
+
+
+@pytest.mark.parametrize("spec", [{"depth": 3}, {"weights": {"nope": 1}}, {"strategy": "mcts?"}])
+def test_make_profile_rejects_unknown(spec):
+    with pytest.raises(ValueError):
+        make_profile("bad", spec)
+
+
+# ------------------ ngân sách & lựa chọn ---------------- #
+def test_node_budget_bounds_search():
+    bd = Board(7, 7, 4, 0, seed=1)
+    bd.place(3, 3, X)
+    profile = make_profile("tiny", {"node_budget": 60, "time_budget": 30.0})
+    ai = MinimaxAI(profile, rng=random.Random(0), calibration=Calibration(None))
+    move = ai.best(bd, O, X)
+    assert move in bd.get_legal_moves()
+    # Độ sâu 1 luôn chạy hết (48 nước gốc), các độ sâu sau dừng ở ngân sách
+    assert 48 <= ai.nodes <= 48 + 61
+
+
+# ------------------ hiệu chỉnh theo máy ---------------- #
+def test_calibration_is_measured_once_and_saved(tmp_path):
+    path = str(tmp_path / "calib.json")
+    calls = []
+
+    def measure(shape):
+        calls.append(shape)
+        return 1000.0
+
+    assert Calibration(path).nodes_per_second((7, 7, 4), measure) == 1000.0
+    again = Calibration(path)                       # lần chạy sau: đọc từ file
+    assert again.nodes_per_second((7, 7, 4), measure) == 1000.0
+    assert calls == [(7, 7, 4)]
+
+
+def test_calibrated_rate_sets_depth_and_stats(tmp_path):
+    bd = Board(7, 7, 4, 0, seed=1)
+    bd.place(3, 3, X)
+    profile = make_profile("deep", {"time_budget": 30.0})
+    slow, fast = Calibration(None), Calibration(None)
+    slow.nodes_per_second((7, 7, 4), lambda shape: 2.0)
+    fast.nodes_per_second((7, 7, 4), lambda shape: 1e6)
+    slow_ai = MinimaxAI(profile, rng=random.Random(0), calibration=slow)
+    fast_ai = MinimaxAI(profile, rng=random.Random(0), calibration=fast)
+    slow_ai.best(bd, O, X)
+    assert slow_ai.stats["calibrated_nps"] == 2.0
+    assert slow_ai.stats["node_limit"] == 60.0
+    assert slow_ai.stats["depth"] == 1
+    assert slow_ai.stats["stop"] == "projected"     # độ sâu 2 không kịp trong 60 nút
+    fast_ai.time_limit = 0.01                       # chỉ đo kế hoạch, không tìm thật
+    assert fast_ai._plan_search(bd, 7.0)[0] > slow_ai.stats["max_depth"]
+
+
+def test_search_takes_win_and_blocks():
+    bd = Board(5, 5, 4, 0)
+    for c in range(3):
+        bd.place(0, c, O)
+        bd.place(4, c, X)
+    assert MinimaxAI("hard", rng=random.Random(0)).best(bd, O, X) == (0, 3)
+
+    bd = Board(5, 5, 4, 0)
+    for c in range(3):
+        bd.place(4, c, X)
+    bd.place(1, 1, O)
+    assert MinimaxAI("medium", rng=random.Random(0)).best(bd, O, X) == (4, 3)
+
+
+def test_noise_samples_top_k():
+    bd = Board(5, 5, 4, 0)
+    bd.place(2, 2, X)
+    noisy = make_profile("noisy", {"depth_cap": 1, "top_k": 4, "noise": 1.0})
+    moves = {MinimaxAI(noisy, rng=random.Random(s)).best(bd, O, X) for s in range(20)}
+    greedy = {MinimaxAI(make_profile("greedy", {"depth_cap": 1}), rng=random.Random(s)).best(bd, O, X)
+              for s in range(5)}
+    assert 1 < len(moves) <= 4
+    assert len(greedy) == 1
+
+
+# ------------------ chấm điểm nước một lượt ---------------- #
+@pytest.mark.parametrize("seed", range(12))
+def test_scored_moves_match_place_and_evaluate(seed):
+    rng = random.Random(seed)
+    bd = Board(rng.randint(4, 8), rng.randint(4, 8), rng.randint(3, 4), rng.randint(0, 5), seed=seed)
+    ai = MinimaxAI("hard", rng=random.Random(0))
+    sym = X
+    for _ in range(rng.randint(2, 12)):
+        bd.place(*rng.choice(sorted(bd.get_legal_moves())), sym)
+        sym = O if sym == X else X
+        if bd.has_winner_any() or bd.is_draw():
+            bd.undo_last_move()
+            break
+    assert ai._evaluate_lines(bd, O, X) == ai._evaluate_board(bd, O, X)
+    ai._begin_search(bd, O, X)
+    buf = ai._plies[0]
+    k = ai._score_moves(bd, sym, 0)
+    assert sorted(buf.cand[:k]) == sorted(r * bd.cols + c for r, c in bd.get_legal_moves())
+    for idx in buf.cand[:k]:
+        move = divmod(idx, bd.cols)
+        bd.place(*move, sym)
+        if bd.has_winner_any():
+            expected = math.inf if sym == O else -math.inf
+        elif bd.is_draw():
+            expected = 0
+        else:
+            expected = ai._evaluate_board(bd, O, X)
+        bd.undo_last_move()
+        assert buf.values[idx] == expected, move
+        assert bool(buf.flags[idx] & MOVE_WINS) == (expected in (math.inf, -math.inf))
+
+
+def test_incremental_state_follows_play_and_unplay():
+    rng = random.Random(7)
+    bd = Board(7, 6, 4, 3, seed=7)
+    ai = MinimaxAI("hard", rng=random.Random(0))
+    ai._begin_search(bd, O, X)
+    start_hash = ai._hash
+    played, sym = [], X
+    for _ in range(10):
+        idx = rng.choice([r * bd.cols + c for r, c in sorted(bd.get_legal_moves())])
+        ai._play(bd, idx, sym)
+        played.append(idx)
+        sym = O if sym == X else X
+        assert ai._line_total + ai._center_total == ai._evaluate_board(bd, O, X)
+    for idx in reversed(played):
+        ai._unplay(bd, idx)
+    assert ai._hash == start_hash
+    assert ai._line_total + ai._center_total == ai._evaluate_board(bd, O, X)
+
+
+
+@pytest.mark.parametrize("win_len", [3, 5, 9])
+def test_line_patterns_match_run_scan(win_len):
+    from minimax import MOVE_COUNTER, MOVE_THREAT, _is_open_run
+
+    rng = random.Random(win_len)
+    ai = MinimaxAI("hard", rng=random.Random(0))
+    for _ in range(40):
+        # Một hàng có obstacle và chuỗi dài (kể cả dài hơn cửa sổ tra bảng)
+        row = [rng.choice("XXXXO..#") for _ in range(16)]
+        bd = Board.from_grid([["#" if v == "#" else "." for v in row]], win_len)
+        for j, v in enumerate(row):
+            if v in (X, O):
+                bd.place(0, j, v)
+                if bd.has_winner_any():
+                    bd.undo_last_move()
+        ai._begin_search(bd, O, X)
+        assert ai._line_total == ai._evaluate_lines(bd, O, X) - ai._center_score(bd, O, X)
+        line = [bd.get_mark(0, j) for j in range(16)]
+        buf = ai._plies[0]
+        k = ai._score_moves(bd, X, 0)
+        for idx in buf.cand[:k]:
+            for sym, flag in ((X, MOVE_THREAT), (O, MOVE_COUNTER)):
+                line[idx] = sym
+                assert bool(buf.flags[idx] & flag) == _is_open_run(line, idx, win_len - 1, bd.EMPTY)
+                line[idx] = bd.EMPTY
+
+
+# ------------------ quiescence ở chân trời ---------------- #
+def test_quiescence_sees_open_threat_beyond_horizon():
+    bd = Board(7, 7, 4, 0)
+    for move, sym in (((3, 2), O), ((0, 0), X), ((3, 3), O), ((6, 6), X)):
+        bd.place(*move, sym)
+    static = MinimaxAI(make_profile("d1", {"depth_cap": 1}), rng=random.Random(0))
+    static.best(bd, O, X)
+    assert static.stats["stop"] == "depth" and static.stats["q_nodes"] == 0
+
+    quiet = make_profile("d1q", {"depth_cap": 1, "quiescence_budget": 100})
+    ai = MinimaxAI(quiet, rng=random.Random(0))
+    assert ai.best(bd, O, X) in ((3, 1), (3, 4))    # _OOO_: X không chặn kịp hai đầu
+    assert ai.stats["stop"] == "solved" and 0 < ai.stats["q_nodes"] <= 101
+
+    starved = MinimaxAI(make_profile("d1q1", {"depth_cap": 1, "quiescence_budget": 1}),
+                        rng=random.Random(0))
+    starved.best(bd, O, X)
+    assert starved.stats["q_exhausted"] > 0
+
+
+# ------------------ tìm kiếm chọn lọc ---------------- #
+def _fixed_rate(shape, rate=1e6):
+    calibration = Calibration(None)
+    calibration.nodes_per_second(shape, lambda _: rate)
+    return calibration
+
+
+def test_late_move_reductions_cut_nodes_at_fixed_depth():
+    bd = Board(7, 7, 4, 0, seed=1)
+    bd.place(3, 3, X)
+    calibration = _fixed_rate((7, 7, 4))
+    full = MinimaxAI(make_profile("d3", {"depth_cap": 3}), rng=random.Random(0), calibration=calibration)
+    lmr = MinimaxAI(make_profile("d3lmr", {"depth_cap": 3, "lmr_after": 4}),
+                    rng=random.Random(0), calibration=calibration)
+    full.best(bd, O, X)
+    lmr.best(bd, O, X)
+    assert full.stats["depth"] == lmr.stats["depth"] == 3
+    assert full.stats["lmr_reduced"] == 0
+    assert lmr.stats["lmr_reduced"] > lmr.stats["lmr_researched"]
+    assert lmr.nodes < full.nodes
+
+
+def test_threat_extension_deepens_forcing_lines():
+    bd = Board(7, 7, 4, 0)
+    for move, sym in (((3, 2), O), ((0, 0), X), ((3, 3), O), ((6, 6), X)):
+        bd.place(*move, sym)
+    profile = make_profile("d2ext", {"depth_cap": 2, "threat_extensions": 1})
+    ai = MinimaxAI(profile, rng=random.Random(0), calibration=_fixed_rate((7, 7, 4)))
+    assert ai.best(bd, O, X) in ((3, 1), (3, 4))
+    assert ai.stats["extended"] > 0 and ai.stats["stop"] == "solved"
+
+
+
+def test_depth_cap_is_clamped_to_ply_buffers():
+    from minimax import MAX_SEARCH_DEPTH
+    bd = Board(4, 4, 4, 0)
+    profile = make_profile("deep", {"depth_cap": 16, "threat_extensions": 2, "node_budget": 20_000})
+    ai = MinimaxAI(profile, rng=random.Random(0), calibration=_fixed_rate((4, 4, 4)))
+    assert ai._plan_search(bd, 2.0)[0] == MAX_SEARCH_DEPTH
+    assert ai.best(bd, O, X) in bd.get_legal_moves()
+    assert ai.stats["max_depth"] == MAX_SEARCH_DEPTH
+    assert len(ai._plies) > MAX_SEARCH_DEPTH + profile.threat_extensions
+
+# ------------------ MCTS ---------------- #
+def _mcts(**spec):
+    return make_profile("mcts-test", dict({"strategy": "mcts", "node_budget": 800, "time_budget": 30.0}, **spec))
+
+
+def test_mcts_takes_win_and_blocks():
+    bd = Board(7, 7, 4, 0)
+    for c in range(3):
+        bd.place(0, c, O)
+        bd.place(6, c, X)
+    assert MinimaxAI(_mcts(), rng=random.Random(0)).best(bd, O, X) == (0, 3)
+
+    bd = Board(7, 7, 4, 0)
+    for move, sym in (((6, 0), X), ((0, 6), O), ((6, 1), X), ((2, 4), O), ((6, 2), X)):
+        bd.place(*move, sym)
+    assert MinimaxAI(_mcts(), rng=random.Random(0)).best(bd, O, X) == (6, 3)
+
+
+def test_mcts_reuses_tree_across_moves():
+    bd = Board(9, 9, 5, 0, seed=3)
+    bd.place(4, 4, X)
+    ai = MinimaxAI(_mcts(), rng=random.Random(0))
+    bd.place(*ai.best(bd, O, X), O)
+    assert ai.stats["reused"] == 0 and ai.stats["playouts"] >= 800
+    # Đối thủ đánh nước cây đã thăm nhiều nhất: lần tìm sau giữ lại cây con đó
+    reply = max(ai._mcts._root.children, key=lambda child: child.visits)
+    bd.place(*divmod(reply.move, bd.cols), X)
+    kept = reply.visits
+    ai.best(bd, O, X)
+    assert ai.stats["reused"] == kept > 0
+    assert ai.stats["root_visits"] >= kept + 800
+
+    other = Board(9, 9, 5, 0, seed=3)                       # thế cờ khác hẳn: cây mới
+    other.place(0, 0, X)
+    ai.best(other, O, X)
+    assert ai.stats["reused"] == 0
+
+
+def test_mcts_parallel_playouts_stay_within_budget():
+    bd = Board(7, 7, 4, 0, seed=1)
+    bd.place(3, 3, X)
+    ai = MinimaxAI(_mcts(mcts_workers=2, node_budget=160), rng=random.Random(0))
+    try:
+        assert ai.best(bd, O, X) in bd.get_legal_moves()
+        executor = ai._mcts._executor
+        assert executor is not None
+    finally:
+        ai.close()
+    assert ai._mcts is None and executor._shutdown_thread
+    assert 160 <= ai.stats["playouts"] < 160 + 2 * 8
+
+
+def test_tournament_match_is_reproducible():
+    from tournament import run_match
+
+    args = (BUILTIN_PROFILES["medium"], _mcts(node_budget=200), 2)
+    result = run_match(*args, rows=5, cols=5, win_len=4, num_obstacles=0, seed=1)
+    assert result.wins_a + result.wins_b + result.draws == 2
+    assert result.a == "medium" and result.b == "mcts-test"
+    assert run_match(*args, rows=5, cols=5, win_len=4, num_obstacles=0, seed=1)[:5] == result[:5]
+    assert BUILTIN_PROFILES["mcts"].strategy == "mcts"     # tournament.py hard mcts
+    from ai_profiles import listed_profiles
+    assert listed_profiles()[:3] == ["easy", "medium", "hard"] and "mcts" not in listed_profiles()
+
+
+
+def test_optional_backends_load_on_first_use():
+    import os, subprocess, sys
+    import minimax
+    code = ("import sys, minimax; "
+            "assert not {'mcts', 'pn_solver'} & set(sys.modules), sorted(sys.modules)")
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                   cwd=os.path.dirname(os.path.abspath(minimax.__file__)))
+
+# ------------------ proof-number solver ---------------- #
+@pytest.mark.parametrize("shape, expected", [((3, 3, 3), "draw"), ((4, 4, 3), X), ((3, 4, 3), X)])
+def test_pn_solver_known_results(shape, expected):
+    from pn_solver import analyse
+
+    bd = Board(*shape, 0, seed=0)
+    res = analyse(bd)
+    assert res.result == expected
+    if expected == X:
+        bd.place(*res.first_move, X)                        # sau nước thắng, O vẫn thua
+        assert analyse(bd).result == X
+
+
+def test_pn_solver_budget_and_obstacles():
+    from pn_solver import PNSolver, analyse
+
+    assert analyse(Board(4, 4, 4, 0, seed=0), max_nodes=50).result == "unknown"
+    # Obstacle cắt mọi đoạn 3 ô theo hàng / cột giữa: chỉ còn lại bàn 3x3 ở góc
+    grid = [list(row) for row in ("...#", "...#", "...#", "####")]
+    bd = Board.from_grid(grid, 3)
+    assert analyse(bd).result == "draw"
+    assert PNSolver(max_entries=64).prove(Board(4, 4, 3, 0, seed=0), X) is True
+
+
+def test_proof_book_round_trip_guides_ai(tmp_path):
+    from pn_solver import ProofBook, analyse, board_config_key
+
+    path = str(tmp_path / "proofs.json")
+    bd = Board(4, 4, 3, 0, seed=0)
+    moves = {}
+    res = analyse(bd, proof_moves=moves)
+    ProofBook(path).record(board_config_key(bd), res, moves)
+
+    book = ProofBook(path)
+    assert book.result(4, 4, 3) == X and book.result(5, 5, 4) is None
+    rng = random.Random(0)
+    for _ in range(5):
+        bd = Board(4, 4, 3, 0, seed=0)
+        ai = MinimaxAI("hard", rng=random.Random(0), proofs=book)
+        while not (bd.has_winner_any() or bd.is_draw()):
+            bd.place(*ai.best(bd, X, O), X)
+            assert ai.stats["stop"] == "proof" or bd.has_winner_any()
+            if not bd.has_winner_any():
+                bd.place(*rng.choice(sorted(bd.get_legal_moves())), O)
+        assert bd.get_winner_symbol() == X
+
+
+def test_proof_book_holds_draw_for_second_player(tmp_path):
+    from pn_solver import ProofBook, analyse, board_config_key
+
+    path = str(tmp_path / "proofs.json")
+    bd = Board(3, 3, 3, 0, seed=0)
+    moves, draws = {}, {}
+    res = analyse(bd, proof_moves=moves, draw_moves=draws)
+    assert res.result == "draw" and set(draws) == {X, O}
+    ProofBook(path).record(board_config_key(bd), res, moves, draws)
+
+    book = ProofBook(path)
+    rng = random.Random(1)
+    for _ in range(10):                            # bot cầm O như trong app
+        bd = Board(3, 3, 3, 0, seed=0)
+        ai = MinimaxAI("hard", rng=random.Random(0), proofs=book)
+        stops = []
+        while not (bd.has_winner_any() or bd.is_draw()):
+            bd.place(*rng.choice(sorted(bd.get_legal_moves())), X)
+            if bd.has_winner_any() or bd.is_draw():
+                break
+            bd.place(*ai.best(bd, O, X), O)
+            stops.append(ai.stats["stop"])
+        # Ngoài sổ chỉ còn thế cờ X bỏ chặn (solver cắt): O thắng ngay
+        assert stops[0] == "proof" and set(stops) <= {"proof", "solved"}
+        assert bd.get_winner_symbol() != X
@@ -0,0 +1,25 @@
+from __future__ import annotations
+from build_assets import halve, mip_chain, pack_atlas, save_png, load_rgba
+
+
+# ----------------- test 1 ------------------
+def test_mip_chain_atlas_and_png_round_trip(tmp_path):
+    # 4x4: nửa trái đỏ đặc, nửa phải trong suốt (màu xanh không được lem sang)
+    row = bytes([255, 0, 0, 255]) * 2 + bytes([0, 0, 255, 0]) * 2
+    img = (row * 4, 4, 4)
+
+    px, w, h = halve(img)
+    assert (w, h) == (2, 2)
+    assert px[0:4] == bytes([255, 0, 0, 255]) and px[4:8] == bytes([0, 0, 0, 0])
+
+    levels = mip_chain(img, [8, 2, 1])
+    assert sorted(levels) == [1, 2]                    # không phóng to lên 8
+    assert levels[1][0] == bytes([255, 0, 0, 128])     # màu theo trọng số alpha
+
+    atlas, meta = pack_atlas({"X": levels[2], "O": levels[2], "cell": levels[1]}, "t@2.png")
+    assert (atlas[1], atlas[2]) == (4, 4)
+    assert meta["t@2.png"]["O"] == [0, 2, 2, 2]        # gốc dưới-trái như Kivy atlas
+
+    path = str(tmp_path / "a.png")
+    save_png(path, atlas)
+    assert load_rgba(path) == atlas
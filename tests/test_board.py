@@ -60,3 +60,57 @@ def test_reshuffle_obstacles():
 
     assert len(before) == len(after) == 5
     assert before != after              # vị trí phải thay đổi
+
+
+# ------------------ dead draw ----------------- #
+def test_dead_draw_before_full(b):
+    # Mỗi hàng / cột / đường chéo đều đã có cả X và O, còn 1 ô trống
+    moves = [
+        (0, 0, X), (0, 1, O), (0, 2, X),
+        (1, 0, X), (1, 1, O), (1, 2, O),
+        (2, 0, O),
+    ]
+    for r, c, sym in moves:
+        b.place(r, c, sym)
+    assert not b.is_draw()              # hàng 2 vẫn còn mở cho O
+    b.place(2, 1, X)
+    assert b.is_draw() and b.is_dead_draw()
+    assert not b.is_full()
+    assert b.get_winner_symbol() == "D"
+
+    b.undo_last_move()
+    assert not b.is_draw()
+
+
+def test_segment_counters_survive_undo(b):
+    for r, c, sym in [(0, 0, X), (1, 1, O), (0, 1, X)]:
+        b.place(r, c, sym)
+    b.undo_last_move()
+    b.place(0, 2, X)
+    assert not b.has_winner_any()
+    b.place(0, 1, O)
+    b.undo_last_move()
+    b.place(0, 1, X)
+    assert b.has_winner(0, 1, X)
+    assert b.get_winner_symbol() == X
+
+
+# ------------- obstacle placement ------------ #
+def test_obstacles_never_hang_when_too_many():
+    board = Board(3, 3, 3, num_obstacles=20)
+    assert len(board.obstacles) == 9
+    assert not board.get_legal_moves()
+
+
+def test_obstacles_seeded_reproducible():
+    a = Board(6, 6, 4, num_obstacles=8, seed=42)
+    b = Board(6, 6, 4, num_obstacles=8, seed=42)
+    assert a.obstacles == b.obstacles
+    assert len(a.get_legal_moves()) == 36 - 8
+
+
+def test_obstacles_symmetric():
+    board = Board(5, 5, 4, num_obstacles=7, seed=1, symmetric_obstacles=True)
+    obs = board.obstacles
+    assert len(obs) == 7
+    assert all((4 - i, 4 - j) in obs for i, j in obs)
@@ -51,3 +51,187 @@ def test_undo_logic():
     assert bd.history_len == 1
     assert ctrl.current_player == PLAYER_O
     assert ctrl.state == GameState.IN_PROGRESS
+
+
+# ----------------- test 3 ------------------
+def test_seed_replays_same_game():
+    from minimax import MinimaxAI
+
+    def replay(seed):
+        bd = Board(5, 5, 4, num_obstacles=5, seed=seed)
+        ai = MinimaxAI("easy", rng=bd.rng)
+        moves = []
+        for turn in range(8):
+            sym = PLAYER_X if turn % 2 == 0 else PLAYER_O
+            move = ai.best(bd, sym, PLAYER_O if sym == PLAYER_X else PLAYER_X)
+            bd.place(*move, sym)
+            moves.append(move)
+        return bd.obstacles, moves
+
+    assert replay(7) == replay(7)
+
+    # AI dùng lại từ ván trước (như _AI_POOL) phải đánh y như AI mới tạo
+    def play_out(bd, ai):
+        moves = []
+        for turn in range(10):
+            sym = PLAYER_X if turn % 2 == 0 else PLAYER_O
+            move = ai.best(bd, sym, PLAYER_O if sym == PLAYER_X else PLAYER_X)
+            bd.place(*move, sym)
+            moves.append(move)
+        return moves
+
+    pooled = MinimaxAI("easy", rng=Board(seed=1).rng)
+    play_out(Board(5, 5, 4, seed=1), pooled)
+    fresh_bd, pooled_bd = Board(9, 9, 5, seed=42), Board(9, 9, 5, seed=42)
+    fresh = play_out(fresh_bd, MinimaxAI("easy", rng=fresh_bd.rng))
+    pooled.use_rng(pooled_bd.rng)
+    assert play_out(pooled_bd, pooled) == fresh
+    assert GameController(Board(seed=7), MODE_FRIEND).seed == 7
+
+
+# ----------------- test 4 ------------------
+def test_finished_game_is_recorded(tmp_path):
+    from game_record import GameRecordWriter, iter_records
+
+    path = tmp_path / "games.bin"
+    for _ in range(2):
+        bd   = Board(3, 3, 3, 0, seed=3)
+        ctrl = GameController(bd, MODE_FRIEND, recorder=GameRecordWriter(str(path)))
+        ctrl.play(2, 2); ctrl.undo()
+        for r, c in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+            ctrl.play(r, c)
+
+    records = list(iter_records(path))
+    assert len(records) == 2
+    rec = records[0]
+    assert (rec.rows, rec.cols, rec.win_len, rec.seed) == (3, 3, 3, 3)
+    assert rec.moves == [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+    assert rec.ai_times == [0.0] * 5
+    assert rec.result == GameState.X_WON
+
+    # Undo sau khi kết thúc rồi thắng lại: vẫn là ván cũ, không ghi lần nữa
+    ctrl.undo(); ctrl.play(0, 2)
+    assert ctrl.state == GameState.X_WON
+    assert len(list(iter_records(path))) == 2
+    ctrl.reset()
+    for r, c in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+        ctrl.play(r, c)
+    assert len(list(iter_records(path))) == 3
+
+
+
+def test_record_round_trips_any_seed():
+    from game_record import GameRecord
+
+    for seed in (None, 0, 1, -1, -5, 2 ** 40, -(2 ** 40)):
+        rec = GameRecord(3, 3, 3, MODE_FRIEND, "easy", seed, [(1, 1)], [(0, 0)], [0.0], GameState.IN_PROGRESS)
+        assert GameRecord.decode(rec.encode()) == rec
+    # Bản ghi phiên bản 1 (seed + 1) vẫn đọc được
+    v1 = bytes([1, 3, 3, 3, 6]) + b"friend" + bytes([4]) + b"easy" + bytes([8, 0, 0, 1])
+    assert GameRecord.decode(v1).seed == 7
+
+# ----------------- test 5 ------------------
+def test_redo_and_seek_send_only_changed_cells():
+    ctrl = make_ctrl()
+    bd   = ctrl.board
+
+    class Spy:
+        def __init__(self): self.diffs = []
+        def on_board_change(self, coords, symbol): pass
+        def on_board_diff(self, changes): self.diffs.append(dict(changes))
+        def on_state_change(self, state, next_turn): pass
+
+    spy = Spy()
+    ctrl.register(spy)
+    win_seq = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+    for r, c in win_seq:
+        ctrl.play(r, c)
+    assert ctrl.state == GameState.X_WON
+
+    ctrl.seek(2)
+    assert bd.history_len == 2 and ctrl.current_player == PLAYER_X
+    assert spy.diffs[-1] == {(0, 2): ".", (1, 1): ".", (0, 1): "."}
+    assert ctrl.state == GameState.IN_PROGRESS
+
+    ctrl.redo()
+    assert spy.diffs[-1] == {(0, 1): PLAYER_X}
+    assert ctrl.current_player == PLAYER_O
+
+    ctrl.seek(99)
+    assert ctrl.state == GameState.X_WON and ctrl.current_player == PLAYER_X
+    assert not ctrl.can_redo
+
+    ctrl.seek(0)
+    ctrl.play(2, 2)                              # nhánh mới xoá redo
+    assert not ctrl.can_redo and bd.history_len == 1
+
+
+# ----------------- test 6 ------------------
+def test_events_coalesced_once_per_frame():
+    from kivy.clock import Clock
+
+    bd   = Board(3, 3, 3, 0)
+    ctrl = GameController(bd, MODE_FRIEND, coalesce_frames=True)
+
+    class Spy:
+        def __init__(self): self.batches = []
+        def on_events(self, batch): self.batches.append(batch)
+        def on_state_change(self, state, next_turn): pass
+
+    spy = Spy()
+    ctrl.register(spy)
+    ctrl.play(0, 0); ctrl.play(1, 1); ctrl.undo()
+    assert spy.batches == []                     # chưa tới frame kế
+
+    Clock.tick()
+    assert len(spy.batches) == 1
+    batch = spy.batches[0]
+    assert batch.changes == {(0, 0): PLAYER_X, (1, 1): "."}
+    assert len(batch.moves) == 2
+    assert batch.state.next_turn == PLAYER_O
+
+
+# ----------------- test 7 ------------------
+def test_bot_game_runs_with_immediate_scheduler():
+    from game_config import MODE_BOT
+    from scheduler import ImmediateScheduler
+    from batch_simulator import simulate
+
+    bd   = Board(3, 3, 3, 0, seed=1)
+    ctrl = GameController(bd, MODE_BOT, "easy", scheduler=ImmediateScheduler())
+    ctrl.play(1, 1)                              # AI trả lời ngay, không cần Clock
+    assert bd.history_len == 2
+    assert ctrl.current_player == PLAYER_X
+
+    ctrl.undo()                                  # lùi cả cặp người + AI
+    assert bd.history_len == 0
+    ctrl.redo()
+    assert bd.history_len == 2 and ctrl.current_player == PLAYER_X
+
+    results = simulate(50, "easy", 4, 4, 3, 2, seed=5)
+    assert sum(results.values()) == 50
+    assert GameState.IN_PROGRESS not in results
+    assert simulate(50, "easy", 4, 4, 3, 2, seed=5) == results
+
+
+# ----------------- test 8 ------------------
+def test_bot_seek_keeps_redo_timeline():
+    from game_config import MODE_BOT
+    from scheduler import ImmediateScheduler
+
+    bd   = Board(3, 3, 3, 0, seed=1)
+    ctrl = GameController(bd, MODE_BOT, "easy", scheduler=ImmediateScheduler())
+    for r, c in [(1, 1), (0, 0), (2, 2), (0, 2), (2, 0), (1, 0), (0, 1), (2, 1), (1, 2)]:
+        if ctrl.state is GameState.IN_PROGRESS and bd.is_empty(r, c):
+            ctrl.play(r, c)
+    assert ctrl.state is not GameState.IN_PROGRESS
+    total = bd.history_len
+
+    ctrl.seek(1)                                 # ply 1 là lượt AI -> lùi về 0
+    assert bd.history_len == 0 and ctrl.current_player == PLAYER_X
+    assert ctrl.can_redo
+
+    ctrl.seek(2)
+    assert bd.history_len == 2 and ctrl.can_redo
+    ctrl.seek(99)
+    assert bd.history_len == total and not ctrl.can_redo
@@ -0,0 +1,122 @@
+from __future__ import annotations
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from game_server import GameServer, percentile
+
+
+# ---------- trợ giúp ----------
+def ask(server: GameServer, **req) -> dict:
+    return asyncio.run(server.handle_line(json.dumps(req).encode()))
+
+
+# ----------------- test 1 ------------------
+def test_server_plays_ai_and_applies_backpressure():
+    server = GameServer(executor=ThreadPoolExecutor(1), max_pending=1, ai_budget=0.2)
+    new = ask(server, op="new", rows=3, cols=3, win_len=3, obstacles=0,
+              difficulty="medium", seed=4)
+    assert new["ok"] and new["obstacles"] == []
+    game = new["game"]
+
+    reply = ask(server, op="move", game=game, row=1, col=1)
+    assert reply["ok"] and reply["state"] == "IN_PROGRESS"
+    ai = tuple(reply["ai"])
+    assert ai != (1, 1)
+
+    assert ask(server, op="move", game=game, row=ai[0], col=ai[1]) == {
+        "ok": False, "error": "illegal move"}
+
+    server._max_pending = 0                      # hàng đợi đầy -> "busy", nước bị trả lại
+    free = next((i, j) for i in range(3) for j in range(3) if (i, j) not in {(1, 1), ai})
+    assert ask(server, op="move", game=game, row=free[0], col=free[1])["error"] == "busy"
+    assert server._sessions[game].controller.board.history_len == 2
+
+    stats = ask(server, op="stats")["stats"]
+    assert (stats["games"], stats["ai_requests"], stats["rejected"]) == (1, 1, 1)
+    assert ask(server, op="nope")["ok"] is False
+    server.close()
+
+
+
+# ----------------- test 2 ------------------
+def test_new_game_bounds_and_close_ownership():
+    server = GameServer(executor=ThreadPoolExecutor(1), ai_budget=0.2)
+    for bad in ({"win_len": 0}, {"win_len": -1}, {"rows": 0, "cols": 0},
+                {"rows": 10 ** 6, "cols": 10 ** 6}, {"rows": 3, "cols": 3, "win_len": 4},
+                {"rows": 3, "cols": 3, "win_len": 3, "obstacles": 9}):
+        reply = ask(server, op="new", **bad)
+        assert reply["ok"] is False, bad
+    assert not server._sessions
+
+    for difficulty in (["hard"], "nonsense", "mcts"):
+        reply = ask(server, op="new", rows=3, cols=3, win_len=3, difficulty=difficulty)
+        assert reply["ok"] is False and "unknown difficulty" in reply["error"]
+    assert not server._sessions
+
+    mine, theirs = [], []
+    line = lambda **req: json.dumps(req).encode()
+    game = asyncio.run(server.handle_line(line(op="new", rows=3, cols=3, win_len=3), mine))["game"]
+    other = asyncio.run(server.handle_line(line(op="close", game=game), theirs))
+    assert other == {"ok": False, "error": "unknown game"} and game in server._sessions
+    assert asyncio.run(server.handle_line(line(op="close", game=game), mine)) == {"ok": True}
+    assert game not in server._sessions and mine == []
+    server.close()
+
+# ----------------- test 3 ------------------
+def test_percentile_nearest_rank():
+    data = list(range(1, 101))
+    assert percentile(data, 50) == 50
+    assert percentile(data, 99) == 99
+    assert percentile([], 50) == 0.0
+
+
+# ----------------- test 4 ------------------
+def test_ai_service_dedups_and_caches_positions():
+    import threading
+    from ai_service import AIService
+    from board import Board
+
+    gate = threading.Event()
+
+    class GatedExecutor(ThreadPoolExecutor):     # giữ job lại để thấy dedup
+        def submit(self, fn, *args):
+            return super().submit(lambda: (gate.wait(5), fn(*args))[1])
+
+    service = AIService(executor=GatedExecutor(2), cache_size=1)
+    a = Board(3, 3, 3, 0, seed=1); a.place(0, 0, "X"); a.place(1, 1, "O"); a.place(2, 2, "X")
+    b = Board(3, 3, 3, 0, seed=2); b.place(2, 2, "X"); b.place(1, 1, "O"); b.place(0, 0, "X")
+
+    f1 = service.submit(a, "O", "hard")
+    f2 = service.submit(b, "O", "hard")          # cùng thế cờ, thứ tự nước khác
+    assert f1 is f2
+    gate.set()
+    move = f1.result(5)
+    assert move in a.get_legal_moves()
+    assert service.best_move(b, "O", "hard") == move
+
+    c = Board(3, 3, 3, 0, seed=3); c.place(1, 1, "X")
+    service.best_move(c, "O", "hard")            # đẩy thế cờ cũ khỏi LRU (size 1)
+    assert service.best_move(a, "O", "hard") == move
+
+    stats = service.stats()
+    assert (stats["requests"], stats["deduped"], stats["cache_hits"], stats["computed"]) == (5, 1, 1, 3)
+    service.close()
+
+
+# ----------------- test 5 ------------------
+def test_ai_failure_returns_human_move():
+    class Broken:
+        def submit(self, *args):
+            raise RuntimeError("worker died")
+
+        def close(self):
+            pass
+
+    server = GameServer(ai_service=Broken())
+    game = ask(server, op="new", rows=3, cols=3, win_len=3, obstacles=0)["game"]
+    reply = ask(server, op="move", game=game, row=1, col=1)
+    assert reply == {"ok": False, "error": "AI failed: worker died"}
+    ctrl = server._sessions[game].controller
+    assert ctrl.board.history_len == 0 and ctrl.current_player == "X"
+    assert server.metrics.pending == 0
@@ -0,0 +1,136 @@
+"""
+Bộ nhớ đệm texture dùng chung
+==================================================
+• Mỗi file ảnh chỉ được giải mã một lần cho cả tiến trình.
+• Mỗi theme (metal/wood/water/fire/earth) có thể đóng gói X/O/cell/obstacle
+  vào một Kivy atlas `assets/<theme>/<theme>.atlas`; nếu chưa có atlas thì
+  nạp từng file PNG (vẫn qua cache).
+• Ô cờ gán thẳng tham chiếu texture, không đặt lại `source` nên không
+  phải tìm / nạp lại ảnh khi đổi ký hiệu hay đổi theme.
+• Nếu đã chạy build_assets.py: dùng atlas thu nhỏ nhỏ nhất vẫn >= cỡ ô hiện
+  tại (set_cell_size) và bản thu nhỏ của ảnh nền / popup (image_variant).
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+from kivy.graphics.texture import Texture
+
+from game_config import (
+    PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL, CELL_SIZE, ASSET_BUILD_DIR, ASSET_MANIFEST,
+)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------- CACHE CẤP TIẾN TRÌNH ----------------------- #
+_TEXTURES: Dict[str, Optional[Texture]] = {}
+_THEME_TEXTURES: Dict[str, Dict[str, Optional[Texture]]] = {}
+_MANIFEST: Optional[dict] = None
+_cell_px: int = CELL_SIZE
+
+
+# ---------------------- ASSET ĐÃ THU NHỎ --------------------------- #
+def _manifest() -> dict:
+    """manifest.json của build_assets.py ({} nếu chưa build)."""
+    global _MANIFEST
+    if _MANIFEST is None:
+        path = os.path.join(ASSET_BUILD_DIR, ASSET_MANIFEST)
+        try:
+            with open(path) as fh:
+                _MANIFEST = json.load(fh)
+        except FileNotFoundError:
+            _MANIFEST = {}
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Manifest hỏng {path}: {exc}")
+            _MANIFEST = {}
+    return _MANIFEST
+
+
+def _smallest_fit(sizes, px: float) -> Optional[int]:
+    """Cỡ nhỏ nhất >= *px*; None nếu không cỡ nào đủ."""
+    fits = [s for s in sizes if s >= px]
+    return min(fits) if fits else None
+
+
+def cell_bucket() -> Optional[int]:
+    """Cỡ atlas ô cờ đang dùng (None = ảnh gốc)."""
+    return _smallest_fit(_manifest().get("cell_buckets", ()), _cell_px)
+
+
+def set_cell_size(px: float) -> bool:
+    """Báo cỡ ô hiện tại (px); True nếu phải đổi sang bộ texture khác."""
+    global _cell_px
+    before = cell_bucket()
+    _cell_px = px
+    return cell_bucket() != before
+
+
+def image_variant(path: str, px: float) -> str:
+    """Bản thu nhỏ nhỏ nhất của *path* có cạnh dài >= *px* (không có thì ảnh gốc)."""
+    variants = _manifest().get("images", {}).get(path.replace(os.sep, "/"), {})
+    size = _smallest_fit([int(s) for s in variants], px)
+    if size is None:
+        return path
+    return os.path.join(ASSET_BUILD_DIR, variants[str(size)])
+
+
+def get_texture(path: str) -> Optional[Texture]:
+    """Texture của file ảnh *path*, giải mã lần đầu rồi dùng lại."""
+    if path not in _TEXTURES:
+        try:
+            _TEXTURES[path] = CoreImage(path).texture
+        except Exception as exc:
+            logger.warning(f"Không nạp được ảnh {path}: {exc}")
+            _TEXTURES[path] = None
+    return _TEXTURES[path]
+
+
+def theme_textures(theme) -> Dict[str, Optional[Texture]]:
+    """
+    Bảng ký hiệu -> texture cho *theme* ('' là ô trống) ở cỡ ô hiện tại.
+    Ưu tiên atlas đã thu nhỏ, rồi atlas của theme; thiếu key nào thì lấy từ
+    file ảnh lẻ.
+    """
+    bucket = cell_bucket()
+    cache_key = f"{theme.name}@{bucket}"
+    cached = _THEME_TEXTURES.get(cache_key)
+    if cached is not None:
+        return cached
+
+    files = {
+        PLAYER_X:        theme.x_icon,
+        PLAYER_O:        theme.o_icon,
+        OBSTACLE_SYMBOL: theme.obs_icon,
+        "":              theme.cell_bg,
+    }
+    atlas_path = theme.atlas
+    built = _manifest().get("atlases", {}).get(theme.name, {}).get(str(bucket))
+    if built:
+        atlas_path = os.path.join(ASSET_BUILD_DIR, built)
+    atlas = None
+    if os.path.exists(atlas_path):
+        try:
+            atlas = Atlas(atlas_path)
+        except Exception as exc:
+            logger.warning(f"Atlas hỏng {atlas_path}: {exc}")
+
+    textures: Dict[str, Optional[Texture]] = {}
+    for symbol, path in files.items():
+        key = os.path.splitext(os.path.basename(path))[0]
+        tex = atlas.textures.get(key) if atlas is not None else None
+        textures[symbol] = tex if tex is not None else get_texture(path)
+
+    _THEME_TEXTURES[cache_key] = textures
+    return textures
+
+
+def clear() -> None:
+    """Xoá toàn bộ cache (ví dụ khi đổi bộ asset)."""
+    global _MANIFEST
+    _TEXTURES.clear()
+    _THEME_TEXTURES.clear()
+    _MANIFEST = None
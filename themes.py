@@ -1,5 +1,6 @@
 from pathlib import Path
-from game_config import NAMES_THEMES, BG_THEME,CELL_THEME, X_THEME, O_THEME, OBSTACLE_THEME, ASSETS
+from typing import Dict
+from game_config import NAMES_THEMES, BG_THEME,CELL_THEME, X_THEME, O_THEME, OBSTACLE_THEME, ASSETS, ATLAS_SUFFIX
 
 """
 Quản lý chủ đề (theme) hình ảnh
@@ -7,11 +8,13 @@ Quản lý chủ đề (theme) hình ảnh
 Cung cấp class Theme để:
 • Xác định đường dẫn tới background, icon X/O, ô trống, obstacle
 • Cho phép xoay vòng (next) và reset về theme đầu tiên
+• Mỗi theme chỉ tạo một lần; texture lấy từ cache dùng chung (texture_cache)
 """
 class Theme:
     """Đối tượng chủ đề giao diện (ảnh, icon) cho một ván cờ."""
     _index: int = 0                 # Chỉ số theme hiện tại (class‑level)
     NAMES = NAMES_THEMES            # Danh sách theme sẵn có (from config)
+    _instances: Dict[str, "Theme"] = {}   # Cache instance theo tên
 
     # --------------------------- KHỞI TẠO ----------------------------
     def __init__(self, name: str):
@@ -22,13 +25,28 @@ class Theme:
         self.x_icon   = str(base / X_THEME)         # Icon X
         self.o_icon   = str(base / O_THEME)         # Icon O
         self.obs_icon = str(base / OBSTACLE_THEME)  # Icon chướng ngại
+        self.atlas    = str(base / f"{name}{ATLAS_SUFFIX}")  # Atlas X/O/cell/obstacle
+
+    @property
+    def textures(self):
+        """Ký hiệu -> texture (nạp một lần, dùng chung mọi ô)."""
+        from texture_cache import theme_textures
+        return theme_textures(self)
 
     # ---------------------- CLASSMETHOD HELPERS ----------------------
     @classmethod
     def current(cls) -> "Theme":
         """Trả về Theme hiện tại (không tạo new nếu cùng index)."""
         name = cls.NAMES[cls._index]
-        return cls(name)
+        theme = cls._instances.get(name)
+        if theme is None:
+            theme = cls._instances[name] = cls(name)
+        return theme
+
+    @classmethod
+    def current_name(cls) -> str:
+        """Tên theme hiện tại, không tạo object Theme."""
+        return cls.NAMES[cls._index]
 
     @classmethod
     def next_theme(cls) -> "Theme":
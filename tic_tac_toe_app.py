@@ -3,10 +3,12 @@ Config.set('graphics', 'minimum_width', 400)
 Config.set('graphics', 'minimum_height', 600)
 
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.screenmanager import ScreenManager, FadeTransition
+import startup_profile
 from themes import Theme
+from sound_manager import SoundManager
 from home_screen import HomeScreen
-from game_screen import GameScreen
 from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES, SCREEN_GAME, SCREEN_HOME, DEFAULT_DIFFICULTY
 
 """
@@ -14,6 +16,7 @@ from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM
 ===========================================
 • Tạo ScreenManager chứa HomeScreen & GameScreen
 • Xử lý vòng lặp ván cờ, luân chuyển theme, dừng nhạc nền khi rời màn
+• GameScreen (layout, controller, AI) chỉ import khi cần: Home hiện trước
 """
 class TicTacToeApp(App):
     """Ứng dụng gói toàn bộ game Tic-Tac-Toe."""
@@ -24,30 +27,45 @@ class TicTacToeApp(App):
         self.sm = ScreenManager(transition=FadeTransition())
         # HomeScreen sẽ gọi start_game để khởi tạo GameScreen
         self.sm.add_widget(HomeScreen(name=SCREEN_HOME))
+        startup_profile.mark("build home screen")
         return self.sm
+
+    def on_start(self):
+        # Sau frame đầu tiên của Home mới nạp tài nguyên ván chơi
+        Clock.schedule_once(self._after_first_frame, 0)
+
+    def _after_first_frame(self, *_):
+        startup_profile.mark("first frame")
+        # Nạp âm thanh một lần, chạy nền, dùng chung cho mọi màn
+        SoundManager.shared().preload()
+        if startup_profile.is_enabled():
+            print(startup_profile.report())
     
     # ---------------------- KHỞI TẠO GAME ---------------------------
     def start_game(self, mode: str, difficulty: str = DEFAULT_DIFFICULTY,
                    rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS,
                    win_len: int = DEFAULT_WIN_LEN, num_obstacles: int = DEFAULT_NUM_OBSTACLES):
-        """Tạo GameScreen mới & chuyển tới nó."""
+        """Dùng lại GameScreen (tạo lần đầu) cho cấu hình mới & chuyển tới nó."""
         # 1) Dừng nhạc nền màn chơi trước (nếu có)
-        if self.sm.has_screen(SCREEN_GAME):
-            old = self.sm.get_screen(SCREEN_GAME)
-            if hasattr(old, 'game_widget') and hasattr(old.game_widget, '_sounds'):
-                if old.game_widget._sounds.bg:
-                    old.game_widget._sounds.bg.stop()
-            self.sm.remove_widget(old)
+        SoundManager.shared().stop_bg()
 
-        # 2) Tạo màn mới
-        game_screen = GameScreen(
-            mode, difficulty,
-            rows=rows, cols=cols,
-            win_len=win_len, num_obstacles=num_obstacles,
-            on_game_end=self.on_game_end,
-            name=SCREEN_GAME,
-        )
-        self.sm.add_widget(game_screen)
+        # 2) Cấu hình lại màn có sẵn, chỉ tạo mới ở lần chơi đầu tiên
+        if self.sm.has_screen(SCREEN_GAME):
+            self.sm.get_screen(SCREEN_GAME).configure(
+                mode, difficulty,
+                rows=rows, cols=cols,
+                win_len=win_len, num_obstacles=num_obstacles,
+            )
+        else:
+            from game_screen import GameScreen   # lần đầu vào ván mới import
+            game_screen = GameScreen(
+                mode, difficulty,
+                rows=rows, cols=cols,
+                win_len=win_len, num_obstacles=num_obstacles,
+                on_game_end=self.on_game_end,
+                name=SCREEN_GAME,
+            )
+            self.sm.add_widget(game_screen)
         self.sm.current = SCREEN_GAME
 
     # ----------------------- CALLBACK GAME END ----------------------
@@ -63,18 +81,13 @@ class TicTacToeApp(App):
     # --------------------------- HOME -------------------------------
     def go_home(self):
         """Trở về Home & dừng nhạc nền nếu cần."""
-        if self.sm.has_screen(SCREEN_GAME):
-            gs = self.sm.get_screen(SCREEN_GAME)
-            if hasattr(gs, 'game_widget') and hasattr(gs.game_widget, '_sounds'):
-                if gs.game_widget._sounds.bg:
-                    gs.game_widget._sounds.bg.stop()
+        SoundManager.shared().stop_bg()
         self.sm.current = SCREEN_HOME
 
     # --------------------------- EXIT -------------------------------
     def on_stop(self):
         # Dừng âm thanh khi app đóng
-        if self.sm.current == SCREEN_GAME and self.sm.has_screen(SCREEN_GAME):
-            gs = self.sm.get_screen(SCREEN_GAME)
-            if hasattr(gs, 'game_widget') and hasattr(gs.game_widget, '_sounds'):
-                if gs.game_widget._sounds.bg:
-                    gs.game_widget._sounds.bg.stop()
+        SoundManager.shared().stop_bg()
+        if self.sm.has_screen(SCREEN_GAME):        # Đã chơi: có thể còn AI giữ pool MCTS
+            from game_factory import close_ai_pool
+            close_ai_pool()
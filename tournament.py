@@ -0,0 +1,138 @@
+"""
+Tournament: so sánh các hồ sơ AI bằng cách cho đấu nhau
+=========================================================
+Mỗi cặp hồ sơ (vòng tròn) đánh *games* ván trên cùng dạng bàn, đổi màu
+sau mỗi ván; hai ván liền nhau dùng cùng obstacle và cùng *opening* nước
+mở đầu ngẫu nhiên (theo seed) nên lợi thế đi trước / thế cờ cân bằng cho
+hai bên. In thắng - hoà - thua, ms / nước và nút / giây của mỗi bên
+(với hồ sơ "mcts" là playout / giây).
+
+    python tournament.py hard mcts --games 20 --rows 15 --cols 15 --win-len 5 --obstacles 20
+"""
+
+import argparse
+import itertools
+import logging
+import random
+import time
+from typing import List, NamedTuple, Optional, Union
+
+from ai_profiles import DifficultyProfile, get_profiles
+from board import Board
+from game_config import DEFAULT_ROWS, DEFAULT_COLS, DEFAULT_WIN_LEN, DEFAULT_NUM_OBSTACLES
+from minimax import MinimaxAI
+
+Profile = Union[str, DifficultyProfile]
+
+
+class MatchResult(NamedTuple):
+    a: str
+    b: str
+    wins_a: int
+    wins_b: int
+    draws: int
+    ms_per_move_a: float
+    ms_per_move_b: float
+    nodes_per_s_a: float
+    nodes_per_s_b: float
+
+
+class _Side:
+    """Một bên trong ván: AI + thời gian / số nút cộng dồn."""
+    __slots__ = ("ai", "seconds", "moves", "nodes")
+
+    def __init__(self, ai) -> None:
+        self.ai = ai
+        self.seconds = 0.0
+        self.moves = 0
+        self.nodes = 0
+
+
+def play_game(first: "_Side", second: "_Side", board: Board, opening: int,
+              rng: random.Random) -> Optional[int]:
+    """Một ván, *first* cầm X; trả 0 / 1 = bên thắng, None = hoà."""
+    x, o = Board._PLAYERS
+    for ply in range(opening):
+        board.place(*rng.choice(sorted(board.get_legal_moves())), (x, o)[ply % 2])
+    sides = {x: first, o: second}
+    symbol = (x, o)[opening % 2]
+    while not (board.has_winner_any() or board.is_draw()):
+        other = o if symbol == x else x
+        side = sides[symbol]
+        t0 = time.perf_counter()
+        move = side.ai.best(board, symbol, other)
+        side.seconds += time.perf_counter() - t0
+        side.moves += 1
+        side.nodes += side.ai.nodes
+        board.place(*move, symbol)
+        symbol = other
+    if not board.has_winner_any():
+        return None
+    return 0 if board.get_winner_symbol() == x else 1
+
+
+def run_match(a: Profile, b: Profile, games: int, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS,
+              win_len: int = DEFAULT_WIN_LEN, num_obstacles: int = DEFAULT_NUM_OBSTACLES,
+              seed: int = 0, opening: int = 2) -> MatchResult:
+    """*games* ván giữa hồ sơ *a* và *b*, đổi màu mỗi ván."""
+    side_a = _Side(None)
+    side_b = _Side(None)
+    wins = [0, 0]
+    draws = 0
+    for n in range(games):
+        game_seed = seed + n // 2
+        side_a.ai = MinimaxAI(a, rng=random.Random(game_seed))
+        side_b.ai = MinimaxAI(b, rng=random.Random(game_seed))
+        board = Board(rows, cols, win_len, num_obstacles, seed=game_seed)
+        a_first = n % 2 == 0
+        first, second = (side_a, side_b) if a_first else (side_b, side_a)
+        try:
+            winner = play_game(first, second, board, opening, random.Random(game_seed))
+        finally:
+            side_a.ai.close()                  # Pool playout MCTS (mcts_workers > 1)
+            side_b.ai.close()
+        if winner is None:
+            draws += 1
+        else:
+            wins[0 if (winner == 0) == a_first else 1] += 1
+    return MatchResult(
+        side_a.ai.difficulty, side_b.ai.difficulty, wins[0], wins[1], draws,
+        round(1000 * side_a.seconds / max(side_a.moves, 1), 1),
+        round(1000 * side_b.seconds / max(side_b.moves, 1), 1),
+        round(side_a.nodes / max(side_a.seconds, 1e-6)),
+        round(side_b.nodes / max(side_b.seconds, 1e-6)),
+    )
+
+
+def round_robin(profiles: List[Profile], games: int, **board_args) -> List[MatchResult]:
+    """run_match cho mọi cặp trong *profiles*."""
+    return [run_match(a, b, games, **board_args) for a, b in itertools.combinations(profiles, 2)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("profiles", nargs="+", choices=list(get_profiles()))
+    ap.add_argument("--games", type=int, default=20, help="số ván mỗi cặp (chẵn để đổi màu đều)")
+    ap.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    ap.add_argument("--cols", type=int, default=DEFAULT_COLS)
+    ap.add_argument("--win-len", type=int, default=DEFAULT_WIN_LEN)
+    ap.add_argument("--obstacles", type=int, default=DEFAULT_NUM_OBSTACLES)
+    ap.add_argument("--opening", type=int, default=2, help="số nước mở đầu ngẫu nhiên")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)   # engine bật DEBUG khi import
+
+    t0 = time.perf_counter()
+    print(f"{'a':>10} {'b':>10} {'W-D-L (a)':>12} {'ms/move a/b':>16} {'nodes/s a/b':>18}")
+    for r in round_robin(args.profiles, args.games, rows=args.rows, cols=args.cols,
+                         win_len=args.win_len, num_obstacles=args.obstacles,
+                         seed=args.seed, opening=args.opening):
+        print(f"{r.a:>10} {r.b:>10} {f'{r.wins_a}-{r.draws}-{r.wins_b}':>12} "
+              f"{f'{r.ms_per_move_a:.0f}/{r.ms_per_move_b:.0f}':>16} "
+              f"{f'{r.nodes_per_s_a:.0f}/{r.nodes_per_s_b:.0f}':>18}")
+    print(f"{args.rows}x{args.cols} win {args.win_len}, {args.obstacles} obstacle, "
+          f"{time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
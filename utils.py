@@ -4,14 +4,8 @@ Tiện ích UI (bo góc, nhấn tối, âm click)
 Chứa hàm dựng hiệu ứng bo góc cho Kivy widget và phát âm click.
 """
 from kivy.graphics import Color, RoundedRectangle
-from kivy.core.image import Image as CoreImage
+from texture_cache import get_texture
 from sound_manager import SoundManager
-from sound_manager import SoundManager
-
-# ---------------------- CONSTANT / SINGLETON ----------------------- #
-# Trình phát âm thanh dùng chung
-# Đề xuất: CLICK_VOLUME và CLICK_SFX có thể cấu hình trong game_config
-_CLICKER = SoundManager(auto_play_bg=False)
 
 
 # ------------------------------------------------------------------ #
@@ -19,7 +13,7 @@ _CLICKER = SoundManager(auto_play_bg=False)
 # ------------------------------------------------------------------ #
 def enable_click_sound(widget):
     """Phát click.ogg mỗi khi Button được release."""
-    widget.bind(on_release=lambda *_: _CLICKER.play_click())
+    widget.bind(on_release=lambda *_: SoundManager.shared().play_click())
     
 # ------------------------------------------------------------------ #
 #                        STYLE: BO GÓC + NỀN                         #
@@ -72,7 +66,7 @@ def style_round_texture_widget(widget, image_path, radius=15):
         rect = RoundedRectangle(
             pos=widget.pos, size=widget.size,
             radius=[radius],
-            texture=CoreImage(image_path).texture     
+            texture=get_texture(image_path)
         )
 
     widget._bg_clr  = clr
@@ -18,7 +18,7 @@ View thuần Kivy, kết hợp ButtonBehavior + Image:
 
 * Hiển thị icon X / O / obstacle / ô trống tuỳ symbol.
 * Phát sự kiện click về controller qua callback.
-* Tự lấy hình ảnh theo Theme.current().
+* Tự lấy texture theo Theme.current() từ cache dùng chung (không đặt source).
 
 Không chứa logic thắng-thua, chỉ UI.
 """
@@ -47,18 +47,12 @@ class XOCell(ButtonBehavior, Image):
 
     # ------------------------ CẬP NHẬT SPRITE ----------------------- #
     def set_mark(self, symbol: str) -> None:
-        """Đổi icon & màu theo ký hiệu symbol."""
-        theme = Theme.current()      
-        if symbol == PLAYER_X:
-            self.source = theme.x_icon
-            self.color  = (1, 1, 1, 1)
-        elif symbol == PLAYER_O:
-            self.source = theme.o_icon
-            self.color  = (1, 1, 1, 1)
-        elif symbol == OBSTACLE_SYMBOL:
-            self.source = theme.obs_icon
-            self.color  = BTN_RGBA    # tint cùng màu nút control
+        """Đổi texture & màu theo ký hiệu symbol."""
+        textures = Theme.current().textures
+        if symbol in (PLAYER_X, PLAYER_O, OBSTACLE_SYMBOL):
+            self.texture = textures[symbol]
         else:                         # ô trống
-            self.source = theme.cell_bg
-            self.color  = (1, 1, 1, 1)
+            self.texture = textures[""]
+        # tint obstacle cùng màu nút control
+        self.color = BTN_RGBA if symbol == OBSTACLE_SYMBOL else (1, 1, 1, 1)
         self.mark = symbol